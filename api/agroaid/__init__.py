@@ -0,0 +1,9 @@
+"""Shared core for the Agro-Aid Streamlit apps and inference API.
+
+model        -- CLASS_NAMES, lazy model loading and prediction helpers
+db           -- SQLite schema and queries
+translation  -- cached googletrans lookups
+scheduling   -- alarms and reminder notifications
+pages        -- page registry, each page loaded on first visit
+variants     -- the app configurations behind the scripts in api/
+"""
@@ -0,0 +1,97 @@
+"""Admission control for the inference API.
+
+At most ``max_concurrency`` requests decode and infer at once; up to
+``max_queue`` more wait in FIFO order.  Anything beyond that is turned
+away immediately, as is a request whose expected wait already exceeds the
+deadline, so an overloaded server answers in microseconds instead of
+piling decoded images into memory.
+
+Configured from the environment:
+
+    AGRO_AID_MAX_CONCURRENCY  requests served at once (default 2)
+    AGRO_AID_MAX_QUEUE        requests allowed to wait (default 16)
+    AGRO_AID_DEADLINE         seconds a request may wait for a slot (default 10)
+"""
+import asyncio
+import math
+import os
+import time
+from collections import deque
+
+
+class Rejected(Exception):
+    """Raised instead of queueing; carries the HTTP status and a Retry-After hint."""
+
+    def __init__(self, status_code, reason, retry_after):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    def __init__(self, max_concurrency=2, max_queue=16, deadline=10.0, initial_service_time=0.2):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.deadline = deadline
+        # Exponentially weighted service time, used to predict queue waits
+        self.service_time = initial_service_time
+        self.active = 0
+        self._waiters = deque()
+
+    @property
+    def queued(self):
+        return len(self._waiters)
+
+    def expected_wait(self, position):
+        """Seconds until the request at queue ``position`` (1-based) gets a slot."""
+        return math.ceil(position / self.max_concurrency) * self.service_time
+
+    def retry_after(self):
+        return max(1, math.ceil(self.expected_wait(self.queued + 1)))
+
+    async def acquire(self):
+        """Wait for a slot and return the seconds spent queued, or raise Rejected."""
+        if self.active < self.max_concurrency and not self._waiters:
+            self.active += 1
+            return 0.0
+        if len(self._waiters) >= self.max_queue:
+            raise Rejected(429, 'queue full', self.retry_after())
+        if self.expected_wait(len(self._waiters) + 1) > self.deadline:
+            raise Rejected(503, 'expected wait exceeds deadline', self.retry_after())
+
+        start = time.perf_counter()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.deadline)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up: pass it on
+                self.release()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                raise Rejected(503, 'deadline exceeded while queued', self.retry_after()) from None
+            raise
+        return time.perf_counter() - start
+
+    def release(self, service_seconds=None):
+        if service_seconds is not None:
+            self.service_time += 0.2 * (service_seconds - self.service_time)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # Hand the slot straight to the next waiter; ``active`` is unchanged
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+def controller_from_env():
+    return AdmissionController(
+        max_concurrency=int(os.environ.get('AGRO_AID_MAX_CONCURRENCY', '2')),
+        max_queue=int(os.environ.get('AGRO_AID_MAX_QUEUE', '16')),
+        deadline=float(os.environ.get('AGRO_AID_DEADLINE', '10')),
+    )
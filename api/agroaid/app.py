@@ -0,0 +1,31 @@
+import streamlit as st
+
+from agroaid.context import AppContext
+from agroaid.pages import load_page, page_title
+from agroaid.variants import VARIANTS
+
+
+def run(variant_name):
+    variant = VARIANTS[variant_name]
+
+    # Set page configuration
+    st.set_page_config(page_title=variant.page_title, layout='wide')
+
+    if variant.reminder_scheduler:
+        from agroaid.scheduling import start_reminder_scheduler
+        start_reminder_scheduler()
+
+    language = 'English'
+    if len(variant.languages) > 1:
+        language = st.sidebar.selectbox('Choose your language', variant.languages)
+    ctx = AppContext(variant, language)
+
+    # Set up sidebar
+    st.sidebar.title(ctx.t('Contents'))
+    page = st.sidebar.radio(ctx.t('Go to'), variant.pages, format_func=lambda key: ctx.t(page_title(key)))
+
+    try:
+        load_page(page)(ctx)
+    finally:
+        # Ensure connection is closed
+        ctx.close()
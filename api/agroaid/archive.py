@@ -0,0 +1,60 @@
+"""Iterate the images inside zip and tar uploads without extracting them all.
+
+Members come out one at a time as readable file objects.  Tar archives
+(plain or compressed) are read as a stream; zip needs a seekable file for
+its central directory, which the spooled uploads FastAPI hands us are.
+"""
+import os
+import tarfile
+import zipfile
+
+from agroaid.preprocess import is_image_file
+
+ARCHIVE_EXTENSIONS = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tar.xz')
+
+
+def is_archive(filename):
+    return bool(filename) and filename.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def _wanted(name):
+    # Skip directories' metadata files, macOS resource forks and the like
+    base = os.path.basename(name)
+    return is_image_file(base) and not base.startswith('.') and '__MACOSX/' not in name
+
+
+def iter_archive(fileobj, filename):
+    """Yield ``(member_name, file_object)`` for every image in the archive.
+
+    Each file object is only valid until the next member is requested.
+    """
+    if filename.lower().endswith('.zip'):
+        with zipfile.ZipFile(fileobj) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and _wanted(info.filename):
+                    with archive.open(info) as member:
+                        yield info.filename, member
+        return
+
+    # 'r|*' reads sequentially and sniffs the compression
+    with tarfile.open(fileobj=fileobj, mode='r|*') as archive:
+        for info in archive:
+            if info.isfile() and _wanted(info.name):
+                yield info.name, archive.extractfile(info)
+
+
+def count_images(fileobj, filename):
+    """Number of images iter_archive would yield, leaving ``fileobj`` rewound.
+
+    Zip only reads the central directory; tar reads member headers and
+    skips (but still decompresses) the data.
+    """
+    position = fileobj.tell()
+    try:
+        if filename.lower().endswith('.zip'):
+            with zipfile.ZipFile(fileobj) as archive:
+                return sum(not info.is_dir() and _wanted(info.filename) for info in archive.infolist())
+        with tarfile.open(fileobj=fileobj, mode='r|*') as archive:
+            return sum(info.isfile() and _wanted(info.name) for info in archive)
+    finally:
+        fileobj.seek(position)
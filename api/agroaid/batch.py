@@ -0,0 +1,194 @@
+"""Offline batch classification: decode on a process pool, infer in batches,
+stream results to CSV or JSONL with the output file doubling as a checkpoint."""
+import csv
+import json
+import multiprocessing
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+
+from agroaid.model import CLASS_NAMES
+from agroaid.preprocess import batch_buffer, load_image
+
+
+def decode_file(path, source=None):
+    # ``source`` is an open file object to read instead of ``path`` (e.g. an upload)
+    try:
+        return path, load_image(path if source is None else source), None
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+
+
+def decode_stream(paths, workers=1, window=256):
+    """Yield ``(path, image, error)`` in input order, keeping at most ``window`` decodes in flight."""
+    if workers <= 1:
+        yield from map(decode_file, paths)
+        return
+
+    # spawn rather than fork: the parent may already hold TensorFlow's threads
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        pending = deque()
+        for path in paths:
+            pending.append(pool.submit(decode_file, path))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def classify_decoded(chunk, model):
+    """Classify one chunk of ``decode_stream`` output and return a result row per file."""
+    images = [image for _, image, error in chunk if error is None]
+    # Stacked into the thread's reusable buffer rather than a fresh batch per chunk
+    probabilities = iter(model.predict_on_batch(np.stack(images, out=batch_buffer(len(images)))) if images else ())
+    rows = []
+    for path, _, error in chunk:
+        if error is not None:
+            rows.append({'path': path, 'error': error})
+            continue
+        row = np.asarray(next(probabilities))
+        index = int(np.argmax(row))
+        rows.append({
+            'path': path,
+            'class': CLASS_NAMES[index],
+            'confidence': float(row[index]),
+            'probabilities': {name: float(p) for name, p in zip(CLASS_NAMES, row)},
+        })
+    return rows
+
+
+def classify_stream(paths, model, batch_size=32, workers=1, window=None):
+    window = window or batch_size * 4
+    for chunk in batched(decode_stream(paths, workers, window), batch_size):
+        yield classify_decoded(chunk, model)
+
+
+def prefetch(iterable, window):
+    """Iterate ``iterable`` on a background thread, staying at most ``window`` items ahead."""
+    items = queue.Queue(maxsize=window)
+    stop = threading.Event()
+    done = object()
+
+    def put(entry):
+        while not stop.is_set():
+            try:
+                items.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+            put((done, None))
+        except BaseException as e:
+            put((done, e))
+
+    thread = threading.Thread(target=produce, name='prefetch', daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = items.get()
+            if item is done:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        # The consumer stopped early (client went away): let the producer exit
+        stop.set()
+        thread.join()
+
+
+def classify_sources(sources, model, chunk_size=16, window=0):
+    """Classify ``(name, file_object)`` pairs, yielding one result row at a time.
+
+    Each source is decoded as soon as it is reached, so a stream of any
+    length (an archive, say) holds at most ``chunk_size`` decoded images
+    plus ``window`` more decoded ahead on a background thread while the
+    model runs.
+    """
+    decoded = (decode_file(name, source) for name, source in sources)
+    if window:
+        decoded = prefetch(decoded, window)
+    for chunk in batched(decoded, chunk_size):
+        yield from classify_decoded(chunk, model)
+
+
+class ResultWriter:
+    """Append-only CSV/JSONL result file.
+
+    Every batch is flushed and fsynced before the next one starts, so the
+    file is the checkpoint: reopening it with ``resume=True`` drops a torn
+    last line and reports which paths are already done.
+    """
+
+    CSV_FIELDS = ['path', 'class', 'confidence'] + CLASS_NAMES + ['error']
+
+    def __init__(self, path, fmt=None, resume=True):
+        self.path = path
+        self.format = fmt or ('csv' if path.lower().endswith('.csv') else 'jsonl')
+        self.completed = set()
+        if resume and os.path.exists(path):
+            self._truncate_partial_line()
+            self.completed = self._read_completed()
+        else:
+            open(path, 'w').close()
+        self._file = open(path, 'a', newline='')
+        self._csv = None
+        if self.format == 'csv':
+            self._csv = csv.DictWriter(self._file, fieldnames=self.CSV_FIELDS)
+            if os.path.getsize(path) == 0:
+                self._csv.writeheader()
+
+    def _truncate_partial_line(self):
+        with open(self.path, 'rb+') as f:
+            data = f.read()
+            end = data.rfind(b'\n') + 1
+            if end != len(data):
+                f.truncate(end)
+
+    def _read_completed(self):
+        with open(self.path, newline='') as f:
+            if self.format == 'csv':
+                return {row['path'] for row in csv.DictReader(f)}
+            return {json.loads(line)['path'] for line in f if line.strip()}
+
+    def write(self, rows):
+        for row in rows:
+            if self._csv is not None:
+                flat = {key: row.get(key, '') for key in ('path', 'class', 'confidence', 'error')}
+                flat.update(row.get('probabilities', {}))
+                self._csv.writerow(flat)
+            else:
+                self._file.write(json.dumps(row) + '\n')
+            self.completed.add(row['path'])
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
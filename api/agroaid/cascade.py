@@ -0,0 +1,50 @@
+"""Confidence cascade: a small student model first, the full model on doubt.
+
+Most uploads are clear-cut, so a student model, a much smaller network
+trained to agree with the full one, answers them alone.  Only images
+whose student top-1 confidence is below the threshold are re-run through
+the full model, and its answer replaces the student's.  Cascade has the
+model methods the inference paths call, so it drops in wherever a loaded
+model is passed around.
+
+Configured from the environment:
+
+    AGRO_AID_STUDENT_MODEL_PATH  student SavedModel directory (default unset: no cascade)
+    AGRO_AID_CASCADE_THRESHOLD   student confidence below which the full model runs (default 0.9)
+"""
+import os
+
+import numpy as np
+
+from agroaid import metrics
+from agroaid.model import load_model
+
+
+class Cascade:
+    def __init__(self, student, full, threshold=0.9):
+        self.student = student
+        self.full = full
+        self.threshold = threshold
+
+    def predict_on_batch(self, images):
+        images = np.asarray(images)
+        with metrics.time_stage("student"):
+            probabilities = np.array(self.student.predict_on_batch(images))
+        doubtful = np.flatnonzero(probabilities.max(axis=1) < self.threshold)
+        if len(doubtful):
+            with metrics.time_stage("full"):
+                probabilities[doubtful] = self.full.predict_on_batch(images[doubtful])
+        metrics.CASCADE_IMAGES.labels("student").inc(len(images) - len(doubtful))
+        metrics.CASCADE_IMAGES.labels("full").inc(len(doubtful))
+        return probabilities
+
+    def predict(self, images, verbose=0, **kwargs):
+        return self.predict_on_batch(images)
+
+
+def cascade_from_env(model):
+    """Wrap ``model`` in a Cascade if a student model is configured, else return it unchanged."""
+    path = os.environ.get('AGRO_AID_STUDENT_MODEL_PATH')
+    if not path:
+        return model
+    return Cascade(load_model(path), model, float(os.environ.get('AGRO_AID_CASCADE_THRESHOLD', '0.9')))
@@ -0,0 +1,74 @@
+"""Single-flight coalescing of identical concurrent requests.
+
+When a shared field photo goes round a group chat, many clients post the
+same bytes within seconds.  The first request for a content hash does the
+work; every identical request arriving while it is in flight awaits the
+same result instead of queueing for its own inference.  Nothing is kept
+once the leader finishes, so this is not a cache: later repeats run again
+(or hit agroaid.dedup).
+
+Set AGRO_AID_COALESCE=0 to turn it off.
+"""
+import asyncio
+import hashlib
+import os
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def content_key(fileobj):
+    """Hash a seekable file's contents in chunks and rewind it."""
+    digest = hashlib.blake2b(digest_size=16)
+    fileobj.seek(0)
+    for chunk in iter(lambda: fileobj.read(CHUNK_SIZE), b''):
+        digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+
+class SingleFlight:
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._in_flight = {}
+
+    def __len__(self):
+        return len(self._in_flight)
+
+    async def run(self, key, function):
+        """Await ``function()``, or the call already running for ``key``.
+
+        Returns ``(result, shared)`` where ``shared`` says the result came
+        from another request.  Followers see the leader's exception too.
+        """
+        while True:
+            future = self._in_flight.get(key)
+            if future is None or future.cancelled():
+                break
+            try:
+                return await asyncio.shield(future), True
+            except asyncio.CancelledError:
+                # The leader was cancelled, not us. Another follower may already
+                # have taken over, so look again rather than replacing its future
+                if not future.cancelled():
+                    raise
+        future = self._in_flight[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await function()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark it retrieved so a leader without followers doesn't log a warning
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+
+def coalescer_from_env():
+    return SingleFlight(os.environ.get('AGRO_AID_COALESCE', '1') != '0')
@@ -0,0 +1,36 @@
+import streamlit as st
+
+from agroaid import db
+from agroaid.translation import translate
+
+
+class AppContext:
+    """What a page gets to render itself: the variant, the language and the database."""
+
+    def __init__(self, variant, language):
+        self.variant = variant
+        self.language = language
+        self._conn = None
+
+    def t(self, text):
+        return translate(text, self.language)
+
+    @property
+    def conn(self):
+        # Pages that never touch the database never open it
+        if self._conn is None:
+            self._conn = db.connect(self.variant.tables)
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def is_user_logged_in():
+    return 'username' in st.session_state
+
+
+def get_logged_in_username():
+    return st.session_state.username if is_user_logged_in() else None
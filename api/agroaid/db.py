@@ -0,0 +1,142 @@
+import hashlib
+import sqlite3
+import threading
+
+DB_PATH = 'plant_care.db'
+
+# Every table any of the app variants uses.  Each variant declares the subset
+# it needs, so old databases keep working with the schema they were created with.
+TABLES = {
+    'profiles': '''
+        CREATE TABLE IF NOT EXISTS profiles (
+            username TEXT PRIMARY KEY,
+            password TEXT
+        )
+    ''',
+    'feedbacks': '''
+        CREATE TABLE IF NOT EXISTS feedbacks (
+            username TEXT,
+            message TEXT,
+            rating INTEGER,
+            type TEXT
+        )
+    ''',
+    'plant_tasks': '''
+        CREATE TABLE IF NOT EXISTS plant_tasks (
+            username TEXT,
+            task TEXT,
+            plant_name TEXT,
+            date TEXT,
+            time TEXT
+        )
+    ''',
+    'tasks_completed': '''
+        CREATE TABLE IF NOT EXISTS tasks_completed (
+            username TEXT PRIMARY KEY,
+            tasks_completed INTEGER
+        )
+    ''',
+    'reminder': '''
+        CREATE TABLE IF NOT EXISTS reminder (
+            username TEXT,
+            task TEXT,
+            date TEXT,
+            time TEXT,
+            frequency TEXT,
+            plants TEXT
+        )
+    ''',
+    'reminders': '''
+        CREATE TABLE IF NOT EXISTS reminders (
+            username TEXT,
+            task TEXT,
+            frequency TEXT,
+            plants TEXT,
+            timestamp TIMESTAMP
+        )
+    ''',
+}
+
+_initialised = set()
+_init_lock = threading.Lock()
+
+
+def connect(tables, path=DB_PATH):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    # Schema creation only needs to happen once per process, not on every rerun
+    key = (path, tuple(tables))
+    if key not in _initialised:
+        with _init_lock:
+            c = conn.cursor()
+            for table in tables:
+                c.execute(TABLES[table])
+            conn.commit()
+            _initialised.add(key)
+    return conn
+
+
+def hash_password(password):
+    return hashlib.sha256(password.encode()).hexdigest()
+
+
+def user_exists(conn, username):
+    c = conn.cursor()
+    c.execute('SELECT 1 FROM profiles WHERE username = ?', (username,))
+    return c.fetchone() is not None
+
+
+def create_profile(conn, username, password, track_tasks=False):
+    c = conn.cursor()
+    c.execute('INSERT INTO profiles VALUES (?, ?)', (username, hash_password(password)))
+    if track_tasks:
+        c.execute('INSERT OR IGNORE INTO tasks_completed (username, tasks_completed) VALUES (?, 0)', (username,))
+    conn.commit()
+
+
+def check_login(conn, username, password):
+    c = conn.cursor()
+    c.execute('SELECT * FROM profiles WHERE username = ? AND password = ?', (username, hash_password(password)))
+    return c.fetchone() is not None
+
+
+def delete_profile(conn, username, track_tasks=False):
+    c = conn.cursor()
+    c.execute('DELETE FROM profiles WHERE username = ?', (username,))
+    if track_tasks:
+        c.execute('DELETE FROM tasks_completed WHERE username = ?', (username,))
+    conn.commit()
+
+
+def add_feedback(conn, username, message, rating, feedback_type):
+    c = conn.cursor()
+    c.execute('INSERT INTO feedbacks (username, message, rating, type) VALUES (?, ?, ?, ?)', (username, message, rating, feedback_type))
+    conn.commit()
+
+
+def save_task(conn, username, task, plant_name, date, time_input, track_tasks=False):
+    c = conn.cursor()
+    c.execute('INSERT INTO plant_tasks (username, task, plant_name, date, time) VALUES (?, ?, ?, ?, ?)',
+              (username, task, plant_name, date.strftime('%Y-%m-%d'), time_input.strftime('%H:%M:%S')))
+    if track_tasks:
+        c.execute('INSERT OR IGNORE INTO tasks_completed (username, tasks_completed) VALUES (?, 0)', (username,))
+        c.execute('UPDATE tasks_completed SET tasks_completed = tasks_completed + 1 WHERE username = ?', (username,))
+    conn.commit()
+
+
+def add_reminder(conn, username, task, date, time_str, frequency, plants):
+    c = conn.cursor()
+    c.execute('INSERT INTO reminder (username, task, date, time, frequency, plants) VALUES (?, ?, ?, ?, ?, ?)',
+              (username, task, date, time_str, frequency, plants))
+    conn.commit()
+
+
+def due_reminders(conn, date_str, time_str):
+    c = conn.cursor()
+    c.execute('SELECT * FROM reminder WHERE date = ? AND time = ?', (date_str, time_str))
+    return c.fetchall()
+
+
+def leaderboard(conn, limit):
+    c = conn.cursor()
+    c.execute('SELECT username, tasks_completed FROM tasks_completed ORDER BY tasks_completed DESC LIMIT ?', (limit,))
+    return c.fetchall()
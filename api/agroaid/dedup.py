@@ -0,0 +1,124 @@
+"""Near-duplicate prediction cache keyed on perceptual hashes.
+
+Scouts photograph the same leaf several times with slightly different
+framing, so the bytes never repeat but a 64-bit perceptual hash of the
+decoded image barely moves.  A request whose hash is within
+``max_distance`` bits of a cached one gets that entry's prediction without
+running the model.  Lookups are one vectorized XOR and popcount over every
+cached hash; the cache is a fixed-size ring, oldest entries overwritten
+first.
+
+Configured from the environment:
+
+    AGRO_AID_DEDUP           hash to use, "dhash" or "phash" (default unset: no cache)
+    AGRO_AID_DEDUP_DISTANCE  largest Hamming distance, out of 64 bits, that counts as a hit (default 6)
+    AGRO_AID_DEDUP_SIZE      hashes kept (default 10000)
+    AGRO_AID_DEDUP_VERIFY    fraction of hits also sent to the model to measure agreement (default 0.01)
+"""
+import os
+import random
+import threading
+
+import numpy as np
+from PIL import Image
+
+# Masks for counting set bits in parallel across every 64-bit hash (numpy < 2 has no bitwise_count)
+_M1, _M2, _M4, _H01 = (np.uint64(m) for m in (0x5555555555555555, 0x3333333333333333,
+                                               0x0F0F0F0F0F0F0F0F, 0x0101010101010101))
+
+
+def _dct_matrix(n):
+    k = np.arange(n)[:, None]
+    matrix = np.cos(np.pi * (2 * np.arange(n)[None, :] + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+
+_DCT_32 = _dct_matrix(32)
+
+
+def _pack(bits):
+    return np.packbits(bits).view('>u8')[0].astype(np.uint64)
+
+
+def _grey(image, size):
+    return np.asarray(Image.fromarray(image).convert('L').resize(size, Image.BOX), np.float32)
+
+
+def dhash(image):
+    """Difference hash of an RGB uint8 array: is each pixel brighter than its right neighbour."""
+    grey = _grey(image, (9, 8))
+    return _pack(grey[:, 1:] > grey[:, :-1])
+
+
+def phash(image):
+    """DCT hash of an RGB uint8 array: low frequencies above or below their median."""
+    low = (_DCT_32 @ _grey(image, (32, 32)) @ _DCT_32.T)[:8, :8]
+    # The DC term only tracks overall brightness, so it doesn't set the threshold
+    return _pack(low > np.median(low.ravel()[1:]))
+
+
+HASHES = {'dhash': dhash, 'phash': phash}
+
+
+def hamming(hashes, key):
+    """Bit distance from ``key`` to every entry of the uint64 array ``hashes``."""
+    x = np.bitwise_xor(hashes, key)
+    x -= (x >> np.uint64(1)) & _M1
+    x = (x & _M2) + ((x >> np.uint64(2)) & _M2)
+    x = (x + (x >> np.uint64(4))) & _M4
+    return (x * _H01) >> np.uint64(56)
+
+
+class NearDuplicateCache:
+    """Fixed-size ring of perceptual hashes and the probabilities predicted for them."""
+
+    def __init__(self, method=None, max_distance=6, capacity=10_000, verify=0.01):
+        if method is not None and method not in HASHES:
+            raise ValueError(f"Unknown perceptual hash {method!r}, expected one of {sorted(HASHES)}")
+        self.enabled = method is not None
+        self.hash = HASHES[method] if self.enabled else None
+        self.max_distance = max_distance
+        self.capacity = capacity
+        self.verify = verify
+        self._hashes = np.zeros(capacity, np.uint64)
+        self._probabilities = None
+        self._count = 0
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._count
+
+    def lookup(self, key):
+        """Return ``(probabilities, distance)`` for the closest cached hash within range, else None."""
+        with self._lock:
+            if not self._count:
+                return None
+            distances = hamming(self._hashes[:self._count], key)
+            index = int(np.argmin(distances))
+            distance = int(distances[index])
+            if distance > self.max_distance:
+                return None
+            return self._probabilities[index].copy(), distance
+
+    def add(self, key, probabilities):
+        with self._lock:
+            if self._probabilities is None:
+                self._probabilities = np.zeros((self.capacity, len(probabilities)), np.float32)
+            self._hashes[self._next] = key
+            self._probabilities[self._next] = probabilities
+            self._next = (self._next + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+
+    def should_verify(self):
+        return self.verify > 0 and random.random() < self.verify
+
+
+def cache_from_env():
+    return NearDuplicateCache(
+        method=os.environ.get('AGRO_AID_DEDUP') or None,
+        max_distance=int(os.environ.get('AGRO_AID_DEDUP_DISTANCE', '6')),
+        capacity=int(os.environ.get('AGRO_AID_DEDUP_SIZE', '10000')),
+        verify=float(os.environ.get('AGRO_AID_DEDUP_VERIFY', '0.01')),
+    )
@@ -0,0 +1,153 @@
+"""Knowledge distillation of the notebook CNN into a narrow student.
+
+The dataset is decoded once, with the same preprocess.load_image the API
+uses, into a uint8 memmap; the teacher (models/1) is run over it once and
+its log-probabilities saved next to it.  Both are reused across epochs and
+across runs while the image list and the teacher are unchanged, so a run
+costs one teacher pass plus student training.
+
+The student learns from the teacher's temperature-softened distribution
+and from the folder labels:
+
+    loss = alpha * T^2 * KL(softmax(teacher / T) || softmax(student / T))
+           + (1 - alpha) * cross-entropy(label, student)
+"""
+import hashlib
+import json
+import os
+import zlib
+
+import numpy as np
+
+from agroaid.batch import batched
+from agroaid.model import CLASS_NAMES, class_from_path
+from agroaid.preprocess import IMAGE_SIZE, iter_image_files, load_image
+
+
+def build_student(width=16):
+    """A narrow CNN with logits out: depthwise-separable blocks on a half-resolution input."""
+    import tensorflow as tf
+    from tensorflow.keras import layers
+
+    return tf.keras.Sequential([
+        layers.Rescaling(1. / 255, input_shape=(IMAGE_SIZE, IMAGE_SIZE, 3)),
+        layers.AveragePooling2D(2),
+        layers.Conv2D(width, 3, strides=2, activation='relu'),
+        layers.SeparableConv2D(width * 2, 3, activation='relu'),
+        layers.MaxPooling2D(2),
+        layers.SeparableConv2D(width * 4, 3, activation='relu'),
+        layers.MaxPooling2D(2),
+        layers.SeparableConv2D(width * 4, 3, activation='relu'),
+        layers.GlobalAveragePooling2D(),
+        layers.Dense(len(CLASS_NAMES)),
+    ], name='student')
+
+
+def with_softmax(student):
+    # Exported students return probabilities like models/1 does
+    import tensorflow as tf
+
+    return tf.keras.Sequential([student, tf.keras.layers.Softmax()], name='distilled')
+
+
+def _fingerprint(paths, teacher_path):
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(path.encode())
+        digest.update(str(os.path.getmtime(path)).encode())
+    for name in ('saved_model.pb', 'variables/variables.index'):
+        model_file = os.path.join(teacher_path, name)
+        if os.path.exists(model_file):
+            digest.update(str(os.path.getmtime(model_file)).encode())
+    return digest.hexdigest()
+
+
+def build_cache(data_dir, teacher, teacher_path, cache_dir, batch_size=64, log=print):
+    """Decode the dataset and run the teacher once, or load both from ``cache_dir``.
+
+    Returns ``(paths, images, labels, teacher_logits)``; ``images`` is a
+    read-only memmap and ``labels`` is -1 where the folder names no class.
+    """
+    paths = list(iter_image_files(data_dir))
+    if not paths:
+        raise ValueError(f"No images under {data_dir}")
+    fingerprint = _fingerprint(paths, teacher_path)
+    manifest_path = os.path.join(cache_dir, 'manifest.json')
+    files = {name: os.path.join(cache_dir, f'{name}.npy') for name in ('images', 'labels', 'teacher_logits')}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            if json.load(f).get('fingerprint') == fingerprint:
+                log(f"Using cached images and teacher logits in {cache_dir}")
+                return (paths, np.load(files['images'], mmap_mode='r'), np.load(files['labels']),
+                        np.load(files['teacher_logits']))
+
+    os.makedirs(cache_dir, exist_ok=True)
+    log(f"Decoding {len(paths)} images and running the teacher once")
+    images = np.lib.format.open_memmap(files['images'], mode='w+', dtype=np.uint8,
+                                       shape=(len(paths), IMAGE_SIZE, IMAGE_SIZE, 3))
+    labels = np.array([-1 if label is None else label for label in map(class_from_path, paths)], np.int8)
+    logits = np.zeros((len(paths), len(CLASS_NAMES)), np.float32)
+    for start, chunk in zip(range(0, len(paths), batch_size), batched(paths, batch_size)):
+        for i, path in enumerate(chunk):
+            images[start + i] = load_image(path)
+        probabilities = np.asarray(teacher.predict_on_batch(images[start:start + len(chunk)]))
+        # The teacher ends in a softmax; log-probabilities are its logits up to a constant
+        logits[start:start + len(chunk)] = np.log(np.clip(probabilities, 1e-7, 1.0))
+    images.flush()
+    np.save(files['labels'], labels)
+    np.save(files['teacher_logits'], logits)
+    with open(manifest_path, 'w') as f:
+        json.dump({'fingerprint': fingerprint, 'count': len(paths), 'teacher': teacher_path}, f)
+    del images
+    return paths, np.load(files['images'], mmap_mode='r'), labels, logits
+
+
+def split(paths, val_fraction):
+    """Deterministic train/validation indices from a hash of each path."""
+    in_val = np.array([zlib.crc32(path.encode()) % 1000 < val_fraction * 1000 for path in paths])
+    return np.flatnonzero(~in_val), np.flatnonzero(in_val)
+
+
+def train(student, images, labels, teacher_logits, indices, epochs=20, batch_size=32, temperature=4.0,
+          alpha=0.7, learning_rate=1e-3, seed=0, log=print):
+    import tensorflow as tf
+
+    optimizer = tf.keras.optimizers.Adam(learning_rate)
+    # Images without a folder label learn the teacher's top-1 as their hard label
+    hard = np.where(labels >= 0, labels, teacher_logits.argmax(axis=1)).astype(np.int32)
+
+    @tf.function
+    def step(x, y, t):
+        x = tf.image.random_flip_up_down(tf.image.random_flip_left_right(x))
+        with tf.GradientTape() as tape:
+            s = student(x, training=True)
+            soft = tf.keras.losses.kl_divergence(tf.nn.softmax(t / temperature), tf.nn.softmax(s / temperature))
+            ce = tf.keras.losses.sparse_categorical_crossentropy(y, s, from_logits=True)
+            loss = tf.reduce_mean(alpha * temperature ** 2 * soft + (1 - alpha) * ce)
+        optimizer.apply_gradients(zip(tape.gradient(loss, student.trainable_variables), student.trainable_variables))
+        return loss
+
+    rng = np.random.default_rng(seed)
+    for epoch in range(epochs):
+        order = rng.permutation(indices)
+        losses = []
+        for chunk in batched(order, batch_size):
+            # Sorted so the memmap is read forwards
+            chunk = np.sort(chunk)
+            losses.append(float(step(tf.convert_to_tensor(images[chunk], tf.float32), hard[chunk],
+                                     teacher_logits[chunk])))
+        log(f"epoch {epoch + 1}/{epochs}: loss {np.mean(losses):.4f}")
+    return student
+
+
+def evaluate(model, images, labels, teacher_logits, indices, batch_size=64):
+    """Accuracy on labelled images and top-1 agreement with the teacher over ``indices``."""
+    indices = np.sort(indices)
+    if not len(indices):
+        return None, None
+    predictions = np.concatenate([np.asarray(model.predict_on_batch(images[chunk])).argmax(axis=1)
+                                  for chunk in batched(indices, batch_size)])
+    labelled = labels[indices] >= 0
+    accuracy = float(np.mean(predictions[labelled] == labels[indices][labelled])) if labelled.any() else None
+    agreement = float(np.mean(predictions == teacher_logits[indices].argmax(axis=1)))
+    return accuracy, agreement
@@ -0,0 +1,184 @@
+"""Helpers for writing new model versions next to models/1.
+
+Versions are numbered directories under the models root, as the training
+notebook and TF Serving's models.config expect.  Anything recorded about
+a version (how it was made, its size, FLOPs and accuracy) goes in
+``assets.extra/``, which TF Serving ignores.
+"""
+import json
+import os
+
+from agroaid.preprocess import IMAGE_SIZE
+
+METADATA_DIR = 'assets.extra'
+
+
+def next_version(models_dir):
+    # Same rule as the notebook: one past the highest numbered directory
+    versions = [int(name) for name in os.listdir(models_dir) if name.isdigit()] if os.path.isdir(models_dir) else []
+    return max(versions + [0]) + 1
+
+
+def directory_bytes(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, files in os.walk(path) for name in files)
+
+
+def _layers(model):
+    for layer in getattr(model, 'layers', ()):
+        if hasattr(layer, 'layers'):
+            yield from _layers(layer)
+        else:
+            yield layer
+
+
+def count_flops(model):
+    """Floating-point operations for one image, counting convolutions and dense layers.
+
+    Pooling, activations and normalisation are left out; they are a small
+    fraction for these networks.  Returns None for models without Keras
+    layers (a bare SavedModel signature, say).
+    """
+    import tensorflow as tf
+
+    layers = list(_layers(model))
+    if not layers:
+        return None
+    convolution = (tf.keras.layers.Conv2D, tf.keras.layers.SeparableConv2D, tf.keras.layers.DepthwiseConv2D)
+    total = 0
+    for layer in layers:
+        if isinstance(layer, convolution):
+            height, width, channels_out = layer.output_shape[1:]
+            channels_in = layer.input_shape[-1]
+            window = layer.kernel_size[0] * layer.kernel_size[1]
+            if isinstance(layer, tf.keras.layers.SeparableConv2D):
+                macs = height * width * channels_in * (window + channels_out)
+            elif isinstance(layer, tf.keras.layers.DepthwiseConv2D):
+                macs = height * width * channels_in * window
+            else:
+                macs = height * width * channels_in * channels_out * window
+            total += 2 * macs
+        elif isinstance(layer, tf.keras.layers.Dense):
+            total += 2 * layer.input_shape[-1] * layer.units
+    return int(total)
+
+
+def latest_version(models_dir, kind):
+    """Path of the highest numbered version whose metadata says ``kind``, or None."""
+    if not os.path.isdir(models_dir):
+        return None
+    for version in sorted((int(name) for name in os.listdir(models_dir) if name.isdigit()), reverse=True):
+        path = os.path.join(models_dir, str(version))
+        try:
+            with open(os.path.join(path, METADATA_DIR, 'model.json')) as f:
+                if json.load(f).get('kind') == kind:
+                    return path
+        except (OSError, ValueError):
+            continue
+    return None
+
+
+def _fold_rescaling(layer, weights, scale, offset):
+    # layer(x * scale + offset) as a layer of x: the scale goes into the kernel
+    # and the offset into the bias.  With padding the offset would also reach
+    # the zero border, so those layers keep the Rescaling in front of them.
+    if offset and getattr(layer, 'padding', 'valid') != 'valid':
+        return None
+    kernel, bias = weights[0], weights[1] if len(weights) > 1 else None
+    if offset:
+        if bias is None:
+            return None
+        bias = bias + offset * kernel.reshape(-1, kernel.shape[-1]).sum(axis=0)
+    return [kernel * scale] + ([bias] if bias is not None else [])
+
+
+def serving_model(model, size=IMAGE_SIZE):
+    """Rebuild ``model`` for inference only.
+
+    The result takes a uint8 ``(batch, size, size, 3)`` tensor.  The
+    augmentation layers are dropped, a Resizing to the input size is
+    dropped, and a Rescaling is folded into the convolution or dense layer
+    after it.  Weights are copied, so the outputs match ``model`` in
+    inference mode up to float rounding.
+    """
+    import tensorflow as tf
+
+    inputs = tf.keras.Input((size, size, 3), dtype=tf.uint8, name='image')
+    x = tf.cast(inputs, tf.float32)
+    rescaling = None
+    for layer in _layers(model):
+        if isinstance(layer, tf.keras.layers.InputLayer) or type(layer).__name__.startswith('Random'):
+            continue
+        config = layer.get_config()
+        if type(layer).__name__ == 'Resizing' and (config['height'], config['width']) == (size, size):
+            continue
+        if type(layer).__name__ == 'Rescaling':
+            rescaling = layer
+            continue
+        weights = layer.get_weights()
+        if rescaling is not None:
+            folded = _fold_rescaling(layer, weights, rescaling.scale, rescaling.offset) if weights else None
+            if folded is None:
+                x = type(rescaling).from_config(rescaling.get_config())(x)
+            else:
+                weights = folded
+            rescaling = None
+        clone = type(layer).from_config(config)
+        x = clone(x)
+        clone.set_weights(weights)
+    if rescaling is not None:
+        x = type(rescaling).from_config(rescaling.get_config())(x)
+    return tf.keras.Model(inputs, x, name='serving')
+
+
+def serving_signatures(model, size=IMAGE_SIZE):
+    """``serving_default`` on uint8 pixels and ``serving_bytes`` on encoded images.
+
+    ``serving_bytes`` takes a batch of JPEG or PNG files as strings and
+    decodes (JPEGs at reduced scale), resizes and runs them all inside
+    the graph, so the work happens on TensorFlow's thread pools rather than
+    under the GIL.  Both return ``{'probabilities': (batch, classes)}``.
+    """
+    import tensorflow as tf
+
+    @tf.function(input_signature=[tf.TensorSpec([None, size, size, 3], tf.uint8, name='image')])
+    def serving_default(image):
+        return {'probabilities': model(image, training=False)}
+
+    def decode_jpeg(data):
+        # DCT scaling as in preprocess.open_image: the smallest of 1/1, 1/2, 1/4
+        # and 1/8 that still covers size x size
+        shape = tf.image.extract_jpeg_shape(data)
+        shortest = tf.cast(tf.minimum(shape[0], shape[1]), tf.float32)
+        halvings = tf.clip_by_value(tf.cast(tf.math.floor(tf.math.log(shortest / size) / tf.math.log(2.)), tf.int32), 0, 3)
+        return tf.switch_case(halvings, [lambda ratio=ratio: tf.io.decode_jpeg(data, channels=3, ratio=ratio)
+                                         for ratio in (1, 2, 4, 8)])
+
+    def decode(data):
+        image = tf.cond(tf.io.is_jpeg(data), lambda: decode_jpeg(data),
+                        lambda: tf.io.decode_image(data, channels=3, expand_animations=False))
+        image = tf.image.resize(image, (size, size), antialias=True)
+        return tf.cast(tf.clip_by_value(tf.round(image), 0, 255), tf.uint8)
+
+    @tf.function(input_signature=[tf.TensorSpec([None], tf.string, name='images')])
+    def serving_bytes(images):
+        pixels = tf.map_fn(decode, images, fn_output_signature=tf.TensorSpec([size, size, 3], tf.uint8),
+                           parallel_iterations=32)
+        return {'probabilities': model(pixels, training=False)}
+
+    return {'serving_default': serving_default, 'serving_bytes': serving_bytes}
+
+
+def save_version(model, models_dir, metadata, version=None, signatures=None):
+    """Save ``model`` as the next (or the given) version and record ``metadata`` with it."""
+    version = version or next_version(models_dir)
+    path = os.path.join(models_dir, str(version))
+    model.save(path, signatures=signatures)
+    metadata = dict(metadata, version=version, size_bytes=directory_bytes(path))
+    write_metadata(path, metadata)
+    return path, metadata
+
+
+def write_metadata(path, metadata):
+    os.makedirs(os.path.join(path, METADATA_DIR), exist_ok=True)
+    with open(os.path.join(path, METADATA_DIR, 'model.json'), 'w') as f:
+        json.dump(metadata, f, indent=2)
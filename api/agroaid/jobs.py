@@ -0,0 +1,231 @@
+"""Durable batch classification jobs.
+
+A job is a set of images spooled to disk plus one SQLite row per image.
+Workers claim pending images in batches across all jobs, run them through
+the model together and write each result back to its row, so a job
+survives restarts and any number of worker threads or processes can share
+the queue.  A claim that isn't completed within ``lease`` seconds (the
+worker died) goes back to the queue.
+
+Configured from the environment:
+
+    AGRO_AID_JOBS_DB     SQLite file (default jobs.db)
+    AGRO_AID_JOB_SPOOL   directory for uploaded images (default job_spool)
+"""
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+
+from agroaid.batch import classify_decoded, decode_file
+
+JOBS_DB_PATH = os.environ.get('AGRO_AID_JOBS_DB', 'jobs.db')
+SPOOL_DIR = os.environ.get('AGRO_AID_JOB_SPOOL', 'job_spool')
+
+log = logging.getLogger(__name__)
+
+SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        status TEXT,
+        created REAL,
+        finished REAL,
+        total INTEGER
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS job_items (
+        job_id TEXT,
+        seq INTEGER,
+        name TEXT,
+        path TEXT,
+        status TEXT,
+        claimed REAL,
+        result TEXT,
+        PRIMARY KEY (job_id, seq)
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS job_items_status ON job_items (status, claimed)',
+]
+
+
+class JobStore:
+    def __init__(self, path=JOBS_DB_PATH, spool_dir=SPOOL_DIR):
+        self.path = path
+        self.spool_dir = spool_dir
+        self._local = threading.local()
+        conn = self._connection()
+        for statement in SCHEMA:
+            conn.execute(statement)
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    def _transaction(self, statements):
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            result = statements(conn)
+            conn.execute('COMMIT')
+            return result
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def create_job(self, sources, max_items=None):
+        """Spool ``(name, file_object)`` pairs to disk and queue them as one job.
+
+        The job only becomes visible to workers once every image is on disk.
+        """
+        job_id = uuid.uuid4().hex
+        job_dir = os.path.join(self.spool_dir, job_id)
+        os.makedirs(job_dir)
+        items = []
+        try:
+            for seq, (name, fileobj) in enumerate(sources):
+                if max_items is not None and seq >= max_items:
+                    raise ValueError(f"a job may contain at most {max_items} images")
+                path = os.path.join(job_dir, f"{seq:07d}{os.path.splitext(name)[1].lower()}")
+                with open(path, 'wb') as f:
+                    shutil.copyfileobj(fileobj, f, 1024 * 1024)
+                items.append((job_id, seq, name, path, 'pending'))
+            if not items:
+                raise ValueError("no images found in the upload")
+        except BaseException:
+            shutil.rmtree(job_dir, ignore_errors=True)
+            raise
+
+        def insert(conn):
+            conn.execute('INSERT INTO jobs (id, status, created, total) VALUES (?, ?, ?, ?)',
+                         (job_id, 'queued', time.time(), len(items)))
+            conn.executemany('INSERT INTO job_items (job_id, seq, name, path, status) VALUES (?, ?, ?, ?, ?)', items)
+
+        self._transaction(insert)
+        return job_id, len(items)
+
+    def get_job(self, job_id):
+        conn = self._connection()
+        row = conn.execute('SELECT status, created, finished, total FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        if row is None:
+            return None
+        counts = dict(conn.execute('SELECT status, COUNT(*) FROM job_items WHERE job_id = ? GROUP BY status',
+                                   (job_id,)).fetchall())
+        status, created, finished, total = row
+        if status != 'done' and (counts.get('running') or counts.get('done') or counts.get('error')):
+            status = 'running'
+        return {
+            'job_id': job_id,
+            'status': status,
+            'total': total,
+            'done': counts.get('done', 0) + counts.get('error', 0),
+            'errors': counts.get('error', 0),
+            'pending': counts.get('pending', 0) + counts.get('running', 0),
+            'created': created,
+            'finished': finished,
+        }
+
+    def claim(self, limit, lease=300.0):
+        """Claim up to ``limit`` pending images, oldest job first: ``[(job_id, seq, name, path)]``."""
+        now = time.time()
+
+        def take(conn):
+            rows = conn.execute(
+                "SELECT job_id, seq, name, path FROM job_items WHERE status = 'pending' "
+                "OR (status = 'running' AND claimed < ?) ORDER BY rowid LIMIT ?", (now - lease, limit)).fetchall()
+            conn.executemany("UPDATE job_items SET status = 'running', claimed = ? WHERE job_id = ? AND seq = ?",
+                             [(now, job_id, seq) for job_id, seq, _, _ in rows])
+            return rows
+
+        return self._transaction(take)
+
+    def complete(self, results):
+        """Store ``[(job_id, seq, result_dict)]`` and close jobs that have nothing left."""
+        now = time.time()
+
+        def store(conn):
+            conn.executemany("UPDATE job_items SET status = ?, result = ? WHERE job_id = ? AND seq = ?",
+                             [('error' if 'error' in result else 'done', json.dumps(result), job_id, seq)
+                              for job_id, seq, result in results])
+            for job_id in {job_id for job_id, _, _ in results}:
+                conn.execute("UPDATE jobs SET status = 'done', finished = ? WHERE id = ? AND NOT EXISTS "
+                             "(SELECT 1 FROM job_items WHERE job_id = ? AND status IN ('pending', 'running'))",
+                             (now, job_id, job_id))
+
+        self._transaction(store)
+
+    def iter_results(self, job_id, chunk=500):
+        """Yield finished results in submission order, ``chunk`` rows per query."""
+        last = -1
+        while True:
+            # Streaming responses may resume this generator on a different thread
+            rows = self._connection().execute("SELECT seq, result FROM job_items WHERE job_id = ? AND status IN ('done', 'error') "
+                                "AND seq > ? ORDER BY seq LIMIT ?", (job_id, last, chunk)).fetchall()
+            if not rows:
+                return
+            for seq, result in rows:
+                yield json.loads(result)
+            last = rows[-1][0]
+
+    def delete_job(self, job_id):
+        def delete(conn):
+            conn.execute('DELETE FROM job_items WHERE job_id = ?', (job_id,))
+            return conn.execute('DELETE FROM jobs WHERE id = ?', (job_id,)).rowcount
+
+        deleted = self._transaction(delete)
+        shutil.rmtree(os.path.join(self.spool_dir, job_id), ignore_errors=True)
+        return bool(deleted)
+
+
+class JobWorker:
+    """Claim a batch of images, classify them in one forward pass, store the results, repeat."""
+
+    def __init__(self, store, model, batch_size=32, lease=300.0, idle_sleep=0.5):
+        self.store = store
+        self.model = model
+        self.batch_size = batch_size
+        self.lease = lease
+        self.idle_sleep = idle_sleep
+
+    def run_once(self):
+        claimed = self.store.claim(self.batch_size, self.lease)
+        if not claimed:
+            return 0
+        chunk = [decode_file(path) for _, _, _, path in claimed]
+        rows = classify_decoded(chunk, self.model)
+        results = []
+        for (job_id, seq, name, _), row in zip(claimed, rows):
+            row['path'] = name
+            results.append((job_id, seq, {'seq': seq, **row}))
+        self.store.complete(results)
+        for _, _, _, path in claimed:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        return len(claimed)
+
+    def run(self, stop_event):
+        while not stop_event.is_set():
+            try:
+                if not self.run_once():
+                    stop_event.wait(self.idle_sleep)
+            except Exception:
+                log.exception("job worker failed")
+                stop_event.wait(self.idle_sleep)
+
+
+def start_workers(store, model, count=1, batch_size=32):
+    stop_event = threading.Event()
+    for i in range(count):
+        worker = JobWorker(store, model, batch_size)
+        threading.Thread(target=worker.run, args=(stop_event,), name=f'job-worker-{i}', daemon=True).start()
+    return stop_event
@@ -0,0 +1,249 @@
+"""Minimal Prometheus-style metrics with text exposition.
+
+Only what the inference paths need: counters, gauges and histograms with
+optional labels.  Each update is a dict lookup, a bisect and a short lock,
+well under a microsecond; benchmarks/metrics_overhead.py measures the
+per-request total for /predict.
+"""
+import threading
+import time
+from bisect import bisect_left
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _default(self):
+        return self._children[()]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self._children.items()):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+
+class _CounterChild:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self._default().inc(amount)
+
+    def _render_child(self, values, child):
+        return [f"{self.name}_total{_format_labels(self.labelnames, values)} {_format_value(child.value)}"]
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    def set(self, value):
+        with self._lock:
+            self.value = value
+
+    def track_inprogress(self):
+        return _InProgress(self)
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def inc(self, amount=1):
+        self._default().inc(amount)
+
+    def dec(self, amount=1):
+        self._default().dec(amount)
+
+    def set(self, value):
+        self._default().set(value)
+
+    def track_inprogress(self):
+        return self._default().track_inprogress()
+
+    def _render_child(self, values, child):
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"]
+
+
+class _InProgress:
+    __slots__ = ('gauge',)
+
+    def __init__(self, gauge):
+        self.gauge = gauge
+
+    def __enter__(self):
+        self.gauge.inc()
+
+    def __exit__(self, *exc):
+        self.gauge.dec()
+        return False
+
+
+class _Timer:
+    # A plain class rather than @contextmanager: no generator per request
+    __slots__ = ('histogram', 'errors', 'start')
+
+    def __init__(self, histogram, errors=None):
+        self.histogram = histogram
+        self.errors = errors
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start)
+        if exc_type is not None and self.errors is not None:
+            self.errors.inc()
+        return False
+
+
+class _HistogramChild:
+    __slots__ = ('bounds', 'counts', 'sum', '_lock')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def time(self, errors=None):
+        return _Timer(self, errors)
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS, registry=None):
+        self.bounds = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.bounds)
+
+    def observe(self, value):
+        self._default().observe(value)
+
+    def time(self):
+        return self._default().time()
+
+    def _render_child(self, values, child):
+        with child._lock:
+            counts, total = list(child.counts), child.sum
+        lines, cumulative = [], 0
+        for bound, count in zip(self.bounds + (float('inf'),), counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, values, [('le', _format_value(float(bound)))])
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Inference metrics shared by the API and the batch paths
+STAGE_SECONDS = Histogram('agroaid_stage_seconds', 'Time spent per request stage.', ['stage'])
+PREDICTIONS = Counter('agroaid_predictions', 'Predictions served, by predicted class.', ['class'])
+IMAGE_MEGAPIXELS = Histogram('agroaid_image_megapixels', 'Decoded upload size in megapixels.',
+                             buckets=(0.07, 0.25, 0.5, 1, 2, 4, 8, 12, 16, 24, 48))
+UPLOAD_BYTES = Histogram('agroaid_upload_bytes', 'Encoded upload size in bytes.',
+                         buckets=(16e3, 64e3, 256e3, 1e6, 2e6, 4e6, 8e6, 16e6, 32e6))
+DECODE_BYTES = Histogram('agroaid_decode_bytes', 'Pixel memory decoded per request, in bytes.',
+                         buckets=(256e3, 1e6, 4e6, 16e6, 64e6, 256e6))
+IN_FLIGHT = Gauge('agroaid_requests_in_flight', 'Prediction requests currently being handled.')
+ERRORS = Counter('agroaid_errors', 'Failed requests, by the stage that failed.', ['stage'])
+QUEUE_DEPTH = Gauge('agroaid_queue_depth', 'Prediction requests waiting for a slot.')
+REJECTED = Counter('agroaid_rejected', 'Requests turned away before classification, by reason.', ['reason'])
+FIRST_RESULT_SECONDS = Histogram('agroaid_batch_first_result_seconds',
+                                 'Time from a batch request arriving to its first result being ready.')
+CASCADE_IMAGES = Counter('agroaid_cascade_images', 'Images through the model cascade, by the model that answered.',
+                         ['model'])
+TILES = Counter('agroaid_tiles', 'Windows seen by tiled inference, by whether they were classified or skipped.',
+                ['outcome'])
+COALESCED = Counter('agroaid_coalesced', 'Prediction requests answered by an identical request already in flight.')
+DEDUP_LOOKUPS = Counter('agroaid_dedup_lookups', 'Near-duplicate cache lookups, by result.', ['result'])
+DEDUP_VERIFIED = Counter('agroaid_dedup_verified',
+                         'Near-duplicate cache hits re-checked by the model, by whether the class agreed.',
+                         ['agreed'])
+
+
+def time_stage(stage):
+    """Time one stage into STAGE_SECONDS and count it in ERRORS if it raises."""
+    return STAGE_SECONDS.labels(stage).time(ERRORS.labels(stage))
@@ -0,0 +1,104 @@
+import os
+import threading
+
+import numpy as np
+
+from agroaid.export import latest_version
+
+CLASS_NAMES = ["Early Blight", "Late Blight", "Healthy"]
+
+# The newest serving export (api/export_serving.py) when there is one, else
+# the notebook's model
+saved_model_path = (os.environ.get("AGRO_AID_MODEL_PATH") or latest_version("models", "serving")
+                    or "models/1")
+
+def class_from_path(path):
+    """Class index from a PlantVillage-style parent folder (Potato___Early_blight, ...), or None."""
+    folder = os.path.basename(os.path.dirname(path)).lower()
+    for index, name in enumerate(CLASS_NAMES):
+        if name.split()[0].lower() in folder:
+            return index
+    return None
+
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def load_model(path=saved_model_path):
+    # TensorFlow is only imported, and the model only loaded, the first time
+    # a page or endpoint actually needs a prediction
+    model = _models.get(path)
+    if model is None:
+        with _models_lock:
+            model = _models.get(path)
+            if model is None:
+                if not os.path.exists(path):
+                    raise FileNotFoundError(f"SavedModel directory '{path}' does not exist.")
+                import tensorflow as tf
+                model = _models[path] = tf.keras.models.load_model(path)
+    return model
+
+
+def encoded_signature(model):
+    """The in-graph decoding signature of a serving export (see export.serving_signatures), or None."""
+    signatures = getattr(model, 'signatures', None)
+    return signatures.get('serving_bytes') if signatures is not None else None
+
+
+def predict_encoded(signature, images):
+    """Probabilities for a list of encoded JPEG or PNG files, decoded by ``signature``."""
+    import tensorflow as tf
+
+    return signature(images=tf.constant(images, tf.string))['probabilities'].numpy()
+
+
+# Test-time augmentation views, identity first.  These are the flips and
+# right-angle turns from the training notebook's RandomFlip and
+# RandomRotation that need no interpolation: the eight symmetries of a square.
+TTA_VIEWS = (
+    lambda image: image,
+    lambda image: image[:, ::-1],
+    lambda image: image[::-1],
+    lambda image: image[::-1, ::-1],
+    lambda image: np.rot90(image, 1),
+    lambda image: np.rot90(image, 3),
+    lambda image: image.transpose(1, 0, 2),
+    lambda image: image[::-1, ::-1].transpose(1, 0, 2),
+)
+MAX_TTA = len(TTA_VIEWS)
+
+
+def tta_batch(images, views, out=None):
+    """The first ``views`` TTA_VIEWS of every square image in ``images``, image-major.
+
+    ``out`` may be a batch buffer whose first row is ``images[0]`` itself.
+    """
+    if not 1 <= views <= MAX_TTA:
+        raise ValueError(f"TTA views must be between 1 and {MAX_TTA}, got {views}")
+    if out is None:
+        out = np.empty((len(images) * views,) + images.shape[1:], images.dtype)
+    # Backwards so an image's own row is overwritten only after its other views are taken
+    for i in range(len(images) - 1, -1, -1):
+        for j in range(views - 1, -1, -1):
+            out[i * views + j] = TTA_VIEWS[j](images[i])
+    return out
+
+
+def average_views(predictions, views):
+    predictions = np.asarray(predictions)
+    return predictions.reshape(-1, views, predictions.shape[-1]).mean(axis=1)
+
+
+def predict_batch(images, model=None, tta=1):
+    model = model or load_model()
+    if tta > 1:
+        predictions = average_views(model.predict(tta_batch(np.asarray(images), tta)), tta)
+    else:
+        predictions = model.predict(images)
+    indices = np.argmax(predictions, axis=1)
+    return [(CLASS_NAMES[index], float(row[index])) for index, row in zip(indices, predictions)]
+
+
+def predict(image, model=None, tta=1):
+    return predict_batch(np.expand_dims(image, 0), model, tta)[0]
@@ -0,0 +1,32 @@
+import importlib
+
+# Page key -> (sidebar title, module, render function).  Modules are only
+# imported the first time their page is opened, so a page nobody visits
+# costs nothing, and whatever it imports is never loaded either.
+PAGES = {
+    'home': ('Home', 'agroaid.pages.home', 'render'),
+    'recognition': ('Disease Recognition', 'agroaid.pages.recognition', 'render'),
+    'treatment': ('Treatment', 'agroaid.pages.treatment', 'render'),
+    'news': ('News Updates', 'agroaid.pages.news', 'render'),
+    'about': ('About', 'agroaid.pages.about', 'render'),
+    'alarm': ('Plant Care Reminder', 'agroaid.pages.reminders', 'render_alarm'),
+    'reminder': ('Plant Care Reminder', 'agroaid.pages.reminders', 'render_reminder'),
+    'leaderboard': ('Leaderboard', 'agroaid.pages.leaderboard', 'render'),
+    'create_account': ('Create Account', 'agroaid.pages.account', 'render_create_account'),
+    'log_in': ('Log In', 'agroaid.pages.account', 'render_log_in'),
+    'log_out': ('Log Out', 'agroaid.pages.account', 'render_log_out'),
+    'delete_account': ('Delete Account', 'agroaid.pages.account', 'render_delete_account'),
+}
+
+
+def register_page(key, title, module, function='render'):
+    PAGES[key] = (title, module, function)
+
+
+def page_title(key):
+    return PAGES[key][0]
+
+
+def load_page(key):
+    _, module, function = PAGES[key]
+    return getattr(importlib.import_module(module), function)
@@ -0,0 +1,50 @@
+import streamlit as st
+
+from agroaid import db
+from agroaid.context import get_logged_in_username, is_user_logged_in
+
+TEAM_MEMBERS = [
+    {"name": "Sayantika Roy", "role": "Streamlit App and GUI Developer", "description": "Sayantika is a wizard when it comes to crafting beautiful and intuitive user interfaces. With her expertise in Streamlit and GUI development, she ensures that our users have a seamless and delightful experience."},
+    {"name": "Sherly Shindal", "role": "Main Logic Code Developer", "description": "Sherly is the brain behind the logic that powers our system. She dives deep into algorithms and data structures, ensuring that our system functions flawlessly and efficiently."},
+    {"name": "Esha Tuscano", "role": "Documentation and Jupyter Notebook Developer", "description": "Esha is our wordsmith and documentarian. She meticulously documents our project and provides insightful Jupyter Notebooks, guiding users through the intricacies of our work."},
+    {"name": "Anna George", "role": "Documentation and Feature Developer", "description": "Anna is our visionary who sees opportunities for growth and improvement everywhere. She focuses on enhancing our project with new features and ensures that our documentation is clear and comprehensive."},
+]
+
+
+def render(ctx):
+    st.title(ctx.t('About'))
+    st.write(ctx.t("Learn more about the project, our team, and our goals on this page."))
+
+    if ctx.variant.team_section:
+        st.header(ctx.t("Meet Our Team"))
+        for member in TEAM_MEMBERS:
+            st.subheader(member["name"])
+            st.write(f"**{ctx.t('Role')}:** {ctx.t(member['role'])}")
+            st.write(f"**{ctx.t('Description')}:** {ctx.t(member['description'])}")
+            st.write("")  # Add some space between team members
+
+    if ctx.variant.feedback:
+        render_feedback(ctx)
+
+
+def render_feedback(ctx):
+    feedback_expander = st.expander(ctx.t("Feedback"))
+    if ctx.variant.feedback_requires_login and not is_user_logged_in():
+        feedback_expander.error(ctx.t('Please log in to submit feedback.'))
+        return
+
+    with feedback_expander:
+        if is_user_logged_in():
+            feedback_username = get_logged_in_username()
+        else:
+            feedback_username = st.text_input(ctx.t("Username"))
+        feedback_message = st.text_area(ctx.t("Feedback Message"))
+        feedback_rating = st.slider(ctx.t("Rating"), min_value=1, max_value=5)
+        feedback_type = st.selectbox(ctx.t("Feedback Type"), ['General Feedback', 'Bug/Error', 'Critical Feedback'], format_func=ctx.t)
+
+        if st.button(ctx.t("Submit Feedback")):
+            try:
+                db.add_feedback(ctx.conn, feedback_username, feedback_message, feedback_rating, feedback_type)
+                st.success(ctx.t("Feedback submitted successfully!"))
+            except Exception as e:
+                st.error(f"Error: {str(e)}")
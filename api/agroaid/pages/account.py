@@ -0,0 +1,61 @@
+import streamlit as st
+
+from agroaid import db
+from agroaid.context import get_logged_in_username, is_user_logged_in
+
+
+def render_create_account(ctx):
+    st.title(ctx.t('Create Account'))
+    new_username = st.text_input(ctx.t("New Username"))
+    new_password = st.text_input(ctx.t("New Password"), type="password")
+
+    if st.button(ctx.t("Create Account")):
+        try:
+            if db.user_exists(ctx.conn, new_username):
+                st.error(ctx.t("Username already exists. Please choose another one."))
+            else:
+                db.create_profile(ctx.conn, new_username, new_password, ctx.variant.track_tasks)
+                st.success(ctx.t("Account created successfully! Please login."))
+        except Exception as e:
+            st.error(f"Error: {str(e)}")
+
+
+def render_log_in(ctx):
+    st.title(ctx.t('Log In'))
+    username = st.text_input(ctx.t("Username"))
+    password = st.text_input(ctx.t("Password"), type="password")
+
+    if st.button(ctx.t("Log In")):
+        try:
+            if db.check_login(ctx.conn, username, password):
+                st.session_state.username = username
+                st.success(ctx.t(f"Welcome, {username}! Logged in successfully!"))
+            else:
+                st.error(ctx.t("Invalid username or password. Please try again."))
+        except Exception as e:
+            st.error(f"Error: {str(e)}")
+
+
+def render_log_out(ctx):
+    st.title(ctx.t('Log Out'))
+    if is_user_logged_in():
+        st.session_state.pop('username')
+        st.success(ctx.t("Logged out successfully!"))
+    else:
+        st.warning(ctx.t("You are not logged in."))
+
+
+def render_delete_account(ctx):
+    st.title(ctx.t('Delete Account'))
+    if not is_user_logged_in():
+        st.warning(ctx.t("You are not logged in."))
+        return
+
+    st.write(ctx.t("Are you sure you want to delete your account? This action cannot be undone."))
+    if st.checkbox(ctx.t("Yes, I want to delete my account.")):
+        try:
+            db.delete_profile(ctx.conn, get_logged_in_username(), ctx.variant.track_tasks)
+            st.success(ctx.t("Account deleted successfully!"))
+            st.session_state.pop('username')
+        except Exception as e:
+            st.error(f"Error: {str(e)}")
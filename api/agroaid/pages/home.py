@@ -0,0 +1,33 @@
+import streamlit as st
+
+
+def render(ctx):
+    st.markdown("# " + ctx.t('🌿 Agro-Aid! 🔍'))
+    st.markdown(ctx.t("""
+    Our mission is to help in identifying plant diseases efficiently. 
+    Upload an image of a plant, and our system will analyze it to detect any signs of diseases. 
+    Together, let's protect our crops and ensure a healthier harvest! 🌾🌽
+    """))
+
+    with st.expander(ctx.t("🔬 How It Works")):
+        st.markdown(ctx.t("""
+        1. **Upload Image:** Go to the **Disease Recognition** page and upload an image of a plant with suspected diseases. 📸
+                                                
+        2. **Analysis:** Our system will process the image using advanced algorithms to identify potential diseases. 🧠
+                                                
+        3. **Results:** View the results and recommendations for further action. 📊
+        """))
+
+    with st.expander(ctx.t("🏆 Why Choose Us?")):
+        st.markdown(ctx.t("""
+        - **Accuracy:** Our system utilizes state-of-the-art machine learning techniques for accurate disease detection. 🎯
+                                                  
+        - **User-Friendly:** Simple and intuitive interface for seamless user experience. 👥
+                                                  
+        - **Fast and Efficient:** Receive results in seconds, allowing for quick decision-making. ⏱️
+        """))
+
+    with st.expander(ctx.t("🚀 Get Started")):
+        st.markdown(ctx.t("""
+        Click on the **Disease Recognition** page in the sidebar to upload an image and experience the power of our Plant Disease Recognition System! 💪
+        """))
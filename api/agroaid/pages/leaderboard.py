@@ -0,0 +1,22 @@
+import streamlit as st
+
+from agroaid import db
+
+
+def render(ctx):
+    st.title(ctx.t('Leaderboard'))
+    leaderboard_data = db.leaderboard(ctx.conn, ctx.variant.leaderboard_size)
+    if not leaderboard_data:
+        st.write(ctx.t("Leaderboard is empty. No tasks completed yet."))
+        return
+
+    from tabulate import tabulate
+
+    st.markdown("## " + ctx.t("Top Performers") + " 🏆")
+    st.write("")
+    st.write(ctx.t("Here are the top performers based on tasks completed:"))
+    st.write("")
+
+    table_data = [(i + 1, username, tasks_completed) for i, (username, tasks_completed) in enumerate(leaderboard_data)]
+    headers = [ctx.t("Rank"), ctx.t("Username"), ctx.t("Tasks Completed")]
+    st.code(tabulate(table_data, headers=headers, tablefmt="plain"), language="")
@@ -0,0 +1,22 @@
+import streamlit as st
+
+NEWS = {
+    'reference': [
+        {"title": "Potato News Today – No-nonsense, no-frills potato news stories from around the world", "link": "https://www.potatonewstoday.com/"},
+        {"title": "Potato Disease Identification", "link": "https://potatoes.ahdb.org.uk/knowledge-library/potato-disease-identification"},
+        {"title": "Plantura Magazine", "link": "https://plantura.garden/uk/vegetables/potatoes/potato-diseases"},
+        {"title": "Cornell Vegetables", "link": "https://www.vegetables.cornell.edu/pest-management/disease-factsheets/detection-of-potato-tuber-diseases-defects/"},
+    ],
+    'industry': [
+        {"title": "Potato News Today – No-nonsense, no-frills potato news stories from around the world", "link": "https://www.potatonewstoday.com/"},
+        {"title": "HyFun Foods to invest Rs 850 crore for three potato processing plants in Gujarat", "link": "https://www.thehindubusinessline.com/companies/hyfun-foods-to-invest-rs-850-crore-for-three-potato-processing-plants-in-gujarat/article37185989.ece"},
+        {"title": "\"Pomato\": Farmer's New Technique Of Growing Potatoes And Tomatoes On One Plant", "link": "https://www.ndtv.com/offbeat/pomato-farmers-new-technique-of-growing-potatoes-and-tomatoes-on-one-plant-see-viral-tweet-2617625"},
+        {"title": "Big increase in United States potato crop expected", "link": "https://www.freshplaza.com/article/9366388/big-increase-in-united-states-potato-crop-expected/"},
+    ],
+}
+
+
+def render(ctx):
+    st.title(ctx.t('News Updates'))
+    for news in NEWS[ctx.variant.news]:
+        st.markdown(f"[{news['title']}]({news['link']})")
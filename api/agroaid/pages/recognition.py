@@ -0,0 +1,31 @@
+import streamlit as st
+
+from agroaid.context import is_user_logged_in
+from agroaid.model import predict
+from agroaid.preprocess import ImageRejected, load_image, open_image
+
+
+def render(ctx):
+    st.title(ctx.t('Disease Recognition'))
+    if ctx.variant.recognition_requires_login and not is_user_logged_in():
+        st.error(ctx.t('Please log in to use Disease Recognition.'))
+        return
+
+    if ctx.variant.multiple_uploads:
+        uploaded_files = st.file_uploader(ctx.t("Upload your images"), type="jpg", accept_multiple_files=True)
+    else:
+        uploaded_file = st.file_uploader(ctx.t("Upload your image"), type="jpg")
+        uploaded_files = [uploaded_file] if uploaded_file is not None else []
+
+    for idx, uploaded_file in enumerate(uploaded_files, 1):
+        try:
+            image, _ = open_image(uploaded_file, (1024, 1024))
+        except ImageRejected as e:
+            st.error(ctx.t(f'Image {idx} is too large: {e}'))
+            continue
+        st.image(image, caption=ctx.t(f'Uploaded Image {idx}.'), use_column_width=True)
+        if st.button(ctx.t(f'Predict Image {idx}')):
+            st.write(ctx.t(f"Predicting for Image {idx}..."))
+            uploaded_file.seek(0)
+            predicted_class, confidence = predict(load_image(uploaded_file))
+            st.success(ctx.t(f"Class: {predicted_class}, Confidence: {confidence * 100:.2f}%"))
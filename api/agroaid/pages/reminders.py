@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+
+import streamlit as st
+
+from agroaid import db
+from agroaid.context import is_user_logged_in
+
+
+def render_alarm(ctx):
+    if not is_user_logged_in():
+        st.error(ctx.t('Please log in to access the Alarm page.'))
+        return
+
+    st.title(ctx.t('Alarm'))
+    username = st.text_input(ctx.t('Username'), help=ctx.t('Enter your username'))
+    task = st.text_input(ctx.t('Task'), help=ctx.t('Enter the task related to plants'))
+    plant_name = st.text_input(ctx.t('Plant Name'), help=ctx.t('Enter the name of the plant'))
+    date = st.date_input(ctx.t('Set Alarm Date'), value=datetime.today())
+    # Users can replace the default with their desired time in HH:MM:SS format
+    alarm_time_str = st.text_input(ctx.t('Set Alarm Time (HH:MM:SS)'), value='08:00:00')
+
+    try:
+        alarm_time = datetime.strptime(alarm_time_str, '%H:%M:%S').time()
+    except ValueError:
+        st.error(ctx.t('Invalid time format. Please enter time in HH:MM:SS format.'))
+        return
+
+    if st.button(ctx.t('Set Alarm')):
+        from agroaid.scheduling import set_alarm
+        set_alarm(username, task, plant_name, date, alarm_time, ctx.variant.track_tasks)
+        st.success(ctx.t('Alarm set successfully!'))
+
+
+def render_reminder(ctx):
+    st.title(ctx.t('Plant Care Reminder'))
+    username = st.text_input(ctx.t("Username"))
+    task = st.text_input(ctx.t("Task"))
+    reminder_date = st.date_input(ctx.t("Date"), min_value=datetime.now())
+    reminder_time_hour = st.number_input(ctx.t("Hour"), min_value=0, max_value=23)
+    reminder_time_minute = st.number_input(ctx.t("Minute"), min_value=0, max_value=59)
+    frequency = st.selectbox(ctx.t("Frequency"), ['Once', 'Daily', 'Weekly', 'Monthly'], format_func=ctx.t)
+    plants = st.text_input(ctx.t("Plants"))
+
+    if st.button(ctx.t("Set Reminder")):
+        try:
+            reminder_time = timedelta(hours=reminder_time_hour, minutes=reminder_time_minute)
+            reminder_time_str = "{:02}:{:02}".format(reminder_time.seconds // 3600, (reminder_time.seconds // 60) % 60)
+            db.add_reminder(ctx.conn, username, task, reminder_date, reminder_time_str, frequency, plants)
+            st.success(ctx.t("Reminder set successfully!"))
+        except ValueError:
+            st.error(ctx.t("Invalid time input. Please enter a valid time."))
@@ -0,0 +1,25 @@
+import streamlit as st
+
+TREATMENTS = {
+    'Early Blight': ("""
+        ### Early Blight Treatment
+        1. **Fungicides:** Apply fungicides to protect plants, especially during periods of frequent rainfall.
+        2. **Proper Spacing:** Space plants properly to improve air circulation and allow foliage to dry quickly.
+        3. **Crop Rotation:** Practice crop rotation with non-host crops to reduce the disease inoculum in the soil.
+        """, "https://shasyadhara.com/early-blight-of-potato-cause-symptoms-and-control/"),
+    'Late Blight': ("""
+        ### Late Blight Treatment
+        1. **Fungicides:** Use fungicides as a preventive measure before the disease appears.
+        2. **Destroy Infected Plants:** Remove and destroy all infected plants to prevent the spread of the disease.
+        3. **Resistant Varieties:** Plant resistant varieties if they are available.
+        """, "https://krishijagran.com/agripedia/late-blight-of-potato-complete-management-strategy-for-this-deadly-disease/"),
+}
+
+
+def render(ctx):
+    st.title(ctx.t('Treatment'))
+    st.sidebar.title(ctx.t('Treatment'))
+    disease = st.sidebar.radio(ctx.t("Choose a disease"), list(TREATMENTS), format_func=ctx.t)
+    treatment, link = TREATMENTS[disease]
+    st.markdown(ctx.t(treatment))
+    st.markdown(ctx.t("For more information, visit: ") + link)
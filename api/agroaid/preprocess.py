@@ -0,0 +1,158 @@
+import math
+import os
+import threading
+from collections import namedtuple
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+# Spatial size the model was trained on, see the Resizing layer in the notebook
+IMAGE_SIZE = 256
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff', '.webp')
+
+# Decode guard.  Uploads are checked on size and header dimensions before
+# any pixel data is touched: past MAX_IMAGE_PIXELS nothing is decoded at
+# all, and an image is only decoded if it fits in MAX_DECODE_PIXELS after
+# JPEG downscaling, so one upload can't take more than a few tens of MB.
+MAX_UPLOAD_BYTES = int(os.environ.get('AGRO_AID_MAX_UPLOAD_BYTES', 25 * 1024 * 1024))
+MAX_IMAGE_PIXELS = int(os.environ.get('AGRO_AID_MAX_IMAGE_PIXELS', 100_000_000))
+MAX_DECODE_PIXELS = int(os.environ.get('AGRO_AID_MAX_DECODE_PIXELS', 16_000_000))
+
+# Pillow's own bomb check raises past twice this
+Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+
+DecodeInfo = namedtuple('DecodeInfo', 'original_size decoded_size decoded_bytes')
+
+
+class ImageRejected(ValueError):
+    """The upload is too large to decode safely."""
+
+
+def read_file_as_image(data) -> np.ndarray:
+    image = np.array(Image.open(BytesIO(data)))
+    return image
+
+
+def source_size(source):
+    """Size in bytes of a path, bytes object or file object, or None if it can't be told cheaply."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return len(source)
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.getsize(source)
+    try:
+        position = source.tell()
+        size = source.seek(0, os.SEEK_END)
+        source.seek(position)
+    except (AttributeError, OSError, ValueError):
+        return None
+    return size - position
+
+
+def open_image(source, target=(IMAGE_SIZE, IMAGE_SIZE), long_side=None):
+    """Open an image after checking it against the decode budget.
+
+    Only the header has been read when this returns ``(image, original_size)``.
+    JPEGs are set up to decode with DCT scaling to the smallest 1/2, 1/4 or
+    1/8 scale that still covers ``target``, or with ``long_side`` given,
+    that keeps the longer side at least that long.  Raises ImageRejected
+    for anything over budget.  A file object passed in is left open either
+    way; only a file opened here from a path is closed on rejection.
+    """
+    size = source_size(source)
+    if size is not None and size > MAX_UPLOAD_BYTES:
+        raise ImageRejected(f"upload is {size / 1e6:.1f} MB, the limit is {MAX_UPLOAD_BYTES / 1e6:.1f} MB")
+    try:
+        image = Image.open(source)
+    except Image.DecompressionBombError as e:
+        raise ImageRejected(str(e)) from None
+    width, height = image.size
+    if width * height > MAX_IMAGE_PIXELS:
+        # Unlike close(), leaving the with block only closes a file PIL opened itself
+        with image:
+            pass
+        raise ImageRejected(f"image is {width}x{height}, the limit is {MAX_IMAGE_PIXELS / 1e6:.0f} megapixels")
+    if long_side is not None:
+        scale = min(1.0, long_side / max(width, height))
+        target = (math.ceil(width * scale), math.ceil(height * scale))
+    if image.format == 'JPEG':
+        image.draft('RGB', target)
+    if image.size[0] * image.size[1] > MAX_DECODE_PIXELS:
+        with image:
+            pass
+        raise ImageRejected(f"{image.format} image is {width}x{height} and can't be downscaled while decoding; "
+                            f"the limit is {MAX_DECODE_PIXELS / 1e6:.0f} megapixels")
+    return image, (width, height)
+
+
+def decode_into(source, out):
+    """Decode a path or file object straight into ``out``, an (h, w, 3) uint8 array.
+
+    ``out`` is usually a row of batch_buffer, so no per-request pixel array
+    is allocated: the only copy left is unpacking PIL's 4-byte RGB pixels
+    of the resized image.  Returns a DecodeInfo.
+    """
+    height, width = out.shape[:2]
+    image, original_size = open_image(source, (width, height))
+    with image:
+        decoded_size = image.size
+        image = image.convert('RGB')
+        if image.size != (width, height):
+            image = image.resize((width, height), Image.BILINEAR)
+        # Cheaper than going through the array interface, which makes one more copy
+        out[...] = np.frombuffer(image.tobytes(), np.uint8).reshape(out.shape)
+    return DecodeInfo(original_size, decoded_size, decoded_size[0] * decoded_size[1] * 3 + out.nbytes)
+
+
+def decode_image(source, size=IMAGE_SIZE):
+    """Decode a path or file object to a ``size`` x ``size`` RGB uint8 array.
+
+    Goes through open_image, so JPEGs decode at reduced resolution and
+    oversized images are rejected before any pixels are decoded; everything
+    then gets one bilinear resize.  Returns ``(array, DecodeInfo)``.
+    """
+    array = np.empty((size, size, 3), np.uint8)
+    return array, decode_into(source, array)
+
+
+_buffers = threading.local()
+# Largest batch kept per thread: TTA views and a default /predict/batch chunk.
+# Larger ones get fresh memory, or a single big request would leave every
+# threadpool thread that served it holding tens of megabytes
+MAX_REUSED_BATCH = 16
+
+
+def batch_buffer(count, size=IMAGE_SIZE):
+    """A ``(count, size, size, 3)`` uint8 batch owned by the calling thread.
+
+    The same memory is handed out again on the thread's next call, so it
+    must be consumed (e.g. by the model) before then.  Batches over
+    MAX_REUSED_BATCH images are freshly allocated and not kept.
+    """
+    if count > MAX_REUSED_BATCH:
+        return np.empty((count, size, size, 3), np.uint8)
+    buffer = getattr(_buffers, 'array', None)
+    if buffer is None or len(buffer) < count or buffer.shape[1] != size:
+        buffer = _buffers.array = np.empty((count, size, size, 3), np.uint8)
+    return buffer[:count]
+
+
+def load_image(source, size=IMAGE_SIZE) -> np.ndarray:
+    # Decode to a fixed size so that images of any resolution can be stacked into one batch
+    return decode_image(source, size)[0]
+
+
+def is_image_file(path):
+    return path.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def iter_image_files(root):
+    if os.path.isfile(root):
+        yield root
+        return
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if is_image_file(filename):
+                yield os.path.join(dirpath, filename)
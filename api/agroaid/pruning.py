@@ -0,0 +1,105 @@
+"""Scheduled magnitude pruning of the notebook CNN with short fine-tuning.
+
+Every convolution and the hidden dense layer are wrapped with
+tensorflow-model-optimization's prune_low_magnitude; sparsity ramps up
+on a polynomial schedule while the model fine-tunes on the cached dataset
+(see agroaid.distillation.build_cache), then the wrappers are stripped so
+the result is a plain Keras model with zeros in its kernels.  The output
+layer is left dense: it is tiny and the most sensitive.
+
+Unstructured zeros don't make TensorFlow's dense CPU kernels faster; the
+gain is in compressed size, and in latency only on a runtime with sparse
+kernels.  The report measures both rather than assuming either.
+"""
+import gzip
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from agroaid.batch import batched
+
+
+def _tfmot():
+    try:
+        import tensorflow_model_optimization as tfmot
+    except ImportError:
+        raise ImportError("Pruning needs tensorflow-model-optimization: pip install tensorflow-model-optimization")
+    return tfmot
+
+
+def prune(model, images, labels, teacher_logits, indices, target_sparsity=0.75, epochs=4, batch_size=32,
+          learning_rate=1e-4, seed=0, log=print):
+    """Return a stripped, pruned copy of ``model``; ``model`` itself is left untouched."""
+    import tensorflow as tf
+    tfmot = _tfmot()
+
+    # Images without a folder label learn the teacher's top-1 as their label
+    hard = np.where(labels >= 0, labels, teacher_logits.argmax(axis=1)).astype(np.int32)
+    steps = int(np.ceil(len(indices) / batch_size))
+
+    def batches():
+        rng = np.random.default_rng(seed)
+        while True:
+            for chunk in batched(rng.permutation(indices), batch_size):
+                # Sorted so the memmap is read forwards
+                chunk = np.sort(chunk)
+                yield images[chunk].astype(np.float32), hard[chunk]
+
+    # Reach the target a little before the end so the last steps fine-tune at full sparsity
+    end_step = max(1, int(steps * epochs * 0.8))
+    schedule = tfmot.sparsity.keras.PolynomialDecay(initial_sparsity=0.0, final_sparsity=target_sparsity,
+                                                    begin_step=0, end_step=end_step, frequency=max(1, end_step // 20))
+
+    # prune_low_magnitude wraps the layer it is given, so work on a copy
+    copy = tf.keras.models.clone_model(model)
+    copy.set_weights(model.get_weights())
+    output_layer = copy.layers[-1]
+
+    def wrap(layer):
+        if isinstance(layer, (tf.keras.layers.Conv2D, tf.keras.layers.Dense)) and layer is not output_layer:
+            return tfmot.sparsity.keras.prune_low_magnitude(layer, pruning_schedule=schedule)
+        return layer
+
+    pruned = tf.keras.models.clone_model(copy, clone_function=wrap)
+    pruned.compile(optimizer=tf.keras.optimizers.Adam(learning_rate),
+                   loss=tf.keras.losses.SparseCategoricalCrossentropy(from_logits=False), metrics=['accuracy'])
+    pruned.fit(batches(), steps_per_epoch=steps, epochs=epochs, verbose=0, callbacks=[
+        tfmot.sparsity.keras.UpdatePruningStep(),
+        tf.keras.callbacks.LambdaCallback(on_epoch_end=lambda epoch, logs: log(
+            f"epoch {epoch + 1}/{epochs}: loss {logs['loss']:.4f}, accuracy {logs['accuracy']:.1%}")),
+    ])
+    return tfmot.sparsity.keras.strip_pruning(pruned)
+
+
+def layer_sparsity(model):
+    """``{layer name: fraction of zero kernel weights}`` for every layer with a kernel."""
+    sparsity = {}
+    for layer in model.layers:
+        kernel = getattr(layer, 'kernel', None)
+        if kernel is not None:
+            weights = kernel.numpy()
+            sparsity[layer.name] = float(np.mean(weights == 0))
+    return sparsity
+
+
+def compressed_bytes(path):
+    """Size of a SavedModel directory as a gzipped tar, which is what sparsity buys on disk and on the wire."""
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = shutil.make_archive(os.path.join(tmp, 'model'), 'tar', path)
+        with open(archive, 'rb') as f:
+            return len(gzip.compress(f.read(), 9))
+
+
+def cpu_latency(model, repeats=50):
+    """Median seconds for one 256x256 image through predict_on_batch."""
+    image = np.random.default_rng(0).integers(0, 256, (1, 256, 256, 3), dtype=np.uint8)
+    model.predict_on_batch(image)
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict_on_batch(image)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
@@ -0,0 +1,136 @@
+"""Per-client token-bucket rate limiting for the inference API.
+
+Clients are identified by API key when the key is known and by IP address
+otherwise, so inventing keys doesn't buy fresh buckets.  Each key maps to
+a priority class whose weight scales both the refill rate and the burst:
+with the default weights a partner integration refills ten times faster
+than an anonymous client but still has a ceiling.
+
+Configured from the environment:
+
+    AGRO_AID_RATE           tokens per second at weight 1 (default 0: no limiting)
+    AGRO_AID_BURST          bucket size at weight 1 (default 10)
+    AGRO_AID_RATE_CLASSES   class weights, e.g. "anonymous=1,member=3,partner=10"
+    AGRO_AID_API_KEYS       known keys and their class, e.g. "k1=partner,k2=member"
+    AGRO_AID_RATE_LIMIT_DB  SQLite file to share buckets between worker processes
+"""
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+DEFAULT_CLASSES = {'anonymous': 1.0, 'member': 3.0, 'partner': 10.0}
+
+Decision = namedtuple('Decision', 'allowed remaining retry_after limit priority')
+
+
+def refill(tokens, updated, now, rate, burst):
+    return min(burst, tokens + (now - updated) * rate)
+
+
+class MemoryStore:
+    """Buckets in a dict, evicting the least recently used past ``max_keys``."""
+
+    def __init__(self, max_keys=100_000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, cost, rate, burst, now):
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (burst, now))
+            tokens = refill(tokens, updated, now, rate, burst)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return allowed, tokens
+
+
+class SQLiteStore:
+    """Buckets in a SQLite table so several worker processes share one limit."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS rate_buckets (key TEXT PRIMARY KEY, tokens REAL, updated REAL)')
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')
+        return conn
+
+    def take(self, key, cost, rate, burst, now):
+        conn = self._connection()
+        # IMMEDIATE takes the write lock up front so two workers can't both spend the last token
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, updated FROM rate_buckets WHERE key = ?', (key,)).fetchone()
+            tokens = refill(*(row or (burst, now)), now, rate, burst)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            conn.execute('INSERT OR REPLACE INTO rate_buckets (key, tokens, updated) VALUES (?, ?, ?)',
+                         (key, tokens, now))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return allowed, tokens
+
+
+class RateLimiter:
+    def __init__(self, store=None, rate=0.0, burst=10.0, classes=None, api_keys=None):
+        self.store = store if store is not None else MemoryStore()
+        self.rate = rate
+        self.burst = burst
+        self.classes = dict(classes or DEFAULT_CLASSES)
+        self.api_keys = dict(api_keys or {})
+
+    @property
+    def enabled(self):
+        return self.rate > 0
+
+    def identify(self, api_key, client_ip):
+        """Return ``(bucket_key, priority_class)`` for a request."""
+        priority = self.api_keys.get(api_key) if api_key else None
+        if priority is not None:
+            return f'key:{api_key}', priority
+        return f'ip:{client_ip}', 'anonymous'
+
+    def check(self, api_key, client_ip, cost=1):
+        key, priority = self.identify(api_key, client_ip)
+        weight = self.classes.get(priority, 1.0)
+        rate, burst = self.rate * weight, self.burst * weight
+        allowed, tokens = self.store.take(key, cost, rate, burst, time.time())
+        retry_after = 0 if allowed else max(1, math.ceil((cost - tokens) / rate))
+        return Decision(allowed, int(tokens), retry_after, int(burst), priority)
+
+
+def parse_pairs(text, convert=str):
+    pairs = {}
+    for item in filter(None, (part.strip() for part in (text or '').split(','))):
+        name, _, value = item.partition('=')
+        pairs[name.strip()] = convert(value.strip())
+    return pairs
+
+
+def limiter_from_env():
+    path = os.environ.get('AGRO_AID_RATE_LIMIT_DB')
+    classes = dict(DEFAULT_CLASSES)
+    classes.update(parse_pairs(os.environ.get('AGRO_AID_RATE_CLASSES'), float))
+    return RateLimiter(
+        store=SQLiteStore(path) if path else MemoryStore(),
+        rate=float(os.environ.get('AGRO_AID_RATE', '0')),
+        burst=float(os.environ.get('AGRO_AID_BURST', '10')),
+        classes=classes,
+        api_keys=parse_pairs(os.environ.get('AGRO_AID_API_KEYS')),
+    )
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from agroaid import db
+
+
+def send_notification(message):
+    from plyer import notification
+
+    notification.notify(
+        title='Plant Care Reminder',
+        message=message,
+        timeout=10  # seconds
+    )
+
+
+def play_message(message):
+    from gtts import gTTS
+    from pygame import mixer
+
+    audio_path = os.path.join(tempfile.mkdtemp(), "alarm.mp3")
+    tts = gTTS(text=message, lang='en')
+    tts.save(audio_path)
+
+    mixer.init()
+    mixer.music.load(audio_path)
+    mixer.music.play()
+    while mixer.music.get_busy():
+        time.sleep(1)
+
+
+def set_alarm(username, task, plant_name, date, alarm_time, track_tasks=False, db_path=db.DB_PATH):
+    def alarm_thread():
+        try:
+            alarm_datetime = datetime.combine(date, alarm_time)
+            current_time = datetime.now()
+            while current_time < alarm_datetime:
+                time.sleep((alarm_datetime - current_time).total_seconds() + 1)
+                current_time = datetime.now()
+
+            play_message(f"Hi, {username}, it's time to {task} your {plant_name} plants!")
+
+            conn = db.connect(['plant_tasks', 'tasks_completed'] if track_tasks else ['plant_tasks'], db_path)
+            try:
+                db.save_task(conn, username, task, plant_name, date, alarm_time, track_tasks)
+            finally:
+                conn.close()
+            print('Alarm set successfully!')
+        except Exception as e:
+            print(f"Error setting alarm: {e}")
+
+    threading.Thread(target=alarm_thread, daemon=True).start()
+
+
+def check_reminders(db_path=db.DB_PATH):
+    now = datetime.now()
+    conn = db.connect(['reminder'], db_path)
+    try:
+        reminders = db.due_reminders(conn, now.strftime('%Y-%m-%d'), now.strftime('%H:%M'))
+    finally:
+        conn.close()
+    for reminder in reminders:
+        send_notification(f"Time to {reminder[1]} your {reminder[5]} plant")
+
+
+_scheduler_started = set()
+_scheduler_lock = threading.Lock()
+
+
+def start_reminder_scheduler(db_path=db.DB_PATH):
+    # One scheduler thread per process, however many times the script reruns
+    with _scheduler_lock:
+        if db_path in _scheduler_started:
+            return
+        _scheduler_started.add(db_path)
+
+    def reminder_scheduler():
+        while True:
+            try:
+                check_reminders(db_path)
+            except Exception as e:
+                print(f"Error checking reminders: {e}")
+            time.sleep(60 - datetime.now().second)
+
+    threading.Thread(target=reminder_scheduler, daemon=True).start()
@@ -0,0 +1,122 @@
+"""Tiled inference for large field photos.
+
+Squeezing a drone or wide-angle frame into the model's 256x256 input
+blurs away the lesions that tell Early from Late Blight.  Here the frame
+is decoded at up to ``max_side`` pixels, cut into overlapping 256x256
+windows (strided views, nothing copied until a tile is batched), and every
+window that is mostly leaf goes through the model in batches.  Windows
+that are mostly soil or sky are skipped using an excess-green mask summed
+over each window from an integral image, which costs one pass over a
+quarter-resolution copy of the frame.
+"""
+import numpy as np
+from PIL import Image
+from numpy.lib.stride_tricks import sliding_window_view
+
+from agroaid.batch import batched
+from agroaid.model import CLASS_NAMES
+from agroaid.preprocess import IMAGE_SIZE, batch_buffer, open_image
+
+# Long side of the decoded frame, which bounds the tile count at a stride of 192
+# to about 100.  Just under half of common 4000-4032 pixel sensors, so those
+# decode with 1/2 DCT scaling
+MAX_SIDE = 2000
+# Fraction of a window's pixels that must look like leaf for it to be classified
+MIN_LEAF = 0.2
+# Excess green (2G - R - B) above which a pixel counts as leaf
+LEAF_THRESHOLD = 20
+MASK_STEP = 4
+
+
+def decode_frame(source, max_side=MAX_SIDE):
+    """Decode to an RGB uint8 array with the long side at most ``max_side``.
+
+    Returns ``(array, original_size)``.  Goes through the same decode
+    budget as decode_image.
+    """
+    image, original_size = open_image(source, long_side=max_side)
+    with image:
+        image = image.convert('RGB')
+        scale = max_side / max(image.size)
+        if scale < 1:
+            image = image.resize((round(image.width * scale), round(image.height * scale)), Image.BILINEAR)
+        return np.asarray(image), original_size
+
+
+def window_positions(length, tile, stride):
+    """Window offsets along one axis, with the last window flush against the edge."""
+    if length <= tile:
+        return np.array([0])
+    positions = np.arange(0, length - tile + 1, stride)
+    if positions[-1] != length - tile:
+        positions = np.append(positions, length - tile)
+    return positions
+
+
+def leaf_fractions(frame, ys, xs, tile):
+    """Share of leaf-coloured pixels in every window, as a ``(len(ys), len(xs))`` array."""
+    sample = frame[::MASK_STEP, ::MASK_STEP].astype(np.int16)
+    leaf = (2 * sample[..., 1] - sample[..., 0] - sample[..., 2]) > LEAF_THRESHOLD
+    # Integral image: any window's leaf count is four lookups
+    integral = np.zeros((leaf.shape[0] + 1, leaf.shape[1] + 1), np.int32)
+    integral[1:, 1:] = leaf.cumsum(0).cumsum(1)
+    top, left = ys // MASK_STEP, xs // MASK_STEP
+    bottom = np.minimum((ys + tile) // MASK_STEP, leaf.shape[0])
+    right = np.minimum((xs + tile) // MASK_STEP, leaf.shape[1])
+    counts = (integral[np.ix_(bottom, right)] - integral[np.ix_(top, right)]
+              - integral[np.ix_(bottom, left)] + integral[np.ix_(top, left)])
+    area = np.outer(bottom - top, right - left)
+    return counts / np.maximum(area, 1)
+
+
+def tile_windows(frame, tile=IMAGE_SIZE):
+    """Every ``tile`` x ``tile`` window of ``frame`` as a view indexed ``[y, x]``."""
+    if frame.shape[0] < tile or frame.shape[1] < tile:
+        # Pad small frames up to one tile rather than upscaling them
+        padded = np.zeros((max(tile, frame.shape[0]), max(tile, frame.shape[1]), 3), np.uint8)
+        padded[:frame.shape[0], :frame.shape[1]] = frame
+        frame = padded
+    return sliding_window_view(frame, (tile, tile), axis=(0, 1)).transpose(0, 1, 3, 4, 2)
+
+
+def classify_tiles(frame, model, stride=192, batch_size=32, min_leaf=MIN_LEAF, tile=IMAGE_SIZE):
+    """Classify the leafy windows of ``frame`` and combine them into one verdict.
+
+    Returns a dict with the tile grid, a row per classified tile and the
+    aggregate: the class with the highest mean probability over classified
+    tiles, and how many tiles each class won.
+    """
+    height, width = frame.shape[:2]
+    ys = window_positions(height, tile, stride)
+    xs = window_positions(width, tile, stride)
+    windows = tile_windows(frame, tile)
+    leafy = np.argwhere(leaf_fractions(frame, ys, xs, tile) >= min_leaf)
+
+    probabilities = np.zeros((len(leafy), len(CLASS_NAMES)), np.float32)
+    for start, chunk in zip(range(0, len(leafy), batch_size), batched(leafy, batch_size)):
+        batch = batch_buffer(len(chunk), tile)
+        for i, (row, col) in enumerate(chunk):
+            batch[i] = windows[ys[row], xs[col]]
+        probabilities[start:start + len(chunk)] = model.predict_on_batch(batch)
+
+    winners = probabilities.argmax(axis=1)
+    tiles = [{'row': int(row), 'col': int(col), 'x': int(xs[col]), 'y': int(ys[row]),
+              'class': CLASS_NAMES[index], 'confidence': float(probabilities[i, index])}
+             for i, ((row, col), index) in enumerate(zip(leafy, winners))]
+    result = {
+        'size': [width, height],
+        'grid': [len(ys), len(xs)],
+        'tile': tile,
+        'stride': stride,
+        'classified': len(tiles),
+        'skipped': len(ys) * len(xs) - len(tiles),
+        'tiles': tiles,
+        'class_counts': {name: int((winners == i).sum()) for i, name in enumerate(CLASS_NAMES)},
+    }
+    if tiles:
+        mean = probabilities.mean(axis=0)
+        result['class'] = CLASS_NAMES[int(mean.argmax())]
+        result['confidence'] = float(mean.max())
+    else:
+        result['class'], result['confidence'] = None, 0.0
+    return result
@@ -0,0 +1,250 @@
+"""Per-request trace spans for the inference API.
+
+A trace is a root span plus one child span per stage.  Finished spans go
+onto a bounded queue and a background thread hands them to a sink in
+batches, so a request never waits on the sink.  Unsampled requests get a
+shared no-op span and touch nothing else.
+
+Configured from the environment:
+
+    AGRO_AID_TRACE_SAMPLE   fraction of requests to trace (default 0)
+    AGRO_AID_TRACE_FILE     append spans as JSON lines here instead of
+                            keeping the most recent ones in memory
+    AGRO_AID_TRACE_TOKEN    shared secret: requests presenting it are always
+                            traced, and reading traces back requires it
+                            (default unset: sampling only, no trace reads)
+"""
+import atexit
+import contextvars
+import hmac
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from collections import OrderedDict
+
+TRACE_HEADER = 'X-Trace-Id'
+
+log = logging.getLogger(__name__)
+
+_current = contextvars.ContextVar('agroaid_span', default=None)
+
+
+def new_id(nbytes=8):
+    return os.urandom(nbytes).hex()
+
+
+class Span:
+    __slots__ = ('tracer', 'name', 'trace_id', 'span_id', 'parent_id', 'attributes',
+                 'start', 'duration', 'error', '_token', '_started')
+
+    def __init__(self, tracer, name, trace_id, parent_id=None):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = new_id()
+        self.parent_id = parent_id
+        self.attributes = {}
+        self.error = None
+
+    def set(self, key, value):
+        self.attributes[key] = value
+
+    def __enter__(self):
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self._started
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        self.tracer.exporter.submit(self)
+        return False
+
+    def to_dict(self):
+        return {
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start': self.start,
+            'duration_ms': round(self.duration * 1000, 3),
+            'attributes': self.attributes,
+            'error': self.error,
+        }
+
+
+class _NoopSpan:
+    trace_id = None
+
+    def set(self, key, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class MemorySink:
+    """In-process collector: keeps the spans of the most recent ``max_traces`` traces."""
+
+    def __init__(self, max_traces=1000):
+        self.max_traces = max_traces
+        self._traces = OrderedDict()
+        self._lock = threading.Lock()
+
+    def export(self, spans):
+        with self._lock:
+            for span in spans:
+                self._traces.setdefault(span['trace_id'], []).append(span)
+                self._traces.move_to_end(span['trace_id'])
+            while len(self._traces) > self.max_traces:
+                self._traces.popitem(last=False)
+
+    def get(self, trace_id):
+        with self._lock:
+            spans = self._traces.get(trace_id)
+            return sorted(spans, key=lambda span: span['start']) if spans else None
+
+
+class FileSink:
+    """Append spans to a JSON-lines file, one batch per write."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans):
+        data = ''.join(json.dumps(span) + '\n' for span in spans)
+        with self._lock, open(self.path, 'a') as f:
+            f.write(data)
+
+    def get(self, trace_id):
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path) as f:
+            spans = [span for span in map(json.loads, f) if span['trace_id'] == trace_id]
+        return sorted(spans, key=lambda span: span['start']) or None
+
+
+class BatchExporter:
+    """Hand finished spans to ``sink.export(list_of_dicts)`` from a background thread.
+
+    Spans are dropped (and counted) rather than blocking a request when the
+    queue is full.
+    """
+
+    def __init__(self, sink, max_batch=256, interval=1.0, max_queue=8192):
+        self.sink = sink
+        self.max_batch = max_batch
+        self.interval = interval
+        self.dropped = 0
+        self.exported = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._wake = threading.Event()
+        self._export_lock = threading.Lock()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, span):
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self._queue.qsize() >= self.max_batch:
+            self._wake.set()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='span-exporter', daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            # Wake once per interval, or early when a full batch is waiting
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        with self._export_lock:
+            while True:
+                batch = []
+                while len(batch) < self.max_batch:
+                    try:
+                        batch.append(self._queue.get_nowait().to_dict())
+                    except queue.Empty:
+                        break
+                if not batch:
+                    return
+                try:
+                    self.sink.export(batch)
+                    self.exported += len(batch)
+                except Exception as e:
+                    self.dropped += len(batch)
+                    log.warning("span export failed: %s: %s", type(e).__name__, e)
+
+
+class Tracer:
+    def __init__(self, sample_rate=0.0, sink=None, exporter=None, token=None):
+        self.sample_rate = sample_rate
+        self.exporter = exporter or BatchExporter(sink if sink is not None else MemorySink())
+        self.token = token
+
+    @property
+    def sink(self):
+        return self.exporter.sink
+
+    def authorized(self, token):
+        """Whether ``token`` matches the configured trace token (never, without one)."""
+        return bool(self.token) and token is not None and hmac.compare_digest(token.encode(), self.token.encode())
+
+    def start_trace(self, name, trace_id=None, force=False):
+        """Open the root span of a request.
+
+        Requests are sampled at ``sample_rate``; a caller-supplied
+        ``trace_id`` only names the trace if the request is sampled.
+        ``force`` (for holders of the trace token) skips sampling, so a
+        single slow request can be reproduced without raising the sample
+        rate for everyone.
+        """
+        if not force and (self.sample_rate <= 0 or random.random() >= self.sample_rate):
+            return NOOP_SPAN
+        return Span(self, name, trace_id or new_id(16))
+
+    def span(self, name):
+        """Open a child of the current span, or a no-op if this request is not traced."""
+        parent = _current.get()
+        if parent is None:
+            return NOOP_SPAN
+        return Span(self, name, parent.trace_id, parent.span_id)
+
+
+def tracer_from_env():
+    path = os.environ.get('AGRO_AID_TRACE_FILE')
+    sink = FileSink(path) if path else MemorySink()
+    return Tracer(float(os.environ.get('AGRO_AID_TRACE_SAMPLE', '0')), sink,
+                  token=os.environ.get('AGRO_AID_TRACE_TOKEN') or None)
+
+
+TRACER = tracer_from_env()
+
+
+def span(name):
+    return TRACER.span(name)
@@ -0,0 +1,32 @@
+import threading
+from functools import lru_cache
+
+ENGLISH = ('english', 'en')
+
+ALL_LANGUAGES = ('English', 'Hindi', 'Bengali', 'Telugu', 'Marathi', 'Tamil', 'Gujarati', 'Kannada', 'Malayalam', 'Oriya', 'Punjabi', 'Assamese', 'Maithili', 'Urdu')
+
+_translator = None
+_translator_lock = threading.Lock()
+
+
+def get_translator():
+    global _translator
+    if _translator is None:
+        with _translator_lock:
+            if _translator is None:
+                from googletrans import Translator
+                _translator = Translator()
+    return _translator
+
+
+@lru_cache(maxsize=4096)
+def translate(text, dest_language):
+    # English needs no round trip, and googletrans is never imported for it
+    if not text or dest_language.lower() in ENGLISH:
+        return text
+    try:
+        translated_text = get_translator().translate(text, dest=dest_language.lower()).text
+        return translated_text if translated_text else text
+    except Exception as e:
+        print(f"Error during translation: {str(e)}")
+        return text
@@ -0,0 +1,90 @@
+from dataclasses import dataclass
+
+from agroaid.translation import ALL_LANGUAGES
+
+ACCOUNT_PAGES = ('create_account', 'log_in', 'log_out', 'delete_account')
+
+
+@dataclass(frozen=True)
+class Variant:
+    pages: tuple
+    tables: tuple = ()
+    languages: tuple = ('English',)
+    page_title: str = 'Your Personal Agro-Aid!'
+    news: str = 'reference'
+    multiple_uploads: bool = False
+    recognition_requires_login: bool = False
+    feedback: bool = False
+    feedback_requires_login: bool = False
+    team_section: bool = False
+    leaderboard_size: int = 30
+    reminder_scheduler: bool = False
+
+    @property
+    def track_tasks(self):
+        return 'tasks_completed' in self.tables
+
+
+# The Streamlit scripts in api/ used to be nine near copies of each other.
+# They are now thin entry points onto one of these configurations.
+ALARM_APP = Variant(
+    pages=('home', 'recognition', 'treatment', 'news', 'alarm', 'leaderboard', 'create_account', 'log_in', 'about', 'log_out', 'delete_account'),
+    tables=('profiles', 'feedbacks', 'plant_tasks', 'tasks_completed'),
+    multiple_uploads=True,
+    feedback=True,
+    feedback_requires_login=True,
+    team_section=True,
+)
+
+REMINDER_APP = Variant(
+    pages=('home', 'recognition', 'treatment', 'news', 'about', 'reminder') + ACCOUNT_PAGES,
+    tables=('profiles', 'reminder'),
+    languages=ALL_LANGUAGES,
+    news='industry',
+    reminder_scheduler=True,
+)
+
+VARIANTS = {
+    'god': ALARM_APP,
+    'w1': ALARM_APP,
+    'winner': ALARM_APP,
+    'victorious': ALARM_APP,
+    'champions': Variant(
+        pages=ALARM_APP.pages,
+        tables=ALARM_APP.tables,
+        multiple_uploads=True,
+        feedback=True,
+        feedback_requires_login=True,
+        leaderboard_size=20,
+    ),
+    'victory': Variant(
+        pages=('home', 'recognition', 'treatment', 'news', 'about', 'alarm') + ACCOUNT_PAGES,
+        tables=('profiles', 'feedbacks', 'plant_tasks'),
+        languages=('English', 'Hindi', 'Marathi'),
+        news='industry',
+        feedback=True,
+    ),
+    'achiever': Variant(
+        pages=REMINDER_APP.pages,
+        tables=('profiles', 'reminder', 'feedbacks'),
+        languages=('English', 'Hindi', 'Marathi'),
+        news='industry',
+        feedback=True,
+        reminder_scheduler=True,
+    ),
+    'login_page': REMINDER_APP,
+    'final': Variant(
+        pages=('home', 'recognition', 'treatment', 'news', 'about') + ACCOUNT_PAGES,
+        tables=('profiles', 'reminders'),
+        languages=ALL_LANGUAGES,
+        page_title='Your Personal Agro-Aid !',
+        news='industry',
+        recognition_requires_login=True,
+    ),
+    'main_tf_serving': Variant(
+        pages=('home', 'recognition', 'treatment', 'news', 'about'),
+        languages=ALL_LANGUAGES,
+        page_title='Your Personal Agro-Aid !',
+        news='industry',
+    ),
+}
@@ -0,0 +1,318 @@
+"""Drop-folder ingestion: watch a directory, wait for files to settle, then
+push them through a bounded decode -> batch-infer -> persist pipeline."""
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import queue
+import select
+import struct
+import sys
+import threading
+import time
+
+from agroaid.batch import classify_decoded, decode_file
+from agroaid.preprocess import is_image_file
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+EVENT_HEADER = struct.Struct('iIII')
+
+log = logging.getLogger(__name__)
+
+
+def is_candidate(path):
+    # Sync tools write to dotfiles or *.part/*.tmp and rename when done
+    name = os.path.basename(path)
+    return not name.startswith('.') and is_image_file(name)
+
+
+def scan_tree(root):
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            if is_candidate(path):
+                yield path
+
+
+class InotifyWatcher:
+    def __init__(self, root):
+        libc_name = ctypes.util.find_library('c')
+        if not sys.platform.startswith('linux') or not libc_name:
+            raise OSError('inotify is only available on Linux')
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self._dirs = {}
+        for dirpath, _, _ in os.walk(root):
+            self._add_watch(dirpath)
+
+    def _add_watch(self, path):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error == errno.ENOENT:
+                # Removed before we got to it; nothing left to watch
+                return
+            raise OSError(error, f'inotify_add_watch failed for {path}')
+        self._dirs[wd] = path
+
+    def poll(self, timeout):
+        """Return ``(changed_paths, rescan_needed)``."""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return [], False
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return [], False
+
+        changed, rescan, offset = [], False, 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b'\0')
+            offset += EVENT_HEADER.size + length
+            if mask & IN_Q_OVERFLOW:
+                rescan = True
+                continue
+            if wd not in self._dirs or not name:
+                continue
+            path = os.path.join(self._dirs[wd], os.fsdecode(name))
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    # Files can land in a new directory before we watch it
+                    self._add_watch(path)
+                    changed.extend(scan_tree(path))
+            elif is_candidate(path):
+                changed.append(path)
+        return changed, rescan
+
+    def close(self):
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    def __init__(self, root, interval=2.0):
+        self.root = root
+        self.interval = interval
+        self._seen = {}
+        self._next_scan = time.monotonic()
+
+    def poll(self, timeout):
+        # Rescan once per interval, but come back within ``timeout`` so the
+        # caller can still check for shutdown and settled files
+        wait = self._next_scan - time.monotonic()
+        if wait > timeout:
+            time.sleep(timeout)
+            return [], False
+        time.sleep(max(wait, 0))
+        self._next_scan = time.monotonic() + self.interval
+        changed = []
+        for path in scan_tree(self.root):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            signature = (stat.st_size, stat.st_mtime_ns)
+            if self._seen.get(path) != signature:
+                self._seen[path] = signature
+                changed.append(path)
+        return changed, False
+
+    def close(self):
+        pass
+
+
+def make_watcher(root, polling=False, interval=2.0):
+    if not polling:
+        try:
+            return InotifyWatcher(root)
+        except OSError as e:
+            log.warning("inotify unavailable (%s), falling back to polling", e)
+    return PollingWatcher(root, interval)
+
+
+class Debouncer:
+    """Only release a file once its size and mtime have held still for ``settle`` seconds."""
+
+    def __init__(self, settle=2.0):
+        self.settle = settle
+        self._pending = {}
+
+    def touch(self, path):
+        self._pending[path] = (time.monotonic(), None)
+
+    def __len__(self):
+        return len(self._pending)
+
+    def ready(self):
+        now = time.monotonic()
+        released = []
+        for path, (since, signature) in list(self._pending.items()):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                del self._pending[path]
+                continue
+            current = (stat.st_size, stat.st_mtime_ns)
+            if current != signature:
+                self._pending[path] = (now, current)
+            elif now - since >= self.settle and stat.st_size > 0:
+                del self._pending[path]
+                released.append(path)
+        return released
+
+
+class PipelineStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.seen = self.decoded = self.classified = self.errors = self.batches = 0
+        self.inference_seconds = 0.0
+        self._last = (self.started, 0)
+
+    def add(self, **counts):
+        with self.lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def report(self, pending, ready_queue, decoded_queue):
+        with self.lock:
+            now = time.monotonic()
+            last_time, last_classified = self._last
+            rate = (self.classified - last_classified) / max(now - last_time, 1e-9)
+            self._last = (now, self.classified)
+            average_batch = self.classified / self.batches if self.batches else 0.0
+            per_image_ms = 1000 * self.inference_seconds / self.classified if self.classified else 0.0
+            return (f"seen {self.seen} | settling {pending} | ready queue {ready_queue.qsize()}/{ready_queue.maxsize} "
+                    f"| decoded queue {decoded_queue.qsize()}/{decoded_queue.maxsize} | classified {self.classified} "
+                    f"({rate:.1f} images/s) | errors {self.errors} | avg batch {average_batch:.1f} "
+                    f"| inference {per_image_ms:.1f} ms/image")
+
+
+class IngestPipeline:
+    """Watcher -> ready queue -> decode threads -> decoded queue -> batching inference -> writer.
+
+    Both queues are bounded.  When inference falls behind, the decoders block
+    on the decoded queue, the feeder blocks on the ready queue and new files
+    simply wait on disk in the debouncer, so memory stays flat.
+    """
+
+    def __init__(self, root, model, writer, batch_size=32, decode_workers=2, settle=2.0,
+                 max_wait=0.5, polling=False, poll_interval=2.0, stats_interval=10.0):
+        self.root = root
+        self.model = model
+        self.writer = writer
+        self.batch_size = batch_size
+        self.decode_workers = decode_workers
+        self.max_wait = max_wait
+        self.poll_interval = poll_interval
+        self.stats_interval = stats_interval
+        self.watcher = make_watcher(root, polling, poll_interval)
+        self.debouncer = Debouncer(settle)
+        self.ready_queue = queue.Queue(maxsize=batch_size * 2)
+        self.decoded_queue = queue.Queue(maxsize=batch_size * 2)
+        self.stats = PipelineStats()
+        self.stop_event = threading.Event()
+        self._queued = set()
+        self._queued_lock = threading.Lock()
+
+    def _offer(self, paths):
+        for path in paths:
+            with self._queued_lock:
+                if path in self.writer.completed or path in self._queued:
+                    continue
+            self.debouncer.touch(path)
+
+    def _watch(self):
+        # Anything already in the folder (or left over from a previous run) counts as new
+        self._offer(scan_tree(self.root))
+        while not self.stop_event.is_set():
+            try:
+                changed, rescan = self.watcher.poll(0.5)
+            except OSError as e:
+                # e.g. ENOSPC once fs.inotify.max_user_watches is used up
+                log.warning("inotify watch failed (%s), falling back to polling every %ss", e, self.poll_interval)
+                self.watcher.close()
+                self.watcher = PollingWatcher(self.root, self.poll_interval)
+                changed, rescan = [], True
+            self._offer(scan_tree(self.root) if rescan else changed)
+            for path in self.debouncer.ready():
+                with self._queued_lock:
+                    self._queued.add(path)
+                self.stats.add(seen=1)
+                while not self.stop_event.is_set():
+                    try:
+                        self.ready_queue.put(path, timeout=0.5)
+                        break
+                    except queue.Full:
+                        continue
+
+    def _decode(self):
+        while not self.stop_event.is_set():
+            try:
+                path = self.ready_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            item = decode_file(path)
+            self.stats.add(decoded=1)
+            while not self.stop_event.is_set():
+                try:
+                    self.decoded_queue.put(item, timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+
+    def _next_batch(self):
+        try:
+            chunk = [self.decoded_queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.max_wait
+        while len(chunk) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                chunk.append(self.decoded_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return chunk
+
+    def _infer(self):
+        while not self.stop_event.is_set():
+            chunk = self._next_batch()
+            if not chunk:
+                continue
+            start = time.perf_counter()
+            rows = classify_decoded(chunk, self.model)
+            self.stats.add(inference_seconds=time.perf_counter() - start)
+            self.writer.write(rows)
+            with self._queued_lock:
+                self._queued.difference_update(row['path'] for row in rows)
+            self.stats.add(classified=len(rows), errors=sum('error' in row for row in rows), batches=1)
+
+    def run(self):
+        threads = [threading.Thread(target=self._watch, name='watch', daemon=True),
+                   threading.Thread(target=self._infer, name='infer', daemon=True)]
+        threads += [threading.Thread(target=self._decode, name=f'decode-{i}', daemon=True) for i in range(self.decode_workers)]
+        for thread in threads:
+            thread.start()
+        try:
+            while not self.stop_event.wait(self.stats_interval):
+                print(self.stats.report(len(self.debouncer), self.ready_queue, self.decoded_queue), file=sys.stderr)
+        finally:
+            self.stop_event.set()
+            for thread in threads:
+                thread.join(timeout=5)
+            self.watcher.close()
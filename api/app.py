@@ -0,0 +1,8 @@
+import os
+
+from agroaid.app import run
+
+# Streamlit entry point for the consolidated app:
+#   streamlit run api/app.py
+# AGRO_AID_VARIANT picks one of the configurations in agroaid/variants.py.
+run(os.environ.get('AGRO_AID_VARIANT', 'god'))
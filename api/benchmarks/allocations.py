@@ -0,0 +1,102 @@
+"""Memory allocated per /predict request, before and after zero-copy decoding.
+
+    python api/benchmarks/allocations.py
+    python api/benchmarks/allocations.py --resolution 12mp --inference
+
+Runs the request path on a spooled upload, as FastAPI hands it over, in
+two versions:
+
+    copying    file.read() into bytes, BytesIO, decode_image, np.expand_dims
+               (the path before decode_into)
+    zero-copy  decode_into straight from the spooled file into a row of the
+               thread's batch_buffer
+
+With --inference both then call model.predict_on_batch, so only the
+buffer handling differs; model.predict's tf.data pipeline, which the old
+path also paid for, is not part of the comparison.
+
+and reports, per request, the peak of memory traced by tracemalloc above
+what was live beforehand, and how much of it the result still holds.
+tracemalloc sees Python and numpy buffers, which is where the copies were;
+PIL's and TensorFlow's own buffers aren't traced.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from io import BytesIO
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import RESOLUTIONS, leaf_jpeg  # noqa: E402
+
+from agroaid.preprocess import batch_buffer, decode_image, decode_into  # noqa: E402
+
+
+def copying(upload, model):
+    data = upload.read()
+    image, _ = decode_image(BytesIO(data))
+    batch = np.expand_dims(image, 0)
+    return model.predict_on_batch(batch) if model else batch
+
+
+def zero_copy(upload, model):
+    batch = batch_buffer(1)
+    decode_into(upload, batch[0])
+    return model.predict_on_batch(batch) if model else batch
+
+
+def measure(function, upload, model, repeats):
+    # One warm-up so the thread's buffer and any lazy imports already exist
+    upload.seek(0)
+    function(upload, model)
+    peaks, retained, times = [], [], []
+    for _ in range(repeats):
+        upload.seek(0)
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        result = function(upload, model)
+        times.append(time.perf_counter() - start)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peaks.append(peak - before)
+        retained.append(current - before)
+        del result
+    return np.median(peaks), np.median(retained), np.median(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resolution', default='fhd', choices=sorted(RESOLUTIONS))
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--inference', action='store_true', help='include the model call')
+    parser.add_argument('--model', help='SavedModel directory (default: AGRO_AID_MODEL_PATH or '
+                                        'the newest serving export)')
+    args = parser.parse_args(argv)
+
+    model = None
+    if args.inference:
+        from agroaid.model import load_model, saved_model_path
+        model = load_model(args.model or saved_model_path)
+
+    data = leaf_jpeg(*RESOLUTIONS[args.resolution])
+    # Starlette spools uploads in memory up to 1 MB and to disk past that
+    with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as upload:
+        upload.write(data)
+        print(f"{args.resolution} JPEG, {len(data) / 1e3:.0f} KB upload"
+              f"{', with inference' if model else ', decode only'}; median of {args.repeats}")
+        for label, function in (('copying', copying), ('zero-copy', zero_copy)):
+            peak, retained, elapsed = measure(function, upload, model, args.repeats)
+            print(f"{label:>9}: peak {peak / 1e3:7.0f} KB traced, {retained / 1e3:6.0f} KB retained, "
+                  f"{elapsed * 1000:6.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
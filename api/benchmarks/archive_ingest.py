@@ -0,0 +1,99 @@
+"""Peak memory and throughput of classifying a large archive.
+
+    python api/benchmarks/archive_ingest.py --images 500 --resolution fhd --format tar
+
+Builds a synthetic survey archive on disk, then classifies it in this
+process twice:
+
+    buffered   read every member into memory and decode them all at full
+               resolution, as /predict does per upload, then resize and infer
+    streaming  agroaid.batch.classify_sources over agroaid.archive.iter_archive,
+               which is what /predict/batch does with an archive upload
+
+and reports peak RSS above the loaded-model baseline for each.
+"""
+import argparse
+import os
+import sys
+import tarfile
+import tempfile
+import time
+import zipfile
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common import peak_rss_mb, reset_peak_rss  # noqa: E402
+from synthetic import RESOLUTIONS, leaf_jpeg  # noqa: E402
+
+from agroaid.archive import iter_archive  # noqa: E402
+from agroaid.batch import batched, classify_decoded, classify_sources  # noqa: E402
+from agroaid.model import load_model, saved_model_path  # noqa: E402
+from agroaid.preprocess import read_file_as_image  # noqa: E402
+
+
+def build_archive(path, fmt, images, resolution):
+    distinct = [leaf_jpeg(*RESOLUTIONS[resolution], seed=i) for i in range(min(images, 16))]
+    if fmt == 'zip':
+        with zipfile.ZipFile(path, 'w') as archive:
+            for i in range(images):
+                archive.writestr(f'survey/plot{i:05d}.jpg', distinct[i % len(distinct)])
+    else:
+        with tarfile.open(path, 'w') as archive:
+            for i in range(images):
+                data = distinct[i % len(distinct)]
+                info = tarfile.TarInfo(f'survey/plot{i:05d}.jpg')
+                info.size = len(data)
+                archive.addfile(info, BytesIO(data))
+
+
+def buffered(path, name, model, chunk_size):
+    with open(path, 'rb') as f:
+        members = [(member, source.read()) for member, source in iter_archive(f, name)]
+    full = [(member, read_file_as_image(data)) for member, data in members]
+    decoded = [(member, np.asarray(Image.fromarray(image).resize((256, 256), Image.BILINEAR)), None)
+               for member, image in full]
+    return sum(len(classify_decoded(chunk, model)) for chunk in batched(decoded, chunk_size))
+
+
+def streaming(path, name, model, chunk_size, window):
+    with open(path, 'rb') as f:
+        return sum(1 for _ in classify_sources(iter_archive(f, name), model, chunk_size, window))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--images', type=int, default=500)
+    parser.add_argument('--resolution', default='fhd', choices=sorted(RESOLUTIONS))
+    parser.add_argument('--format', default='tar', choices=['tar', 'zip'])
+    parser.add_argument('--chunk-size', type=int, default=16)
+    parser.add_argument('--window', type=int, default=16)
+    parser.add_argument('--model', default=saved_model_path)
+    args = parser.parse_args(argv)
+
+    model = load_model(args.model)
+    # Warm up at the chunk size so allocator growth isn't charged to the first run
+    model.predict_on_batch(np.zeros((args.chunk_size, 256, 256, 3), np.uint8))
+    with tempfile.TemporaryDirectory() as tmp:
+        name = f'survey.{args.format}'
+        path = os.path.join(tmp, name)
+        build_archive(path, args.format, args.images, args.resolution)
+        print(f"{args.images} {args.resolution} images, {os.path.getsize(path) / 1e6:.0f} MB {args.format} archive")
+
+        runs = [('streaming', lambda: streaming(path, name, model, args.chunk_size, args.window)),
+                ('buffered', lambda: buffered(path, name, model, args.chunk_size))]
+        for label, run in runs:
+            reset_peak_rss()
+            baseline = peak_rss_mb()
+            start = time.perf_counter()
+            count = run()
+            elapsed = time.perf_counter() - start
+            print(f"{label:>9}: {count} images in {elapsed:.1f}s ({count / elapsed:.1f} images/s), "
+                  f"peak RSS +{peak_rss_mb() - baseline:.0f} MB over the loaded model")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Time to first result for /predict/batch, streamed versus buffered.
+
+    python api/benchmarks/batch_streaming.py --images 128 --chunk-size 16
+
+Needs a running server (python api/main.py).  Sends the same multi-file
+request with ?stream=true and without, and reports when the first result
+arrived, when the last one did, and the server's peak RSS if --server-pid
+is given.
+"""
+import argparse
+import http.client
+import json
+import sys
+import time
+import uuid
+from urllib.parse import urlsplit
+
+from common import peak_rss_mb, reset_peak_rss
+from synthetic import corpus
+
+
+def multipart_files(images):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for i, data in enumerate(images):
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="files"; filename="leaf{i}.jpg"\r\n'
+                     f'Content-Type: image/jpeg\r\n\r\n'.encode() + data + b'\r\n')
+    return b''.join(parts) + f'--{boundary}--\r\n'.encode(), f'multipart/form-data; boundary={boundary}'
+
+
+def timed_request(url, body, content_type, stream, chunk_size):
+    parts = urlsplit(url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=600)
+    start = time.perf_counter()
+    connection.request('POST', f'/predict/batch?stream={str(stream).lower()}&chunk_size={chunk_size}', body,
+                       {'Content-Type': content_type})
+    response = connection.getresponse()
+    first = None
+    results = 0
+    if stream:
+        for line in response:
+            if line.strip():
+                first = first or time.perf_counter() - start
+                results += 1
+    else:
+        results = len(json.loads(response.read()))
+        first = time.perf_counter() - start
+    total = time.perf_counter() - start
+    connection.close()
+    return first, total, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://localhost:8000')
+    parser.add_argument('--images', type=int, default=128)
+    parser.add_argument('--resolution', default='hd')
+    parser.add_argument('--chunk-size', type=int, default=16)
+    parser.add_argument('--server-pid', type=int, help='pid of the server, for its peak RSS')
+    args = parser.parse_args(argv)
+
+    # A few distinct images repeated keeps generation quick without changing decode cost
+    distinct = corpus(args.resolution, min(args.images, 8))
+    body, content_type = multipart_files([distinct[i % len(distinct)] for i in range(args.images)])
+    print(f"{args.images} images, {len(body) / 1e6:.1f} MB request, chunk size {args.chunk_size}")
+    for stream in (False, True):
+        if args.server_pid:
+            reset_peak_rss(args.server_pid)
+        first, total, results = timed_request(args.url, body, content_type, stream, args.chunk_size)
+        rss = f", server peak RSS {peak_rss_mb(args.server_pid):.0f} MB" if args.server_pid else ''
+        print(f"{'streamed' if stream else 'buffered':>8}: first result {first * 1000:8.1f} ms, "
+              f"all {results} results {total * 1000:8.1f} ms{rss}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""Escalation rate, latency and accuracy of the student-first cascade.
+
+    python api/benchmarks/cascade.py --student models/student
+    python api/benchmarks/cascade.py --student models/student --images-dir PlantVillage/ --thresholds 0.8,0.9,0.95
+
+Runs every image one at a time, as /predict does, through the full model
+alone and then through a Cascade at each threshold, and reports p50/p95
+latency, the share of images escalated to the full model, agreement with
+the full model and, with --images-dir (one folder per class), accuracy.
+"""
+import argparse
+import os
+import sys
+import time
+from io import BytesIO
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common import latency_summary  # noqa: E402
+from synthetic import corpus  # noqa: E402
+
+from agroaid.cascade import Cascade  # noqa: E402
+from agroaid.model import class_from_path  # noqa: E402
+from agroaid.preprocess import decode_image, iter_image_files  # noqa: E402
+
+
+def run(model, images):
+    model.predict_on_batch(images[:1])
+    times, probabilities = [], []
+    for i in range(len(images)):
+        start = time.perf_counter()
+        probabilities.append(np.asarray(model.predict_on_batch(images[i:i + 1]))[0])
+        times.append(time.perf_counter() - start)
+    return latency_summary(times), np.array(probabilities)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--student', required=True, help='student SavedModel directory')
+    parser.add_argument('--model', help='full SavedModel directory (default: AGRO_AID_MODEL_PATH or '
+                                        'the newest serving export)')
+    parser.add_argument('--thresholds', default='0.7,0.8,0.9,0.95')
+    parser.add_argument('--images-dir', help='labelled photos, one folder per class')
+    parser.add_argument('--limit', type=int, default=300)
+    parser.add_argument('--count', type=int, default=64, help='synthetic images without --images-dir')
+    args = parser.parse_args(argv)
+
+    from agroaid.model import load_model, saved_model_path
+    full = load_model(args.model or saved_model_path)
+    student = load_model(args.student)
+    if args.images_dir:
+        paths = list(iter_image_files(args.images_dir))[:args.limit]
+        images = np.stack([decode_image(path)[0] for path in paths])
+        labels = np.array([class_from_path(path) for path in paths], dtype=object)
+    else:
+        images = np.stack([decode_image(BytesIO(data))[0] for data in corpus('vga', args.count)])
+        labels = np.full(len(images), None, dtype=object)
+    labelled = labels != None  # noqa: E711
+
+    def report(name, latency, probabilities, escalated=None):
+        top = probabilities.argmax(axis=1)
+        text = f"{name:>14}: p50 {latency['p50_ms']:6.1f} ms  p95 {latency['p95_ms']:6.1f} ms"
+        if escalated is not None:
+            text += f", escalated {escalated:6.1%}, agreement {np.mean(top == full_top):6.1%}"
+        if labelled.any():
+            text += f", accuracy {np.mean(top[labelled] == labels[labelled].astype(int)):6.1%}"
+        print(text)
+
+    print(f"{len(images)} images, {int(labelled.sum())} labelled")
+    latency, full_probabilities = run(full, images)
+    full_top = full_probabilities.argmax(axis=1)
+    report('full model', latency, full_probabilities)
+    latency, student_probabilities = run(student, images)
+    report('student only', latency, student_probabilities, 0.0)
+    for threshold in (float(t) for t in args.thresholds.split(',')):
+        latency, probabilities = run(Cascade(student, full, threshold), images)
+        escalated = np.mean(student_probabilities.max(axis=1) < threshold)
+        report(f'cascade @ {threshold:.2f}', latency, probabilities, escalated)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Bursts of identical uploads against /predict, to see coalescing at work.
+
+    python api/main.py &
+    python api/benchmarks/coalescing.py --burst 16 --bursts 10
+
+Needs a running server.  Each burst posts the same photo from --burst
+threads at once (a fresh photo per burst, so the near-duplicate cache
+can't answer).  Reports latency and, from /metrics, how many requests
+were coalesced onto another one and how many actually ran the model.
+Start the server with AGRO_AID_COALESCE=0 for the baseline.
+"""
+import argparse
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common import format_run, latency_summary  # noqa: E402
+from inference import Client, multipart  # noqa: E402
+from synthetic import RESOLUTIONS, leaf_jpeg  # noqa: E402
+
+COUNTERS = {
+    'coalesced': r'^agroaid_coalesced_total (\S+)',
+    'inferences': r'^agroaid_stage_seconds_count\{stage="inference"\} (\S+)',
+    'dedup_hits': r'^agroaid_dedup_lookups_total\{result="hit"\} (\S+)',
+}
+
+
+def scrape(url):
+    # A fresh connection: the load threads' keep-alive ones may have timed out meanwhile
+    _, body = Client(url).request('GET', '/metrics')
+    text = body.decode()
+    return {name: sum(float(value) for value in re.findall(pattern, text, re.M)) for name, pattern in COUNTERS.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://localhost:8000')
+    parser.add_argument('--burst', type=int, default=16, help='identical requests sent at once')
+    parser.add_argument('--bursts', type=int, default=10)
+    parser.add_argument('--resolution', default='hd', choices=sorted(RESOLUTIONS))
+    args = parser.parse_args(argv)
+
+    client = Client(args.url)
+    payloads = [multipart(leaf_jpeg(*RESOLUTIONS[args.resolution], seed=1000 + i)) for i in range(args.bursts)]
+    before = scrape(args.url)
+    latencies, errors = [], 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.burst) as pool:
+        for payload in payloads:
+            barrier = threading.Barrier(args.burst)
+
+            def send(_):
+                barrier.wait()
+                return client.post_image(payload)
+
+            for status, seconds in pool.map(send, range(args.burst)):
+                if status == 200:
+                    latencies.append(seconds)
+                else:
+                    errors += 1
+    elapsed = time.perf_counter() - start
+    after = scrape(args.url)
+
+    requests = args.burst * args.bursts
+    run = {**latency_summary(latencies), 'throughput': len(latencies) / elapsed}
+    counts = {name: int(after[name] - before[name]) for name in COUNTERS}
+    print(f"{args.bursts} bursts of {args.burst} identical {args.resolution} uploads: {format_run(run)}")
+    print(f"{requests} requests, {errors} errors: {counts['coalesced']} coalesced, "
+          f"{counts['dedup_hits']} near-duplicate cache hits, {counts['inferences']} inferences run")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
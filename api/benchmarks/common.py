@@ -0,0 +1,108 @@
+"""Shared helpers for the benchmark scripts: percentiles, peak RSS and result files."""
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+
+def latency_summary(seconds):
+    # No samples (every request failed) is recorded as no latency, not as 0 ms
+    if len(seconds) == 0:
+        return dict.fromkeys(('p50_ms', 'p95_ms', 'p99_ms', 'mean_ms'))
+    samples = np.asarray(seconds) * 1000
+    return {
+        'p50_ms': float(np.percentile(samples, 50)),
+        'p95_ms': float(np.percentile(samples, 95)),
+        'p99_ms': float(np.percentile(samples, 99)),
+        'mean_ms': float(samples.mean()),
+    }
+
+
+def format_run(run):
+    if run['p50_ms'] is None:
+        return f"no successful requests  {run['throughput']:.1f}/s"
+    text = f"p50 {run['p50_ms']:.1f} ms  p95 {run['p95_ms']:.1f} ms  p99 {run['p99_ms']:.1f} ms  {run['throughput']:.1f}/s"
+    if run.get('peak_rss_mb') is not None:
+        text += f"  peak RSS {run['peak_rss_mb']:.0f} MB"
+    return text
+
+
+def _status_kb(pid, field):
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1])
+    return None
+
+
+def peak_rss_mb(pid='self'):
+    """High-water RSS of a process in MB (Linux), falling back to getrusage for ourselves."""
+    try:
+        kb = _status_kb(pid, 'VmHWM')
+    except OSError:
+        kb = None
+    if kb is None and pid == 'self':
+        import resource
+        kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == 'darwin':
+            kb //= 1024
+    return kb / 1024 if kb is not None else None
+
+
+def reset_peak_rss(pid='self'):
+    """Reset VmHWM to the current RSS so the next phase gets its own peak.
+
+    Returns False where the kernel doesn't allow it, in which case peaks are
+    cumulative for the process.
+    """
+    try:
+        with open(f'/proc/{pid}/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    return {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def median_of_runs(runs):
+    """Collapse a list of per-run metric dicts into one dict of medians."""
+    keys = [key for key in runs[0] if all(isinstance(run.get(key), (int, float)) for run in runs)]
+    return {key: float(np.median([run[key] for run in runs])) for key in keys}
+
+
+def save_results(path, cases, settings):
+    """Write ``{'environment', 'settings', 'cases': {name: {'summary', 'runs'}}}``."""
+    document = {
+        'environment': environment(),
+        'settings': settings,
+        'cases': {name: {'summary': median_of_runs(runs), 'runs': runs} for name, runs in cases.items()},
+    }
+    with open(path, 'w') as f:
+        json.dump(document, f, indent=2)
+    return document
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
@@ -0,0 +1,189 @@
+"""Compare two sets of benchmark results and fail on regressions.
+
+    python api/benchmarks/compare.py --base main.json --candidate branch.json
+    python api/benchmarks/compare.py --base a1.json a2.json --candidate b1.json b2.json --threshold p99_ms=20
+
+Runs of the same case from several files are pooled, so running the
+benchmark a few times on each side narrows the intervals.  For every case
+and metric the relative change of the mean gets a 95% Welch confidence
+interval.  A metric regresses when it is worse than its threshold and the
+interval excludes zero, so a noisy 12% swing on three runs doesn't fail
+the gate but a consistent one does.  A case with a single run on either
+side has no interval and is reported as inconclusive, never as a
+regression.  A candidate case fails outright if any of its runs had no
+successful request, or had failed requests when the base had none:
+latencies of the requests that did succeed say nothing about those.
+Exits 1 if anything regressed or failed.
+"""
+import argparse
+import math
+import sys
+
+import numpy as np
+
+from common import load_results
+
+# Percent change that counts as a regression, per metric
+DEFAULT_THRESHOLDS = {
+    'p50_ms': 5.0,
+    'p95_ms': 10.0,
+    'p99_ms': 15.0,
+    'mean_ms': 5.0,
+    'per_image_ms': 5.0,
+    'throughput': 5.0,
+    'peak_rss_mb': 10.0,
+    'error_rate': 1.0,
+}
+HIGHER_IS_BETTER = {'throughput'}
+# Compared as an absolute difference in percentage points rather than relative
+ABSOLUTE = {'error_rate'}
+
+# Two-sided 95% Student t quantiles; beyond the table the normal value is close enough
+T_95 = {1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365, 8: 2.306, 9: 2.262,
+        10: 2.228, 12: 2.179, 15: 2.131, 20: 2.086, 25: 2.060, 30: 2.042}
+
+
+def t_quantile(df):
+    if df >= 30:
+        return 1.96 if df > 60 else T_95[30]
+    df = max(1, int(df))
+    # Round df down so the interval errs on the wide side
+    return T_95[max(key for key in T_95 if key <= df)]
+
+
+def welch_interval(base, candidate):
+    """Difference of means (candidate - base) with a 95% confidence interval.
+
+    The bounds are None when either side has fewer than two runs.
+    """
+    base, candidate = np.asarray(base, float), np.asarray(candidate, float)
+    delta = candidate.mean() - base.mean()
+    if len(base) < 2 or len(candidate) < 2:
+        return delta, None, None
+    vb, vc = base.var(ddof=1) / len(base), candidate.var(ddof=1) / len(candidate)
+    se = math.sqrt(vb + vc)
+    if se == 0:
+        return delta, delta, delta
+    df = (vb + vc) ** 2 / ((vb ** 2 / (len(base) - 1) if vb else 0) + (vc ** 2 / (len(candidate) - 1) if vc else 0))
+    margin = t_quantile(df) * se
+    return delta, delta - margin, delta + margin
+
+
+def compare_metric(metric, base, candidate, threshold):
+    delta, low, high = welch_interval(base, candidate)
+    scale = 1.0 if metric in ABSOLUTE else abs(float(np.mean(base))) or 1.0
+    change = 100 * delta / scale
+    if low is not None:
+        low, high = 100 * low / scale, 100 * high / scale
+    # Positive "worse" means the candidate got slower, fatter or less productive
+    sign = -1 if metric in HIGHER_IS_BETTER else 1
+    worse, significant = sign * change, low is not None and not (low <= 0 <= high)
+    if low is None:
+        verdict = 'inconclusive'
+    elif significant and worse > threshold:
+        verdict = 'REGRESSION'
+    elif significant and worse < -threshold:
+        verdict = 'improved'
+    elif significant:
+        verdict = 'within threshold'
+    else:
+        verdict = 'noise'
+    return {'metric': metric, 'base': float(np.mean(base)), 'candidate': float(np.mean(candidate)),
+            'change': change, 'low': low, 'high': high, 'threshold': threshold, 'verdict': verdict,
+            'runs': (len(base), len(candidate))}
+
+
+def failure(base_runs, candidate_runs):
+    """Why the candidate's runs of a case fail the gate regardless of the metrics, or None."""
+    if any('p50_ms' in run and run['p50_ms'] is None for run in candidate_runs):
+        return 'no successful requests'
+    if any(run.get('error_rate') for run in candidate_runs) and not any(run.get('error_rate') for run in base_runs):
+        return 'requests failed'
+    return None
+
+
+def pooled_runs(paths):
+    cases = {}
+    for path in paths:
+        for name, case in load_results(path)['cases'].items():
+            cases.setdefault(name, []).extend(case['runs'])
+    return cases
+
+
+def compare(base_paths, candidate_paths, thresholds, metrics=None):
+    base, candidate = pooled_runs(base_paths), pooled_runs(candidate_paths)
+    rows, failed = [], {}
+    for name in sorted(set(base) & set(candidate)):
+        reason = failure(base[name], candidate[name])
+        if reason:
+            failed[name] = reason
+        for metric, threshold in thresholds.items():
+            if metrics and metric not in metrics:
+                continue
+            before = [run[metric] for run in base[name] if run.get(metric) is not None]
+            after = [run[metric] for run in candidate[name] if run.get(metric) is not None]
+            if before and after:
+                rows.append({'case': name, **compare_metric(metric, before, after, threshold)})
+    missing = sorted(set(base) ^ set(candidate))
+    return rows, missing, failed
+
+
+def format_table(rows):
+    header = ['case', 'metric', 'base', 'candidate', 'change', '95% CI', 'limit', 'runs', 'verdict']
+    lines = [header]
+    for row in rows:
+        unit = 'pp' if row['metric'] in ABSOLUTE else '%'
+        lines.append([
+            row['case'], row['metric'], f"{row['base']:.4g}", f"{row['candidate']:.4g}",
+            f"{row['change']:+.1f}{unit}",
+            f"[{row['low']:+.1f}, {row['high']:+.1f}]" if row['low'] is not None else 'n/a',
+            f"{row['threshold']:g}{unit}", '{}/{}'.format(*row['runs']), row['verdict'],
+        ])
+    widths = [max(len(line[i]) for line in lines) for i in range(len(header))]
+    text = ['  '.join(cell.ljust(width) for cell, width in zip(line, widths)).rstrip() for line in lines]
+    text.insert(1, '  '.join('-' * width for width in widths))
+    return '\n'.join(text)
+
+
+def parse_threshold(text):
+    metric, _, value = text.partition('=')
+    if not value:
+        raise argparse.ArgumentTypeError(f"expected METRIC=PERCENT, got {text!r}")
+    return metric, float(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare benchmark results and fail on regressions.')
+    parser.add_argument('--base', nargs='+', required=True, help='result files from the reference build')
+    parser.add_argument('--candidate', nargs='+', required=True, help='result files from the build under test')
+    parser.add_argument('--threshold', type=parse_threshold, action='append', default=[],
+                        help='override a limit, e.g. p99_ms=20 (percent; percentage points for error_rate)')
+    parser.add_argument('--metrics', help='comma-separated metrics to gate on (default: all)')
+    parser.add_argument('--all', action='store_true', help='show rows that are within noise too')
+    args = parser.parse_args(argv)
+
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    thresholds.update(args.threshold)
+    metrics = set(args.metrics.split(',')) if args.metrics else None
+    rows, missing, failed = compare(args.base, args.candidate, thresholds, metrics)
+    if not rows and not failed:
+        print('No cases in common between base and candidate.', file=sys.stderr)
+        return 2
+
+    shown = rows if args.all else [row for row in rows if row['verdict'] != 'noise']
+    print(format_table(shown) if shown else 'All metrics within noise.')
+    if missing:
+        print(f"\nOnly on one side (not compared): {', '.join(missing)}")
+    inconclusive = sorted({row['case'] for row in rows if row['verdict'] == 'inconclusive'})
+    if inconclusive:
+        print(f"\nWarning: one run on a side, so no confidence interval and no gate for: {', '.join(inconclusive)}. "
+              f"Rerun the benchmark with --repeats 2 or more.", file=sys.stderr)
+    for name, reason in failed.items():
+        print(f"\nFAILED {name}: {reason} in the candidate")
+    regressions = [row for row in rows if row['verdict'] == 'REGRESSION']
+    print(f"\n{len(regressions)} regression(s) across {len({row['case'] for row in rows} | set(failed))} cases.")
+    return 1 if regressions or failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""Cost of rejecting decompression bombs versus decoding a normal upload.
+
+    python api/benchmarks/decode_guard.py
+    python api/benchmarks/decode_guard.py --unguarded
+
+Crafts a few hostile images that are small on the wire:
+
+    png-bomb     a 40000x40000 greyscale PNG of zeros (1.6 GB of pixels)
+    jpeg-header  a normal JPEG whose header claims 30000x30000
+    png-large    a 6000x6000 PNG, under the header limit but too big to
+                 decode since PNGs can't be downscaled while decoding
+
+and times preprocess.decode_image on each next to an ordinary photo,
+reporting how much peak RSS every case adds.  --unguarded also decodes
+png-large the way /predict used to (read_file_as_image), for comparison;
+the bombs are never decoded unguarded.
+"""
+import argparse
+import os
+import struct
+import sys
+import time
+import zlib
+from io import BytesIO
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common import peak_rss_mb, reset_peak_rss  # noqa: E402
+from synthetic import leaf_jpeg  # noqa: E402
+
+from agroaid.preprocess import ImageRejected, decode_image, read_file_as_image  # noqa: E402
+
+
+def png_chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+
+def zero_png(width, height):
+    # Written row by row so building the bomb doesn't need the memory it's meant to exhaust
+    compressor = zlib.compressobj(9)
+    row = bytes(width + 1)
+    idat = b''.join(compressor.compress(row) for _ in range(height)) + compressor.flush()
+    header = struct.pack('>IIBBBBB', width, height, 8, 0, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + png_chunk(b'IHDR', header) + png_chunk(b'IDAT', idat)
+            + png_chunk(b'IEND', b''))
+
+
+def lying_jpeg(width, height):
+    data = bytearray(leaf_jpeg(640, 480))
+    sof = data.index(b'\xff\xc0')
+    data[sof + 5:sof + 9] = struct.pack('>HH', height, width)
+    return bytes(data)
+
+
+def large_png(width, height):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), (60, 140, 50)).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def measure(function, data):
+    reset_peak_rss()
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    try:
+        function(data)
+        outcome = 'decoded'
+    except ImageRejected as e:
+        outcome = f'rejected ({e})'
+    return time.perf_counter() - start, peak_rss_mb() - baseline, outcome
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--unguarded', action='store_true', help='also decode png-large without the guard')
+    args = parser.parse_args(argv)
+
+    cases = [('photo', leaf_jpeg(1920, 1080)),
+             ('png-bomb', zero_png(40000, 40000)),
+             ('jpeg-header', lying_jpeg(30000, 30000)),
+             ('png-large', large_png(6000, 6000))]
+    for label, data in cases:
+        elapsed, rss, outcome = measure(lambda d: decode_image(BytesIO(d)), data)
+        print(f"{label:>11} {len(data) / 1e3:8.0f} KB: {elapsed * 1000:7.1f} ms, peak RSS +{rss:4.0f} MB, {outcome}")
+    if args.unguarded:
+        elapsed, rss, _ = measure(read_file_as_image, cases[-1][1])
+        print(f"{'unguarded':>11} png-large: {elapsed * 1000:7.1f} ms, peak RSS +{rss:4.0f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""Throughput of in-graph JPEG decoding against the PIL path.
+
+    python api/export_serving.py
+    python api/benchmarks/graph_decode.py --model models/2 --threads 1,4,8
+
+Both paths classify the same synthetic JPEGs, one image per call as
+/predict does, from --threads concurrent threads:
+
+    pil     preprocess.decode_image, then predict_on_batch on the pixels
+    graph   the export's serving_bytes signature on the encoded bytes, so
+            decoding and resizing run on TensorFlow's thread pools
+
+With --batch-size the two are also run a whole batch per call.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common import format_run, latency_summary  # noqa: E402
+from synthetic import RESOLUTIONS, corpus  # noqa: E402
+
+from agroaid.model import encoded_signature, predict_encoded  # noqa: E402
+from agroaid.preprocess import decode_image  # noqa: E402
+
+
+def pil_path(model):
+    def classify(batch):
+        return model.predict_on_batch(np.stack([decode_image(BytesIO(data))[0] for data in batch]))
+    return classify
+
+
+def graph_path(signature):
+    def classify(batch):
+        return predict_encoded(signature, batch)
+    return classify
+
+
+def run(classify, batches, threads):
+    classify(batches[0])
+
+    def timed(batch):
+        start = time.perf_counter()
+        classify(batch)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        times = list(pool.map(timed, batches))
+    elapsed = time.perf_counter() - start
+    return dict(latency_summary(times), throughput=sum(map(len, batches)) / elapsed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--model', help='serving export with serving_bytes (default: AGRO_AID_MODEL_PATH or '
+                                        'the newest serving export)')
+    parser.add_argument('--resolution', default='hd', choices=sorted(RESOLUTIONS))
+    parser.add_argument('--count', type=int, default=64)
+    parser.add_argument('--threads', default='1,4,8')
+    parser.add_argument('--batch-size', type=int, default=0, help='also run this many images per call')
+    args = parser.parse_args(argv)
+
+    from agroaid.model import load_model, saved_model_path
+    model = load_model(args.model or saved_model_path)
+    signature = encoded_signature(model)
+    if signature is None:
+        print("The model has no serving_bytes signature; export it with api/export_serving.py", file=sys.stderr)
+        return 1
+    images = corpus(args.resolution, args.count)
+    print(f"{len(images)} {args.resolution} JPEGs, mean {np.mean([len(data) for data in images]) / 1e3:.0f} kB")
+
+    paths = (('pil', pil_path(model)), ('graph', graph_path(signature)))
+    for threads in (int(t) for t in args.threads.split(',')):
+        for name, classify in paths:
+            print(f"{name:>6} x{threads:<2} 1/call: {format_run(run(classify, [[data] for data in images], threads))}")
+    if args.batch_size:
+        batches = [images[i:i + args.batch_size] for i in range(0, len(images), args.batch_size)]
+        for name, classify in paths:
+            print(f"{name:>6} x1  {args.batch_size}/call: {format_run(run(classify, batches, 1))}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
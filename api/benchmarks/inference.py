@@ -0,0 +1,220 @@
+"""Benchmark suite for the inference paths.
+
+    python api/benchmarks/inference.py -o bench.json
+    python api/benchmarks/inference.py --suites http --start-server -o bench.json
+
+Suites:
+
+    decode     the /predict decode stage on synthetic JPEGs at each --resolutions
+    inference  predict_on_batch in this process at each --batch-sizes
+    http       POST /predict at each --concurrency level, against --url or
+               a server started with --start-server
+
+Every case runs --repeats times.  Each run records p50/p95/p99 latency,
+throughput and peak RSS, and for http the failed requests; latencies are
+null in a run where every request failed.  The JSON keeps every run so
+compare.py can tell noise from a regression.
+"""
+import argparse
+import http.client
+import os
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlsplit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common import format_run, latency_summary, peak_rss_mb, reset_peak_rss, save_results  # noqa: E402
+from synthetic import RESOLUTIONS, corpus  # noqa: E402
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def run_decode(images, repeats):
+    from agroaid.preprocess import decode_image
+
+    runs = []
+    for _ in range(repeats):
+        reset_peak_rss()
+        latencies = []
+        start = time.perf_counter()
+        for data in images:
+            t = time.perf_counter()
+            decode_image(BytesIO(data))
+            latencies.append(time.perf_counter() - t)
+        elapsed = time.perf_counter() - start
+        runs.append({**latency_summary(latencies), 'throughput': len(images) / elapsed, 'peak_rss_mb': peak_rss_mb()})
+    return runs
+
+
+def run_inference(model, images, batch_size, batches, repeats):
+    batch = np.stack([images[i % len(images)] for i in range(batch_size)])
+    model.predict_on_batch(batch)  # warm-up: graph tracing and allocator growth
+
+    runs = []
+    for _ in range(repeats):
+        reset_peak_rss()
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(batches):
+            t = time.perf_counter()
+            model.predict_on_batch(batch)
+            latencies.append(time.perf_counter() - t)
+        elapsed = time.perf_counter() - start
+        runs.append({**latency_summary(latencies), 'throughput': batch_size * batches / elapsed,
+                     'per_image_ms': 1000 * elapsed / (batch_size * batches), 'peak_rss_mb': peak_rss_mb()})
+    return runs
+
+
+def multipart(data, filename='leaf.jpg'):
+    boundary = uuid.uuid4().hex
+    body = (f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+            f'Content-Type: image/jpeg\r\n\r\n').encode() + data + f'\r\n--{boundary}--\r\n'.encode()
+    return body, f'multipart/form-data; boundary={boundary}'
+
+
+class Client:
+    """One keep-alive connection per worker thread."""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = http.client.HTTPConnection(self.host, self.port, timeout=120)
+        return connection
+
+    def request(self, method, path, body=None, headers=None):
+        connection = self._connection()
+        try:
+            connection.request(method, path, body, headers or {})
+            response = connection.getresponse()
+            return response.status, response.read()
+        except (http.client.HTTPException, OSError):
+            connection.close()
+            self._local.connection = None
+            raise
+
+    def post_image(self, payload):
+        body, content_type = payload
+        t = time.perf_counter()
+        status, _ = self.request('POST', '/predict', body, {'Content-Type': content_type})
+        return status, time.perf_counter() - t
+
+
+def run_http(client, payloads, concurrency, requests, repeats, server_pid=None):
+    for payload in payloads[:concurrency]:
+        client.post_image(payload)
+
+    runs = []
+    for _ in range(repeats):
+        if server_pid:
+            reset_peak_rss(server_pid)
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            start = time.perf_counter()
+            results = list(pool.map(client.post_image, (payloads[i % len(payloads)] for i in range(requests))))
+            elapsed = time.perf_counter() - start
+        latencies = [seconds for status, seconds in results if status == 200]
+        run = {**latency_summary(latencies), 'throughput': len(latencies) / elapsed,
+               'errors': len(results) - len(latencies), 'error_rate': 1 - len(latencies) / len(results)}
+        if server_pid:
+            run['peak_rss_mb'] = peak_rss_mb(server_pid)
+        runs.append(run)
+    return runs
+
+
+def start_server(url, timeout=180):
+    server = subprocess.Popen([sys.executable, os.path.join('api', 'main.py')], cwd=REPO_ROOT)
+    client = Client(url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f'api/main.py exited with code {server.returncode}')
+        try:
+            if client.request('GET', '/ping')[0] == 200:
+                return server
+        except OSError:
+            time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError(f'api/main.py did not answer /ping within {timeout}s')
+
+
+def int_list(text):
+    return [int(value) for value in text.split(',')]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark decode, batched inference and the /predict endpoint.')
+    parser.add_argument('-o', '--output', required=True, help='where to write the JSON results')
+    parser.add_argument('--suites', default='decode,inference', help='comma-separated: decode, inference, http')
+    parser.add_argument('--resolutions', default='vga,fhd,12mp', help=f'any of {", ".join(RESOLUTIONS)}')
+    parser.add_argument('--images', type=int, default=16, help='distinct synthetic images per resolution')
+    parser.add_argument('--batch-sizes', type=int_list, default=[1, 8, 32])
+    parser.add_argument('--batches', type=int, default=20, help='batches timed per inference run')
+    parser.add_argument('--model', help='SavedModel directory (default: AGRO_AID_MODEL_PATH or '
+                                        'the newest serving export)')
+    parser.add_argument('--url', default='http://localhost:8000')
+    parser.add_argument('--start-server', action='store_true', help='start api/main.py for the http suite')
+    parser.add_argument('--server-pid', type=int, help='pid of an already running server, for its peak RSS')
+    parser.add_argument('--concurrency', type=int_list, default=[1, 4, 16])
+    parser.add_argument('--requests', type=int, default=200, help='requests per http run')
+    parser.add_argument('--http-resolution', default='fhd')
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    # models/1 and api/main.py are resolved from the repository root
+    output = os.path.abspath(args.output)
+    os.chdir(REPO_ROOT)
+    suites = set(args.suites.split(','))
+    cases = {}
+
+    if 'decode' in suites:
+        for resolution in args.resolutions.split(','):
+            images = corpus(resolution, args.images)
+            cases[f'decode/{resolution}'] = run_decode(images, args.repeats)
+            print(f"decode/{resolution}: {format_run(cases[f'decode/{resolution}'][-1])}", file=sys.stderr)
+
+    if 'inference' in suites:
+        from agroaid.model import load_model, saved_model_path
+        from agroaid.preprocess import load_image
+
+        model = load_model(args.model or saved_model_path)
+        images = [load_image(BytesIO(data)) for data in corpus('vga', args.images)]
+        for batch_size in args.batch_sizes:
+            name = f'inference/b{batch_size}'
+            cases[name] = run_inference(model, images, batch_size, args.batches, args.repeats)
+            print(f"{name}: {format_run(cases[name][-1])}", file=sys.stderr)
+
+    if 'http' in suites:
+        server = start_server(args.url) if args.start_server else None
+        try:
+            client = Client(args.url)
+            payloads = [multipart(data) for data in corpus(args.http_resolution, args.images)]
+            pid = server.pid if server else args.server_pid
+            for concurrency in args.concurrency:
+                name = f'http/c{concurrency}'
+                cases[name] = run_http(client, payloads, concurrency, args.requests, args.repeats, pid)
+                print(f"{name}: {format_run(cases[name][-1])}", file=sys.stderr)
+        finally:
+            if server:
+                server.terminate()
+                server.wait(timeout=30)
+
+    settings = {key: value for key, value in vars(args).items() if key not in ('output', 'server_pid')}
+    save_results(output, cases, settings)
+    print(f"Wrote {len(cases)} cases to {output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""Measure what the /predict instrumentation costs per request.
+
+    python api/benchmarks/metrics_overhead.py [--iterations N]
+
+Times a bare request-shaped loop against the same loop wrapped in the
+metrics calls main.py makes, and reports the difference per request.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agroaid import metrics  # noqa: E402
+from agroaid.metrics import time_stage  # noqa: E402
+
+
+def bare_request():
+    pass
+
+
+def instrumented_request():
+    with metrics.IN_FLIGHT.track_inprogress(), metrics.STAGE_SECONDS.labels("total").time():
+        with time_stage("read"):
+            pass
+        metrics.UPLOAD_BYTES.observe(250_000)
+        with time_stage("decode"):
+            pass
+        metrics.IMAGE_MEGAPIXELS.observe(12.0)
+        with time_stage("preprocess"):
+            pass
+        with time_stage("inference"):
+            pass
+        metrics.PREDICTIONS.labels("Late Blight").inc()
+
+
+def best_of(function, iterations, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            function()
+        best = min(best, time.perf_counter() - start)
+    return best / iterations
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=100_000)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    bare = best_of(bare_request, args.iterations, args.repeats)
+    instrumented = best_of(instrumented_request, args.iterations, args.repeats)
+    overhead = instrumented - bare
+
+    start = time.perf_counter()
+    exposition = metrics.REGISTRY.render()
+    render = time.perf_counter() - start
+
+    print(f"instrumentation overhead: {overhead * 1e6:.2f} us per request")
+    print(f"  as a share of a 10 ms request: {overhead / 0.010:.3%}")
+    print(f"/metrics render: {render * 1e3:.2f} ms for {len(exposition.splitlines())} lines")
+
+
+if __name__ == "__main__":
+    main()
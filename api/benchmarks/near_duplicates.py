@@ -0,0 +1,105 @@
+"""Hit rate and agreement of the near-duplicate cache on re-framed shots.
+
+    python api/benchmarks/near_duplicates.py
+    python api/benchmarks/near_duplicates.py --images-dir PlantVillage/ --leaves 100 --distances 2,4,6,8,10
+
+Simulates scouts photographing each leaf several times: every source image
+is re-shot ``--shots`` times with a random crop, a small rotation and an
+exposure change, then re-encoded.  The shots are fed through the cache in
+order, the way /predict sees them, and for each hash and distance the
+benchmark reports:
+
+    hit rate    share of repeat shots answered from the cache
+    agreement   share of hits whose cached class matches a fresh prediction
+    false hits  share of first shots of a leaf that hit some other leaf
+
+Synthetic leaves are fine for the hit rates; point --images-dir at real
+photos for an agreement number that means anything.
+"""
+import argparse
+import os
+import sys
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import leaf_image  # noqa: E402
+
+from agroaid.dedup import HASHES, NearDuplicateCache  # noqa: E402
+from agroaid.preprocess import decode_image, iter_image_files  # noqa: E402
+
+
+def reshoot(image, rng):
+    width, height = image.size
+    scale = rng.uniform(0.85, 1.0)
+    w, h = int(width * scale), int(height * scale)
+    left, top = rng.integers(0, width - w + 1), rng.integers(0, height - h + 1)
+    shot = image.crop((left, top, left + w, top + h)).rotate(rng.uniform(-4, 4), Image.BILINEAR)
+    shot = Image.fromarray(np.clip(np.asarray(shot, np.float32) * rng.uniform(0.9, 1.1), 0, 255).astype(np.uint8))
+    buffer = BytesIO()
+    shot.save(buffer, 'JPEG', quality=int(rng.integers(75, 95)))
+    return buffer.getvalue()
+
+
+def sources(args):
+    if args.images_dir:
+        for path in list(iter_image_files(args.images_dir))[:args.leaves]:
+            with Image.open(path) as image:
+                yield image.convert('RGB')
+    else:
+        for seed in range(args.leaves):
+            yield leaf_image(1280, 960, seed=seed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--leaves', type=int, default=40, help='distinct leaves')
+    parser.add_argument('--shots', type=int, default=4, help='photos taken of each leaf')
+    parser.add_argument('--images-dir', help='real photos to use as the leaves')
+    parser.add_argument('--distances', default='2,4,6,8,10,12')
+    parser.add_argument('--model', help='SavedModel directory (default: AGRO_AID_MODEL_PATH or '
+                                        'the newest serving export)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    from agroaid.model import load_model, saved_model_path
+    model = load_model(args.model or saved_model_path)
+    rng = np.random.default_rng(args.seed)
+
+    # Decode and predict every shot once; the cache runs are then replays
+    shots = []
+    for leaf, image in enumerate(sources(args)):
+        for shot in range(args.shots):
+            shots.append((leaf, shot, decode_image(BytesIO(reshoot(image, rng)))[0]))
+    predictions = model.predict_on_batch(np.stack([image for _, _, image in shots]))
+    print(f"{len(shots)} shots of {len(shots) // args.shots} leaves")
+
+    for method in sorted(HASHES):
+        keys = [HASHES[method](image) for _, _, image in shots]
+        for distance in (int(d) for d in args.distances.split(',')):
+            cache = NearDuplicateCache(method, distance, capacity=len(shots))
+            hits = agreed = repeats = false_hits = firsts = 0
+            for (leaf, shot, _), key, fresh in zip(shots, keys, predictions):
+                cached = cache.lookup(key)
+                if shot == 0:
+                    firsts += 1
+                    false_hits += cached is not None
+                else:
+                    repeats += 1
+                if cached is None:
+                    cache.add(key, fresh)
+                    continue
+                hits += shot > 0
+                agreed += int(np.argmax(cached[0]) == np.argmax(fresh))
+            total_hits = hits + false_hits
+            print(f"{method} <= {distance:2d} bits: hit rate {hits / repeats:6.1%}, "
+                  f"agreement {agreed / total_hits if total_hits else float('nan'):6.1%}, "
+                  f"false hits {false_hits / firsts:6.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+"""Measure the rate limiter's cost per /predict call.
+
+    python api/benchmarks/ratelimit_overhead.py [--clients N] [--checks N]
+
+Times RateLimiter.check against the in-memory store and the shared SQLite
+store, with requests spread over --clients distinct IPs and API keys.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agroaid.ratelimit import MemoryStore, RateLimiter, SQLiteStore  # noqa: E402
+
+
+def per_check(limiter, clients, checks):
+    keys = [(f'key-{i}' if i % 4 == 0 else None, f'10.0.{i // 256}.{i % 256}') for i in range(clients)]
+    start = time.perf_counter()
+    for i in range(checks):
+        limiter.check(*keys[i % clients])
+    return (time.perf_counter() - start) / checks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=1000)
+    parser.add_argument('--checks', type=int, default=50_000)
+    args = parser.parse_args(argv)
+
+    api_keys = {f'key-{i}': 'partner' if i % 8 == 0 else 'member' for i in range(0, args.clients, 4)}
+    with tempfile.TemporaryDirectory() as tmp:
+        stores = {'memory': MemoryStore(), 'sqlite': SQLiteStore(os.path.join(tmp, 'buckets.db'))}
+        for name, store in stores.items():
+            limiter = RateLimiter(store, rate=5, burst=20, api_keys=api_keys)
+            checks = args.checks if name == 'memory' else max(1, args.checks // 10)
+            print(f"{name:>6} store: {per_check(limiter, args.clients, checks) * 1e6:8.2f} us per check "
+                  f"({args.clients} clients)")
+
+
+if __name__ == "__main__":
+    main()
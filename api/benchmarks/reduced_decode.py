@@ -0,0 +1,102 @@
+"""Reduced-resolution JPEG decode: speed and accuracy parity.
+
+    python api/benchmarks/reduced_decode.py
+    python api/benchmarks/reduced_decode.py --images-dir PlantVillage/ --limit 300
+
+Speed compares the old /predict decode (full-resolution
+read_file_as_image, then a resize to 256x256 standing in for the model's
+Resizing layer) against preprocess.decode_image, which uses JPEG DCT
+scaling and one resize.  Parity runs the model on both inputs and reports
+how often the predicted class agrees and how far the probabilities move.  Synthetic
+images are fine for timing; point --images-dir at real leaf photos for a
+meaningful parity number.
+"""
+import argparse
+import os
+import sys
+import time
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import RESOLUTIONS, corpus  # noqa: E402
+
+from agroaid.preprocess import IMAGE_SIZE, decode_image, iter_image_files, read_file_as_image  # noqa: E402
+
+
+def full_decode(data):
+    return read_file_as_image(data)
+
+
+def full_decode_and_resize(data):
+    image = Image.fromarray(full_decode(data)).convert('RGB')
+    return np.asarray(image.resize((IMAGE_SIZE, IMAGE_SIZE), Image.BILINEAR))
+
+
+def reduced_decode(data):
+    return decode_image(BytesIO(data))[0]
+
+
+def best_per_image(function, images, repeats=3):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for data in images:
+            function(data)
+        best = min(best, time.perf_counter() - start)
+    return best / len(images)
+
+
+def parity(model, images):
+    agree, deltas = 0, []
+    for data in images:
+        full = np.asarray(model.predict(np.expand_dims(full_decode(data)[..., :3], 0), verbose=0))[0]
+        reduced = np.asarray(model.predict(np.expand_dims(reduced_decode(data), 0), verbose=0))[0]
+        agree += int(np.argmax(full) == np.argmax(reduced))
+        deltas.append(float(np.abs(full - reduced).max()))
+    return agree / len(images), float(np.mean(deltas)), float(np.max(deltas))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resolutions', default='vga,fhd,12mp')
+    parser.add_argument('--count', type=int, default=8, help='synthetic images per resolution')
+    parser.add_argument('--images-dir', help='real photos to use for the parity check')
+    parser.add_argument('--limit', type=int, default=200, help='most images to use from --images-dir')
+    parser.add_argument('--model', help='SavedModel directory (default: AGRO_AID_MODEL_PATH or '
+                                        'the newest serving export)')
+    parser.add_argument('--skip-parity', action='store_true')
+    args = parser.parse_args(argv)
+
+    print(f"decode to {IMAGE_SIZE}x{IMAGE_SIZE}, ms per image (best of 3)")
+    synthetic = []
+    for resolution in args.resolutions.split(','):
+        images = corpus(resolution, args.count)
+        synthetic.extend(images)
+        full, reduced = best_per_image(full_decode_and_resize, images), best_per_image(reduced_decode, images)
+        width, height = RESOLUTIONS[resolution]
+        print(f"  {resolution:>5} {width}x{height}: full {full * 1000:7.1f}  reduced {reduced * 1000:6.1f}  "
+              f"({full / reduced:.1f}x)")
+
+    if args.skip_parity:
+        return 0
+    from agroaid.model import load_model, saved_model_path
+
+    model = load_model(args.model or saved_model_path)
+    if args.images_dir:
+        paths = [path for path in iter_image_files(args.images_dir)][:args.limit]
+        images = [open(path, 'rb').read() for path in paths]
+        source = f"{len(images)} images from {args.images_dir}"
+    else:
+        images, source = synthetic, f"{len(synthetic)} synthetic images"
+    agreement, mean_delta, max_delta = parity(model, images)
+    print(f"parity on {source}: top-1 agreement {agreement:.1%}, "
+          f"probability change mean {mean_delta:.4f} max {max_delta:.4f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
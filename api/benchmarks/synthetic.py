@@ -0,0 +1,59 @@
+"""Synthetic potato-leaf photos for benchmarks.
+
+Real field photos can't be shipped, so these are stand-ins with the same
+cost profile: a textured green leaf with veins and brown lesions on a soil
+background, saved as camera-like JPEGs.  The model's answer on them is
+meaningless; decode and inference time are not.
+"""
+from io import BytesIO
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter
+
+# Phone thumbnails up to 12 MP phone and 4K camera frames
+RESOLUTIONS = {
+    'vga': (640, 480),
+    'hd': (1280, 720),
+    'fhd': (1920, 1080),
+    '12mp': (4032, 3024),
+}
+
+
+def leaf_image(width, height, seed=0):
+    rng = np.random.default_rng(seed)
+    soil = rng.normal((96, 72, 48), 18, size=(height // 8 + 1, width // 8 + 1, 3))
+    image = Image.fromarray(np.clip(soil, 0, 255).astype(np.uint8)).resize((width, height), Image.BILINEAR)
+    draw = ImageDraw.Draw(image)
+
+    cx, cy = width * rng.uniform(0.4, 0.6), height * rng.uniform(0.4, 0.6)
+    rx, ry = width * rng.uniform(0.25, 0.4), height * rng.uniform(0.25, 0.4)
+    green = tuple(int(v) for v in rng.integers((40, 110, 30), (80, 170, 60)))
+    draw.ellipse((cx - rx, cy - ry, cx + rx, cy + ry), fill=green)
+    vein = tuple(min(255, v + 40) for v in green)
+    draw.line((cx - rx, cy, cx + rx, cy), fill=vein, width=max(2, width // 300))
+    for offset in np.linspace(-0.7, 0.7, 7):
+        x = cx + offset * rx
+        draw.line((x, cy, x + rx * 0.3, cy - ry * 0.6), fill=vein, width=max(1, width // 600))
+        draw.line((x, cy, x + rx * 0.3, cy + ry * 0.6), fill=vein, width=max(1, width // 600))
+
+    for _ in range(rng.integers(0, 12)):
+        angle, distance = rng.uniform(0, 2 * np.pi), rng.uniform(0, 0.8)
+        x, y = cx + np.cos(angle) * rx * distance, cy + np.sin(angle) * ry * distance
+        r = min(width, height) * rng.uniform(0.01, 0.05)
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=(int(rng.integers(60, 110)), 50, 20))
+
+    # Sensor noise and a little blur keep the JPEG from compressing unrealistically well
+    noisy = np.asarray(image, dtype=np.int16) + rng.integers(-12, 13, size=(height, width, 3), dtype=np.int16)
+    return Image.fromarray(np.clip(noisy, 0, 255).astype(np.uint8)).filter(ImageFilter.GaussianBlur(0.6))
+
+
+def leaf_jpeg(width, height, seed=0, quality=90):
+    buffer = BytesIO()
+    leaf_image(width, height, seed).save(buffer, 'JPEG', quality=quality)
+    return buffer.getvalue()
+
+
+def corpus(resolution, count, seed=0):
+    """``count`` distinct JPEGs at one of ``RESOLUTIONS`` (or a ``(w, h)`` tuple)."""
+    width, height = RESOLUTIONS[resolution] if isinstance(resolution, str) else resolution
+    return [leaf_jpeg(width, height, seed + i) for i in range(count)]
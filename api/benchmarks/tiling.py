@@ -0,0 +1,88 @@
+"""Cost of tiled inference on a large field photo.
+
+    python api/benchmarks/tiling.py
+    python api/benchmarks/tiling.py --image drone.jpg --batch-sizes 1,8,32
+
+Builds a synthetic 4032x3024 field frame (a grid of leaves with bare soil
+in between) unless --image is given, then times:
+
+    whole      decode_image and one forward pass, as /predict does
+    tiled      decode_frame, the leaf mask, and classify_tiles at each
+               --batch-sizes
+
+and prints how many windows were classified and how many the leaf mask
+skipped.
+"""
+import argparse
+import os
+import sys
+import time
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import leaf_image  # noqa: E402
+
+from agroaid.preprocess import decode_image  # noqa: E402
+from agroaid.tiling import classify_tiles, decode_frame, leaf_fractions, window_positions  # noqa: E402
+
+
+def field_jpeg(width=4032, height=3024, columns=6, rows=4, seed=0):
+    rng = np.random.default_rng(seed)
+    soil = rng.normal((96, 72, 48), 18, size=(height, width, 3))
+    frame = Image.fromarray(np.clip(soil, 0, 255).astype(np.uint8))
+    cell_w, cell_h = width // columns, height // rows
+    for i in range(rows * columns):
+        # Roughly a third of the cells stay bare soil
+        if rng.random() < 0.35:
+            continue
+        frame.paste(leaf_image(cell_w, cell_h, seed=seed + i), ((i % columns) * cell_w, (i // columns) * cell_h))
+    buffer = BytesIO()
+    frame.save(buffer, 'JPEG', quality=90)
+    return buffer.getvalue()
+
+
+def best_of(function, repeats):
+    best, result = float('inf'), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--image', help='a real field photo to use instead of the synthetic frame')
+    parser.add_argument('--stride', type=int, default=192)
+    parser.add_argument('--batch-sizes', default='1,32')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--model', help='SavedModel directory (default: AGRO_AID_MODEL_PATH or '
+                                        'the newest serving export)')
+    args = parser.parse_args(argv)
+
+    from agroaid.model import load_model, saved_model_path
+    model = load_model(args.model or saved_model_path)
+    data = open(args.image, 'rb').read() if args.image else field_jpeg()
+
+    whole, _ = best_of(lambda: model.predict_on_batch(decode_image(BytesIO(data))[0][None]), args.repeats)
+    decode, (frame, original_size) = best_of(lambda: decode_frame(BytesIO(data)), args.repeats)
+    ys = window_positions(frame.shape[0], 256, args.stride)
+    xs = window_positions(frame.shape[1], 256, args.stride)
+    mask, _ = best_of(lambda: leaf_fractions(frame, ys, xs, 256), args.repeats)
+    print(f"{original_size[0]}x{original_size[1]} frame decoded to {frame.shape[1]}x{frame.shape[0]}, "
+          f"{len(ys)}x{len(xs)} windows at stride {args.stride}")
+    print(f"   whole: {whole * 1000:7.1f} ms")
+    print(f"  decode: {decode * 1000:7.1f} ms, leaf mask {mask * 1000:.2f} ms")
+    for batch_size in (int(b) for b in args.batch_sizes.split(',')):
+        elapsed, result = best_of(lambda: classify_tiles(frame, model, args.stride, batch_size), args.repeats)
+        print(f"  tiled, batch {batch_size:3d}: {elapsed * 1000:7.1f} ms for {result['classified']} tiles "
+              f"({result['skipped']} skipped), verdict {result['class']} {result['class_counts']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""Measure what request tracing costs per /predict call, sampled and not.
+
+    python api/benchmarks/tracing_overhead.py [--iterations N]
+
+Runs the span structure main.py uses (a root span plus four stage spans)
+against an in-memory sink with tracing off and fully on.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agroaid.tracing import MemorySink, Tracer  # noqa: E402
+
+
+def traced_request(tracer):
+    with tracer.start_trace("predict") as root:
+        for stage in ("read", "decode", "preprocess", "inference"):
+            with tracer.span(stage) as span:
+                span.set("stage", stage)
+        root.set("class", "Late Blight")
+
+
+def per_request(tracer, iterations, repeats):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            traced_request(tracer)
+        best = min(best, time.perf_counter() - start)
+        tracer.exporter.flush()
+    return best / iterations
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=20_000)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    for label, rate in (("off", 0.0), ("10% sampled", 0.1), ("always on", 1.0)):
+        tracer = Tracer(rate, MemorySink())
+        cost = per_request(tracer, args.iterations, args.repeats)
+        print(f"tracing {label:>12}: {cost * 1e6:6.2f} us per request "
+              f"({tracer.exporter.exported} spans exported, {tracer.exporter.dropped} dropped)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Latency and accuracy of test-time augmentation against single-view inference.
+
+    python api/benchmarks/tta.py
+    python api/benchmarks/tta.py --images-dir PlantVillage/ --limit 600 --views 1,2,4,8
+
+Runs each image the way /predict?tta=N does: one batch of N flipped and
+rotated views, one forward pass, probabilities averaged.  Reports the
+per-image latency and, for each view count:
+
+    accuracy     against the class in the parent folder name, with --images-dir
+                 (folders such as Potato___Early_blight, Potato___healthy)
+    agreement    top-1 agreement with single-view inference
+    borderline   how many single-view predictions under 80% confidence changed
+"""
+import argparse
+import os
+import sys
+import time
+from io import BytesIO
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import corpus  # noqa: E402
+
+from agroaid.model import MAX_TTA, average_views, class_from_path, tta_batch  # noqa: E402
+from agroaid.preprocess import batch_buffer, decode_image, iter_image_files  # noqa: E402
+
+
+def predict_views(model, image, views):
+    batch = batch_buffer(views)
+    batch[0] = image
+    tta_batch(batch[:1], views, out=batch)
+    return average_views(model.predict_on_batch(batch), views)[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--views', default='1,2,4,8')
+    parser.add_argument('--images-dir', help='labelled photos, one folder per class')
+    parser.add_argument('--limit', type=int, default=300)
+    parser.add_argument('--count', type=int, default=48, help='synthetic images without --images-dir')
+    parser.add_argument('--model', help='SavedModel directory (default: AGRO_AID_MODEL_PATH or '
+                                        'the newest serving export)')
+    args = parser.parse_args(argv)
+
+    from agroaid.model import load_model, saved_model_path
+    model = load_model(args.model or saved_model_path)
+    if args.images_dir:
+        paths = list(iter_image_files(args.images_dir))[:args.limit]
+        images = [decode_image(path)[0] for path in paths]
+        labels = np.array([class_from_path(path) for path in paths], dtype=object)
+    else:
+        images = [decode_image(BytesIO(data))[0] for data in corpus('vga', args.count)]
+        labels = np.full(len(images), None, dtype=object)
+    labelled = labels != None  # noqa: E711
+
+    views_list = [int(v) for v in args.views.split(',')]
+    if 1 not in views_list:
+        views_list.insert(0, 1)
+    single = None
+    print(f"{len(images)} images, {int(labelled.sum())} labelled; up to {MAX_TTA} views")
+    for views in views_list:
+        predict_views(model, images[0], views)
+        times, probabilities = [], []
+        for image in images:
+            start = time.perf_counter()
+            probabilities.append(predict_views(model, image, views))
+            times.append(time.perf_counter() - start)
+        probabilities = np.array(probabilities)
+        top = probabilities.argmax(axis=1)
+        if single is None:
+            single = probabilities
+        single_top = single.argmax(axis=1)
+        borderline = single.max(axis=1) < 0.8
+        text = f"{views} views: p50 {np.median(times) * 1000:6.1f} ms"
+        if labelled.any():
+            text += f", accuracy {np.mean(top[labelled] == labels[labelled].astype(int)):6.1%}"
+        text += (f", agreement {np.mean(top == single_top):6.1%}, "
+                 f"borderline changed {int((top != single_top)[borderline].sum())}/{int(borderline.sum())}")
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
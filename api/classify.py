@@ -0,0 +1,56 @@
+"""Classify every image under one or more directories.
+
+    python api/classify.py photos/ -o results.csv --batch-size 64 --workers 8
+
+Results are streamed to CSV or JSONL (picked from the output extension).
+Rerunning the same command after an interruption skips the files that are
+already in the output.
+"""
+import argparse
+import sys
+import time
+
+from agroaid.batch import ResultWriter, classify_stream
+from agroaid.model import load_model, saved_model_path
+from agroaid.preprocess import iter_image_files
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Batch potato leaf disease classification.')
+    parser.add_argument('inputs', nargs='+', help='image files or directories to walk')
+    parser.add_argument('-o', '--output', required=True, help='results file (.csv or .jsonl)')
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help='override the format picked from the extension')
+    parser.add_argument('--model', default=saved_model_path, help='SavedModel directory')
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--workers', type=int, default=4, help='decode processes (1 decodes in this process)')
+    parser.add_argument('--restart', action='store_true', help='ignore existing results and start over')
+    args = parser.parse_args(argv)
+
+    with ResultWriter(args.output, args.format, resume=not args.restart) as writer:
+        skipped = len(writer.completed)
+        paths = (path for root in args.inputs for path in iter_image_files(root) if path not in writer.completed)
+        model = load_model(args.model)
+
+        done = errors = 0
+        start = last_report = time.perf_counter()
+        try:
+            for rows in classify_stream(paths, model, args.batch_size, args.workers):
+                writer.write(rows)
+                done += len(rows)
+                errors += sum('error' in row for row in rows)
+                now = time.perf_counter()
+                if now - last_report >= 5:
+                    print(f"{done} images, {done / (now - start):.1f} images/s, {errors} errors", file=sys.stderr)
+                    last_report = now
+        except KeyboardInterrupt:
+            print(f"Interrupted after {done} images; rerun the same command to resume.", file=sys.stderr)
+            return 130
+
+    elapsed = time.perf_counter() - start
+    print(f"Classified {done} images in {elapsed:.1f}s ({done / max(elapsed, 1e-9):.1f} images/s), "
+          f"{errors} errors, {skipped} already done.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
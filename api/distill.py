@@ -0,0 +1,95 @@
+"""Distill models/1 into a compact student and export it as a new model version.
+
+    python api/distill.py "PlantVillage/" --epochs 20
+    AGRO_AID_STUDENT_MODEL_PATH=models/2 python api/main.py
+
+The images (one folder per class, as in the training notebook) are
+decoded and scored by the teacher once into --cache-dir; later runs with
+the same images and teacher reuse that.  The student is exported to the
+next numbered directory under --models-dir with its FLOPs, size and
+validation accuracy (and the teacher's) in assets.extra/model.json.
+"""
+import argparse
+import os
+import sys
+import time
+
+from agroaid.distillation import build_cache, build_student, evaluate, split, train, with_softmax
+from agroaid.export import count_flops, directory_bytes, save_version
+from agroaid.model import load_model
+
+
+def log(message):
+    print(message, file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Distill the potato disease model into a smaller student.')
+    parser.add_argument('data_dir', help='PlantVillage-style directory, one folder per class')
+    # The trained model, not the newest export, which may itself be a student or pruned
+    parser.add_argument('--teacher', default=os.environ.get('AGRO_AID_MODEL_PATH') or 'models/1',
+                        help='teacher SavedModel directory')
+    parser.add_argument('--models-dir', default='models', help='where the student is saved as the next version')
+    parser.add_argument('--cache-dir', default='.distill-cache', help='decoded images and teacher logits')
+    parser.add_argument('--width', type=int, default=16, help='filters in the first student layer')
+    parser.add_argument('--epochs', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--temperature', type=float, default=4.0)
+    parser.add_argument('--alpha', type=float, default=0.7, help='weight of the soft-target loss')
+    parser.add_argument('--learning-rate', type=float, default=1e-3)
+    parser.add_argument('--val-fraction', type=float, default=0.1)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    teacher = load_model(args.teacher)
+    paths, images, labels, teacher_logits = build_cache(args.data_dir, teacher, args.teacher, args.cache_dir, log=log)
+    train_indices, val_indices = split(paths, args.val_fraction)
+    log(f"{len(train_indices)} training and {len(val_indices)} validation images, "
+        f"{int((labels >= 0).sum())} with a class folder")
+
+    import tensorflow as tf
+    tf.random.set_seed(args.seed)
+    student = build_student(args.width)
+    start = time.perf_counter()
+    train(student, images, labels, teacher_logits, train_indices, args.epochs, args.batch_size,
+          args.temperature, args.alpha, args.learning_rate, args.seed, log=log)
+    training_seconds = time.perf_counter() - start
+
+    accuracy, agreement = evaluate(student, images, labels, teacher_logits, val_indices)
+    teacher_accuracy, _ = evaluate(teacher, images, labels, teacher_logits, val_indices)
+    metadata = {
+        'kind': 'distilled student',
+        'teacher': os.path.abspath(args.teacher),
+        'settings': {key: getattr(args, key) for key in
+                     ('width', 'epochs', 'batch_size', 'temperature', 'alpha', 'learning_rate', 'val_fraction', 'seed')},
+        'images': {'train': len(train_indices), 'validation': len(val_indices)},
+        'training_seconds': round(training_seconds, 1),
+        'parameters': int(student.count_params()),
+        'flops': count_flops(student),
+        'teacher_parameters': int(teacher.count_params()) if hasattr(teacher, 'count_params') else None,
+        'teacher_flops': count_flops(teacher),
+        'teacher_size_bytes': directory_bytes(args.teacher),
+        'val_accuracy': accuracy,
+        'teacher_val_accuracy': teacher_accuracy,
+        'val_agreement_with_teacher': agreement,
+    }
+    path, metadata = save_version(with_softmax(student), args.models_dir, metadata)
+
+    def ratio(a, b):
+        return f" ({a / b:.1%} of the teacher)" if a and b else ''
+
+    print(f"Saved student to {path}")
+    print(f"  parameters {metadata['parameters']:,}{ratio(metadata['parameters'], metadata['teacher_parameters'])}")
+    if metadata['flops']:
+        print(f"  FLOPs/image {metadata['flops'] / 1e6:.1f}M{ratio(metadata['flops'], metadata['teacher_flops'])}")
+    print(f"  size {metadata['size_bytes'] / 1e6:.2f} MB{ratio(metadata['size_bytes'], metadata['teacher_size_bytes'])}")
+    for name, value in (('student', accuracy), ('teacher', teacher_accuracy)):
+        if value is not None:
+            print(f"  {name} validation accuracy {value:.1%}")
+    if agreement is not None:
+        print(f"  agreement with the teacher {agreement:.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
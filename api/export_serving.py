@@ -0,0 +1,81 @@
+"""Export models/1 without its training-only layers as a new model version.
+
+    python api/export_serving.py
+
+The exported model takes uint8 (batch, 256, 256, 3) images, which is what
+preprocess already produces.  RandomFlip and RandomRotation are dropped,
+the Resizing to 256x256 is dropped, and the 1/255 Rescaling is folded into
+the first convolution's kernel.  It is saved as the next numbered version
+under --models-dir and marked as a serving export in
+assets.extra/model.json; from then on every entry point loads it by
+default (AGRO_AID_MODEL_PATH still overrides).
+
+Besides serving_default on uint8 pixels, the export has a serving_bytes
+signature that takes encoded JPEG/PNG strings and decodes them in the
+graph; /predict uses it with AGRO_AID_DECODE_IN_GRAPH=1.
+"""
+import argparse
+import os
+import sys
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from agroaid.export import save_version, serving_model, serving_signatures
+from agroaid.model import load_model, predict_encoded
+from agroaid.preprocess import IMAGE_SIZE, decode_image
+from agroaid.pruning import cpu_latency
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Export the potato disease model for serving.')
+    parser.add_argument('--model', default=os.environ.get('AGRO_AID_MODEL_PATH', 'models/1'),
+                        help='SavedModel directory saved by the training notebook')
+    parser.add_argument('--models-dir', default='models', help='where the export is saved as the next version')
+    parser.add_argument('--tolerance', type=float, default=1e-4,
+                        help='largest allowed difference from the original probabilities')
+    args = parser.parse_args(argv)
+
+    model = load_model(args.model)
+    serving = serving_model(model)
+
+    images = np.random.default_rng(0).integers(0, 256, (8, IMAGE_SIZE, IMAGE_SIZE, 3), dtype=np.uint8)
+    difference = float(np.abs(np.asarray(model(images, training=False)) - serving.predict_on_batch(images)).max())
+    if difference > args.tolerance:
+        print(f"Export differs from {args.model} by up to {difference:.2e}; not saving", file=sys.stderr)
+        return 1
+
+    metadata = {
+        'kind': 'serving',
+        'source': os.path.abspath(args.model),
+        'input': {'dtype': 'uint8', 'shape': [None, IMAGE_SIZE, IMAGE_SIZE, 3]},
+        'layers': [layer.name for layer in serving.layers],
+        'max_difference_from_source': difference,
+        'signatures': ['serving_default', 'serving_bytes'],
+        'cpu_latency_ms': round(cpu_latency(serving) * 1000, 2),
+        'source_cpu_latency_ms': round(cpu_latency(model) * 1000, 2),
+    }
+    path, metadata = save_version(serving, args.models_dir, metadata, signatures=serving_signatures(serving))
+
+    # serving_bytes decodes and resizes with TensorFlow rather than PIL, so
+    # its pixels, and sometimes a borderline prediction, differ slightly
+    reloaded = load_model(path)
+    encoded = []
+    for image in images:
+        buffer = BytesIO()
+        Image.fromarray(image).resize((640, 480), Image.BILINEAR).save(buffer, 'JPEG', quality=90)
+        encoded.append(buffer.getvalue())
+    in_graph = predict_encoded(reloaded.signatures['serving_bytes'], encoded)
+    pil = reloaded.predict_on_batch(np.stack([decode_image(BytesIO(data))[0] for data in encoded]))
+    print(f"Saved serving model to {path}")
+    print(f"  layers: {', '.join(metadata['layers'])}")
+    print(f"  max difference from {args.model}: {difference:.2e}")
+    print(f"  CPU latency {metadata['cpu_latency_ms']:.1f} ms/image (was {metadata['source_cpu_latency_ms']:.1f} ms)")
+    print(f"  serving_bytes vs PIL decoding: max probability difference {np.abs(in_graph - pil).max():.3f}, "
+          f"top-1 agreement {np.mean(in_graph.argmax(axis=1) == pil.argmax(axis=1)):.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
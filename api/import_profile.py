@@ -0,0 +1,135 @@
+"""Startup import-time report for the Agro-Aid entry points.
+
+Runs each entry point in a fresh interpreter under ``-X importtime`` and
+summarises where the cold-start import time goes, grouped by top-level
+package.  Run it from the repository root:
+
+    python api/import_profile.py                      # every entry point
+    python api/import_profile.py api/god.py --top 10
+    python api/import_profile.py --json importtime.json
+    python api/import_profile.py --baseline importtime.json
+
+Streamlit scripts are executed in bare mode, so the numbers describe what a
+cold start on the default (Home) page pays before the first render.
+"""
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Packages that should only be imported by the pages that need them
+HEAVY_PACKAGES = ['tensorflow', 'keras', 'pygame', 'pydub', 'gtts', 'plyer', 'tabulate', 'termcolor', 'googletrans']
+
+# Execute the entry point without triggering its ``__main__`` block, then
+# exit hard so background threads (reminder schedulers, servers) can't hang us
+RUNNER = '''
+import os, runpy, sys, traceback
+sys.path.insert(0, {api_dir!r})
+try:
+    runpy.run_path({entry!r}, run_name='__import_profile__')
+except BaseException:
+    traceback.print_exc()
+    sys.stderr.flush()
+    os._exit(1)
+sys.stderr.flush()
+os._exit(0)
+'''
+
+
+def default_entry_points():
+    return sorted(path for path in glob.glob(os.path.join(API_DIR, '*.py')) if os.path.abspath(path) != os.path.abspath(__file__))
+
+
+def run_importtime(entry, timeout):
+    code = RUNNER.format(api_dir=API_DIR, entry=os.path.abspath(entry))
+    process = subprocess.Popen([sys.executable, '-X', 'importtime', '-c', code],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    try:
+        _, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        _, stderr = process.communicate()
+    return process.returncode, stderr
+
+
+def parse_importtime(stderr):
+    """Return ``[(module, self_us, cumulative_us, depth)]`` from ``-X importtime`` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header line
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(fields[0]), int(fields[1]), depth))
+    return rows
+
+
+def summarise(rows):
+    packages = {}
+    for module, self_us, _, _ in rows:
+        package = module.split('.')[0]
+        entry = packages.setdefault(package, {'self_us': 0, 'modules': 0})
+        entry['self_us'] += self_us
+        entry['modules'] += 1
+    return {
+        'total_us': sum(self_us for _, self_us, _, _ in rows),
+        'modules': len(rows),
+        'packages': packages,
+        'heavy': sorted(package for package in HEAVY_PACKAGES if package in packages),
+    }
+
+
+def print_report(entry, report, top, baseline=None):
+    print(f"\n== {os.path.relpath(entry)} ==")
+    line = f"total import time: {report['total_us'] / 1000:.1f} ms over {report['modules']} modules"
+    if baseline:
+        delta = report['total_us'] - baseline['total_us']
+        line += f" ({delta / 1000:+.1f} ms vs baseline)"
+    print(line)
+    if report.get('returncode'):
+        print(f"warning: entry point exited with status {report['returncode']}, report covers imports up to the failure")
+    print(f"{'package':<28}{'self ms':>10}{'modules':>9}")
+    ranked = sorted(report['packages'].items(), key=lambda item: item[1]['self_us'], reverse=True)
+    for package, stats in ranked[:top]:
+        print(f"{package:<28}{stats['self_us'] / 1000:>10.1f}{stats['modules']:>9}")
+    if report['heavy']:
+        print('heavy packages imported at startup: ' + ', '.join(report['heavy']))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Import-time report per Agro-Aid entry point.')
+    parser.add_argument('entries', nargs='*', help='entry point scripts (default: every script in api/)')
+    parser.add_argument('--top', type=int, default=15, help='packages to list per entry point')
+    parser.add_argument('--timeout', type=float, default=120, help='seconds to wait for each entry point')
+    parser.add_argument('--json', help='write the full report to this file')
+    parser.add_argument('--baseline', help='compare against a report written earlier with --json')
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    for entry in args.entries or default_entry_points():
+        returncode, stderr = run_importtime(entry, args.timeout)
+        report = summarise(parse_importtime(stderr))
+        report['returncode'] = returncode
+        key = os.path.relpath(entry)
+        results[key] = report
+        print_report(entry, report, args.top, baseline.get(key))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Process batch jobs submitted to POST /jobs outside the API process.
+
+    AGRO_AID_JOB_WORKERS=0 python api/main.py
+    python api/jobs_worker.py --threads 2 --batch-size 64
+
+Workers share the queue through the jobs database and spool directory
+(AGRO_AID_JOBS_DB, AGRO_AID_JOB_SPOOL), so run as many of these as the
+hardware allows; each claim is a batch of images, not a whole job.
+"""
+import argparse
+import signal
+import sys
+import threading
+
+from agroaid.jobs import JOBS_DB_PATH, SPOOL_DIR, JobStore, JobWorker
+from agroaid.model import load_model, saved_model_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Classify queued batch jobs.')
+    parser.add_argument('--db', default=JOBS_DB_PATH, help='jobs database shared with the API')
+    parser.add_argument('--spool', default=SPOOL_DIR, help='spool directory shared with the API')
+    parser.add_argument('--model', default=saved_model_path, help='SavedModel directory')
+    parser.add_argument('--threads', type=int, default=1)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--lease', type=float, default=300.0, help='seconds before an unfinished claim is retried')
+    args = parser.parse_args(argv)
+
+    store = JobStore(args.db, args.spool)
+    model = load_model(args.model)
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+
+    threads = []
+    for i in range(args.threads):
+        worker = JobWorker(store, model, args.batch_size, args.lease)
+        thread = threading.Thread(target=worker.run, args=(stop_event,), name=f'job-worker-{i}')
+        thread.start()
+        threads.append(thread)
+    try:
+        while not stop_event.wait(1):
+            pass
+    except KeyboardInterrupt:
+        stop_event.set()
+    for thread in threads:
+        thread.join()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
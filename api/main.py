@@ -1,44 +1,398 @@
+import json
+import logging
 import os
-from fastapi import FastAPI, UploadFile, File
+import re
+import time
+from typing import List
+
+from fastapi import FastAPI, UploadFile, File, Header, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
 import uvicorn
-from io import BytesIO
 
-from PIL import Image
 import numpy as np
 
-import tensorflow as tf
+from agroaid import metrics, tracing
+from agroaid.admission import Rejected, controller_from_env
+from agroaid.archive import count_images, is_archive, iter_archive
+from agroaid.batch import classify_sources
+from agroaid.cascade import Cascade, cascade_from_env
+from agroaid.coalesce import coalescer_from_env, content_key
+from agroaid.dedup import cache_from_env
+from agroaid.jobs import JobStore, start_workers
+from agroaid.metrics import time_stage
+from agroaid.model import (CLASS_NAMES, MAX_TTA, average_views, encoded_signature, load_model, predict_encoded,
+                           tta_batch)
+from agroaid.preprocess import (MAX_DECODE_PIXELS, MAX_UPLOAD_BYTES, ImageRejected, batch_buffer, decode_into,
+                                is_image_file, open_image, source_size)
+from agroaid.ratelimit import SQLiteStore, limiter_from_env
+from agroaid.tiling import MIN_LEAF, classify_tiles, decode_frame
+
+log = logging.getLogger(__name__)
+
 app = FastAPI()
-saved_model_path = "models/1"
 
-# Check if the directory exists
-if not os.path.exists(saved_model_path):
-    raise FileNotFoundError(f"SavedModel directory '{saved_model_path}' does not exist.")
+# Load the model at startup so the first request doesn't pay for it; with
+# AGRO_AID_STUDENT_MODEL_PATH set it is wrapped in a student-first cascade
+MODEL = cascade_from_env(load_model())
+
+ADMISSION = controller_from_env()
+LIMITER = limiter_from_env()
+DEDUP = cache_from_env()
+COALESCER = coalescer_from_env()
+# Views averaged per /predict request unless ?tta= says otherwise; 1 is plain inference
+DEFAULT_TTA = int(os.environ.get('AGRO_AID_TTA', '1'))
+if not 1 <= DEFAULT_TTA <= MAX_TTA:
+    raise ValueError(f"AGRO_AID_TTA must be between 1 and {MAX_TTA}, got {DEFAULT_TTA}")
+# With AGRO_AID_DECODE_IN_GRAPH=1 and a serving export loaded (api/export_serving.py),
+# plain single-view uploads go to the model as bytes and are decoded by TensorFlow.
+# A cascade has no such signature: its student answers first, and sending bytes
+# straight to the full model would skip it
+ENCODED = encoded_signature(MODEL) if os.environ.get('AGRO_AID_DECODE_IN_GRAPH') == '1' else None
+if os.environ.get('AGRO_AID_DECODE_IN_GRAPH') == '1' and ENCODED is None:
+    if isinstance(MODEL, Cascade):
+        log.warning("AGRO_AID_DECODE_IN_GRAPH=1 is ignored with AGRO_AID_STUDENT_MODEL_PATH set; "
+                    "uploads are decoded with PIL so the student model still runs first")
+    else:
+        log.warning("AGRO_AID_DECODE_IN_GRAPH=1 is ignored: the model has no serving_bytes signature; "
+                    "export it with api/export_serving.py")
+# Image modes serving_bytes can decode to RGB; CMYK and YCCK JPEGs make decode_jpeg fail
+ENCODED_MODES = ('RGB', 'L', 'RGBA', 'P')
 
-# Load the model
-MODEL = tf.keras.models.load_model(saved_model_path)
+# Batch jobs are processed by worker threads here and/or by api/jobs_worker.py.
+# The store and workers start with the server, not on import
+JOBS = None
+JOB_WORKERS = None
+MAX_JOB_ITEMS = int(os.environ.get('AGRO_AID_MAX_JOB_ITEMS', '100000'))
 
 
-CLASS_NAMES = ["Early Blight","Late Blight","Healthy"]
+@app.on_event("startup")
+def start_jobs():
+    global JOBS, JOB_WORKERS
+    JOBS = JobStore()
+    JOB_WORKERS = start_workers(JOBS, MODEL, int(os.environ.get('AGRO_AID_JOB_WORKERS', '1')))
+
+@app.on_event("shutdown")
+def stop_jobs():
+    if JOB_WORKERS is not None:
+        JOB_WORKERS.set()
+
 @app.get("/ping")
 async def ping():
     return "Hello, I'm alive"
-def read_file_as_image(data) ->np.ndarray:
-    image = np.array(Image.open(BytesIO(data)))
-    return image
-    pass
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    return Response(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/traces/{trace_id}")
+async def get_trace(trace_id: str, x_trace_token: str = Header(None)):
+    # Spans carry upload sizes and timings, so reading them back needs AGRO_AID_TRACE_TOKEN
+    if not tracing.TRACER.authorized(x_trace_token):
+        raise HTTPException(status_code=403, detail="Reading traces needs a valid X-Trace-Token")
+    # A file sink is read from the start, so keep it off the event loop
+    await run_in_threadpool(tracing.TRACER.exporter.flush)
+    spans = await run_in_threadpool(tracing.TRACER.sink.get, trace_id)
+    if spans is None:
+        raise HTTPException(status_code=404, detail="Unknown trace id")
+    return spans
+
+# A caller-chosen trace id is echoed back in a header, so keep it tame
+TRACE_ID_PATTERN = re.compile(r'[0-9A-Za-z_-]{1,64}')
+
+def classify_encoded(source):
+    # PIL only reads the header here, so the decode guard still applies; other
+    # formats and modes, and images too large to decode without JPEG draft
+    # scaling, return None and go through the PIL path
+    position = source.tell()
+    image, (width, height) = open_image(source)
+    # Leaving the with block drops PIL's reference to the upload without
+    # closing it, which image.close() would
+    with image:
+        supported = (image.format in ('JPEG', 'PNG') and image.mode in ENCODED_MODES
+                     and width * height <= MAX_DECODE_PIXELS)
+    source.seek(position)
+    if not supported:
+        return None
+    metrics.IMAGE_MEGAPIXELS.observe(width * height / 1e6)
+    data = source.read()
+    with time_stage("inference"), tracing.span("inference") as span:
+        span.set("decoded_in_graph", True)
+        predictions = predict_encoded(ENCODED, [data])
+    return CLASS_NAMES[np.argmax(predictions)], np.max(predictions[0])
+
+def classify_upload(source, views=1):
+    if ENCODED is not None and views == 1 and not DEDUP.enabled:
+        result = classify_encoded(source)
+        if result is not None:
+            return result
+    # Decode straight from the spooled upload into this thread's batch buffer;
+    # the tensor conversion inside the model is the only other copy
+    batch = batch_buffer(views)
+    with time_stage("decode"), tracing.span("decode") as span:
+        info = decode_into(source, batch[0])
+        span.set("original_size", list(info.original_size))
+        span.set("decoded_size", list(info.decoded_size))
+    width, height = info.original_size
+    metrics.IMAGE_MEGAPIXELS.observe(width * height / 1e6)
+    metrics.DECODE_BYTES.observe(info.decoded_bytes)
+    cached = None
+    # The cache holds single-view results, so TTA requests neither use nor fill it
+    dedup = DEDUP.enabled and views == 1
+    if dedup:
+        with time_stage("dedup"), tracing.span("dedup") as span:
+            key = DEDUP.hash(batch[0])
+            cached = DEDUP.lookup(key)
+            span.set("distance", cached[1] if cached else None)
+        metrics.DEDUP_LOOKUPS.labels("hit" if cached else "miss").inc()
+        if cached is not None and not DEDUP.should_verify():
+            return CLASS_NAMES[np.argmax(cached[0])], np.max(cached[0])
+    if views > 1:
+        # Test-time augmentation: the other views fill the rest of the buffer, one forward pass
+        with time_stage("augment"), tracing.span("augment") as span:
+            tta_batch(batch[:1], views, out=batch)
+            span.set("views", views)
+    with time_stage("inference"), tracing.span("inference"):
+        predictions = MODEL.predict_on_batch(batch)
+    if views > 1:
+        predictions = average_views(predictions, views)
+    if cached is not None:
+        agreed = np.argmax(cached[0]) == np.argmax(predictions[0])
+        metrics.DEDUP_VERIFIED.labels("yes" if agreed else "no").inc()
+    elif dedup:
+        DEDUP.add(key, predictions[0])
+    return CLASS_NAMES[np.argmax(predictions)], np.max(predictions[0])
+
+async def check_rate_limit(request, response, api_key, cost=1):
+    # Returns the X-RateLimit headers, which are also set on ``response``
+    if not LIMITER.enabled:
+        return {}
+    client_ip = request.client.host if request.client else None
+    if isinstance(LIMITER.store, SQLiteStore):
+        # BEGIN IMMEDIATE can wait on another worker's write lock; keep that off the event loop
+        decision = await run_in_threadpool(LIMITER.check, api_key, client_ip, cost)
+    else:
+        decision = LIMITER.check(api_key, client_ip, cost)
+    headers = {"X-RateLimit-Limit": str(decision.limit), "X-RateLimit-Remaining": str(decision.remaining)}
+    if not decision.allowed:
+        metrics.REJECTED.labels("rate limited").inc()
+        if cost > decision.limit:
+            raise HTTPException(status_code=429, headers=headers,
+                                detail=f"{cost} images is more than the burst of {decision.limit} "
+                                       f"for {decision.priority} clients")
+        raise HTTPException(status_code=429, detail=f"Rate limit exceeded for {decision.priority} clients",
+                            headers={**headers, "Retry-After": str(decision.retry_after)})
+    response.headers.update(headers)
+    return headers
+
+def count_upload_images(files):
+    return sum(count_images(upload.file, upload.filename) if is_archive(upload.filename)
+               else is_image_file(upload.filename or '') for upload in files)
+
+async def check_batch_rate_limit(request, response, api_key, files):
+    # Batches and jobs pay one token per image, archive members included
+    if not LIMITER.enabled:
+        return {}
+    cost = max(1, await run_in_threadpool(count_upload_images, files))
+    return await check_rate_limit(request, response, api_key, cost)
+
+def check_upload_size(file):
+    # Oversized uploads are turned away before they cost a queue slot
+    upload_size = source_size(file.file)
+    if upload_size is not None and upload_size > MAX_UPLOAD_BYTES:
+        metrics.REJECTED.labels("upload too large").inc()
+        raise HTTPException(status_code=413, detail=f"Upload is larger than {MAX_UPLOAD_BYTES} bytes")
+    return upload_size
+
+def start_trace(name, x_trace_id, x_trace_token, response):
+    if x_trace_id is not None and not TRACE_ID_PATTERN.fullmatch(x_trace_id):
+        x_trace_id = None
+    # Only holders of the trace token can force a trace past the sample rate
+    root = tracing.TRACER.start_trace(name, x_trace_id, force=tracing.TRACER.authorized(x_trace_token))
+    if root.trace_id is not None:
+        response.headers[tracing.TRACE_HEADER] = root.trace_id
+    return root
 
 @app.post("/predict")
-async def predict(file: UploadFile = File(...)):
-    image = read_file_as_image(await file.read())
-    img_batch = np.expand_dims(image,0)
-    predictions = MODEL.predict(img_batch)
-    predicted_class = CLASS_NAMES[np.argmax(predictions)]
-    confidence = np.max(predictions[0])
-    print(predicted_class,confidence)
+async def predict(request: Request, response: Response, file: UploadFile = File(...),
+                  tta: int = Query(None, ge=1, le=MAX_TTA),
+                  x_trace_id: str = Header(None), x_trace_token: str = Header(None),
+                  x_api_key: str = Header(None)):
+    views = tta or DEFAULT_TTA
+    await check_rate_limit(request, response, x_api_key)
+    upload_size = check_upload_size(file)
+    root = start_trace("predict", x_trace_id, x_trace_token, response)
+    with root, metrics.IN_FLIGHT.track_inprogress(), metrics.STAGE_SECONDS.labels("total").time():
+        if upload_size is not None:
+            metrics.UPLOAD_BYTES.observe(upload_size)
+        if COALESCER.enabled:
+            with time_stage("hash"), tracing.span("hash"):
+                key = f"{await run_in_threadpool(content_key, file.file)}:{views}"
+            # Identical uploads already in flight share one slot and one inference
+            wait_start = time.perf_counter()
+            with tracing.span("coalesce") as span:
+                result, shared = await COALESCER.run(key, lambda: admit_and_run(classify_upload, file.file, views))
+                span.set("shared", shared)
+        else:
+            result, shared = await admit_and_run(classify_upload, file.file, views), False
+        (predicted_class, confidence), queue_wait, service_time = result
+        if shared:
+            metrics.COALESCED.inc()
+            response.headers["Server-Timing"] = f"coalesced;dur={(time.perf_counter() - wait_start) * 1000:.1f}"
+        else:
+            response.headers["Server-Timing"] = (f"queue;dur={queue_wait * 1000:.1f}, "
+                                                 f"service;dur={service_time * 1000:.1f}")
+        metrics.PREDICTIONS.labels(predicted_class).inc()
+        root.set("class", predicted_class)
     return {
         "class":predicted_class,"confidence":float(confidence)
     }
-    pass
+
+async def admit():
+    # Take a slot before decoding so a burst can't pile images up in memory
+    with tracing.span("queue") as span:
+        metrics.QUEUE_DEPTH.inc()
+        try:
+            queue_wait = await ADMISSION.acquire()
+        except Rejected as e:
+            metrics.REJECTED.labels(e.reason).inc()
+            span.set("rejected", e.reason)
+            raise HTTPException(status_code=e.status_code, detail=f"Server busy: {e.reason}",
+                                headers={"Retry-After": str(e.retry_after)})
+        finally:
+            metrics.QUEUE_DEPTH.dec()
+    metrics.STAGE_SECONDS.labels("queue").observe(queue_wait)
+    return queue_wait
+
+async def admit_and_run(function, *args):
+    queue_wait = await admit()
+    service_start = time.perf_counter()
+    try:
+        result = await run_in_threadpool(function, *args)
+    except ImageRejected as e:
+        metrics.REJECTED.labels("image too large").inc()
+        raise HTTPException(status_code=413, detail=str(e))
+    finally:
+        service_time = time.perf_counter() - service_start
+        ADMISSION.release(service_time)
+    metrics.STAGE_SECONDS.labels("service").observe(service_time)
+    return result, queue_wait, service_time
+
+def classify_upload_tiled(source, stride, min_leaf):
+    with time_stage("decode"), tracing.span("decode") as span:
+        frame, original_size = decode_frame(source)
+        span.set("original_size", list(original_size))
+        span.set("decoded_size", [frame.shape[1], frame.shape[0]])
+    metrics.IMAGE_MEGAPIXELS.observe(original_size[0] * original_size[1] / 1e6)
+    with time_stage("inference"), tracing.span("inference") as span:
+        result = classify_tiles(frame, MODEL, stride=stride, min_leaf=min_leaf)
+        span.set("tiles", result["classified"])
+    # Tile coordinates are in the decoded frame; this lets clients map them back
+    result["original_size"] = list(original_size)
+    metrics.TILES.labels("classified").inc(result["classified"])
+    metrics.TILES.labels("skipped").inc(result["skipped"])
+    return result
+
+@app.post("/predict/tiled")
+async def predict_tiled(request: Request, response: Response, file: UploadFile = File(...),
+                        stride: int = Query(192, ge=64, le=256), min_leaf: float = Query(MIN_LEAF, ge=0, le=1),
+                        x_trace_id: str = Header(None), x_trace_token: str = Header(None),
+                        x_api_key: str = Header(None)):
+    # Classifies overlapping 256x256 windows of a large field photo instead of shrinking it whole
+    await check_rate_limit(request, response, x_api_key)
+    upload_size = check_upload_size(file)
+    root = start_trace("predict_tiled", x_trace_id, x_trace_token, response)
+    with root, metrics.IN_FLIGHT.track_inprogress(), metrics.STAGE_SECONDS.labels("total").time():
+        if upload_size is not None:
+            metrics.UPLOAD_BYTES.observe(upload_size)
+        result, queue_wait, service_time = await admit_and_run(classify_upload_tiled, file.file, stride, min_leaf)
+        response.headers["Server-Timing"] = f"queue;dur={queue_wait * 1000:.1f}, service;dur={service_time * 1000:.1f}"
+        if result["class"] is not None:
+            metrics.PREDICTIONS.labels(result["class"]).inc()
+        root.set("class", result["class"])
+    return result
+
+def upload_images(files):
+    for upload in files:
+        if is_archive(upload.filename):
+            yield from iter_archive(upload.file, upload.filename)
+        elif is_image_file(upload.filename or ''):
+            yield upload.filename, upload.file
+
+def timed_results(rows, start):
+    # Time to first result is what a streaming client actually waits for
+    first = True
+    for row in rows:
+        if first:
+            metrics.FIRST_RESULT_SECONDS.observe(time.perf_counter() - start)
+            first = False
+        yield row
+
+async def release_after(lines):
+    # The batch keeps its slot until the last line is sent; the slot is given
+    # back here rather than in the threadpool because waiters are asyncio futures
+    try:
+        async for line in iterate_in_threadpool(lines):
+            yield line
+    finally:
+        ADMISSION.release()
+
+@app.post("/predict/batch")
+async def predict_batch(request: Request, response: Response, files: List[UploadFile] = File(...),
+                        stream: bool = False, chunk_size: int = Query(16, ge=1, le=128),
+                        window: int = Query(None, ge=0, le=256), x_api_key: str = Header(None)):
+    # Archives are read member by member from the spooled upload, so memory is
+    # bounded by chunk_size + window decoded images rather than the upload size
+    rate_headers = await check_batch_rate_limit(request, response, x_api_key, files)
+    for upload in files:
+        if not is_archive(upload.filename):
+            check_upload_size(upload)
+    # The whole request holds one slot. Its service time isn't fed to the
+    # controller, whose wait estimate is for single images
+    await admit()
+    start = time.perf_counter()
+    window = chunk_size if window is None else window
+    rows = timed_results(classify_sources(upload_images(files), MODEL, chunk_size, window), start)
+    if stream:
+        # One line per image as soon as its chunk is classified
+        return StreamingResponse(release_after(json.dumps(row) + "\n" for row in rows),
+                                 media_type="application/x-ndjson", headers=rate_headers)
+    try:
+        return await run_in_threadpool(list, rows)
+    finally:
+        ADMISSION.release()
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: Request, response: Response, files: List[UploadFile] = File(...),
+                     x_api_key: str = Header(None)):
+    await check_batch_rate_limit(request, response, x_api_key, files)
+    try:
+        job_id, total = await run_in_threadpool(JOBS.create_job, upload_images(files), MAX_JOB_ITEMS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"job_id": job_id, "total": total, "status": "queued"}
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = await run_in_threadpool(JOBS.get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job id")
+    return job
+
+@app.get("/jobs/{job_id}/results")
+async def job_results(job_id: str):
+    job = await run_in_threadpool(JOBS.get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job id")
+    # Each chunk of rows is a SQLite query, so the generator is advanced in the threadpool
+    lines = iterate_in_threadpool(json.dumps(row) + "\n" for row in JOBS.iter_results(job_id))
+    return StreamingResponse(lines, media_type="application/x-ndjson", headers={"X-Job-Status": job["status"]})
+
+@app.delete("/jobs/{job_id}")
+async def delete_job(job_id: str):
+    if not await run_in_threadpool(JOBS.delete_job, job_id):
+        raise HTTPException(status_code=404, detail="Unknown job id")
+    return {"job_id": job_id, "deleted": True}
 
 if __name__ == "__main__":
     uvicorn.run(app, host='localhost', port=8000)
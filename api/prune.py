@@ -0,0 +1,96 @@
+"""Prune models/1 to a target sparsity and export it as a new model version.
+
+    python api/prune.py "PlantVillage/" --sparsity 0.75 --epochs 4
+
+Images are decoded and scored by models/1 once into --cache-dir, shared
+with distill.py.  The pruned model is fine-tuned on the training split,
+stripped of its pruning wrappers and saved to the next numbered directory
+under --models-dir; assets.extra/model.json records per-layer sparsity,
+plain and gzipped size, CPU latency and validation accuracy against the
+original.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from agroaid.distillation import build_cache, evaluate, split
+from agroaid.export import save_version, write_metadata
+from agroaid.model import load_model
+from agroaid.pruning import compressed_bytes, cpu_latency, layer_sparsity, prune
+
+
+def log(message):
+    print(message, file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Prune the potato disease model and export it as a new version.')
+    parser.add_argument('data_dir', help='PlantVillage-style directory, one folder per class')
+    # The trained model, not the newest export: pruning an already pruned version compounds sparsity
+    parser.add_argument('--model', default=os.environ.get('AGRO_AID_MODEL_PATH') or 'models/1',
+                        help='SavedModel directory to prune')
+    parser.add_argument('--models-dir', default='models', help='where the pruned model is saved as the next version')
+    parser.add_argument('--cache-dir', default='.distill-cache', help='decoded images and model outputs')
+    parser.add_argument('--sparsity', type=float, default=0.75, help='final fraction of zero weights per layer')
+    parser.add_argument('--epochs', type=int, default=4)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--learning-rate', type=float, default=1e-4)
+    parser.add_argument('--val-fraction', type=float, default=0.1)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    model = load_model(args.model)
+    paths, images, labels, logits = build_cache(args.data_dir, model, args.model, args.cache_dir, log=log)
+    train_indices, val_indices = split(paths, args.val_fraction)
+    log(f"{len(train_indices)} training and {len(val_indices)} validation images")
+
+    import tensorflow as tf
+    tf.random.set_seed(args.seed)
+    accuracy_before, _ = evaluate(model, images, labels, logits, val_indices)
+    latency_before = cpu_latency(model)
+    start = time.perf_counter()
+    pruned = prune(model, images, labels, logits, train_indices, args.sparsity, args.epochs, args.batch_size,
+                   args.learning_rate, args.seed, log=log)
+    training_seconds = time.perf_counter() - start
+    accuracy, agreement = evaluate(pruned, images, labels, logits, val_indices)
+
+    # Size the original the same way, from a fresh save, so the two are comparable
+    with tempfile.TemporaryDirectory() as tmp:
+        model.save(tmp)
+        original_compressed = compressed_bytes(tmp)
+    metadata = {
+        'kind': 'pruned',
+        'source': os.path.abspath(args.model),
+        'settings': {key: getattr(args, key) for key in
+                     ('sparsity', 'epochs', 'batch_size', 'learning_rate', 'val_fraction', 'seed')},
+        'images': {'train': len(train_indices), 'validation': len(val_indices)},
+        'training_seconds': round(training_seconds, 1),
+        'layer_sparsity': layer_sparsity(pruned),
+        'source_compressed_bytes': original_compressed,
+        'cpu_latency_ms': round(cpu_latency(pruned) * 1000, 2),
+        'source_cpu_latency_ms': round(latency_before * 1000, 2),
+        'val_accuracy': accuracy,
+        'source_val_accuracy': accuracy_before,
+        'val_agreement_with_source': agreement,
+    }
+    path, metadata = save_version(pruned, args.models_dir, metadata)
+    metadata['compressed_bytes'] = compressed_bytes(path)
+    write_metadata(path, metadata)
+
+    print(f"Saved pruned model to {path}")
+    for name, sparsity in metadata['layer_sparsity'].items():
+        print(f"  {name:>12}: {sparsity:6.1%} zeros")
+    print(f"  gzipped size {metadata['compressed_bytes'] / 1e6:.2f} MB "
+          f"(was {metadata['source_compressed_bytes'] / 1e6:.2f} MB)")
+    print(f"  CPU latency {metadata['cpu_latency_ms']:.1f} ms/image (was {metadata['source_cpu_latency_ms']:.1f} ms)")
+    if accuracy is not None and accuracy_before is not None:
+        print(f"  validation accuracy {accuracy:.1%} (was {accuracy_before:.1%}, {accuracy - accuracy_before:+.1%})")
+    if agreement is not None:
+        print(f"  agreement with the original {agreement:.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The API and the agroaid package are imported the way api/main.py is run: from api/
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_DIR)
+# The benchmark scripts import their helpers the same way, from api/benchmarks/
+sys.path.append(os.path.join(API_DIR, 'benchmarks'))
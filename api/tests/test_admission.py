@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from agroaid.admission import AdmissionController, Rejected
+
+
+def rejection(controller):
+    async def scenario():
+        await controller.acquire()
+        with pytest.raises(Rejected) as e:
+            await controller.acquire()
+        controller.release(0.1)
+        return e.value
+
+    return asyncio.run(scenario())
+
+
+def test_full_queue_is_turned_away_with_429():
+    controller = AdmissionController(max_concurrency=1, max_queue=0, initial_service_time=2.5)
+    e = rejection(controller)
+    assert (e.status_code, e.reason) == (429, 'queue full')
+    assert e.retry_after == 3
+    assert controller.active == 0
+
+
+def test_expected_wait_past_the_deadline_is_turned_away_with_503():
+    controller = AdmissionController(max_concurrency=1, max_queue=16, deadline=0.5, initial_service_time=1.0)
+    e = rejection(controller)
+    assert (e.status_code, e.reason) == (503, 'expected wait exceeds deadline')
+    assert e.retry_after == 1
+
+
+def test_waiter_gets_the_released_slot_in_turn():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=1, max_queue=4, deadline=5.0)
+        await controller.acquire()
+        waiter = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0)
+        assert controller.queued == 1 and not waiter.done()
+        controller.release()
+        await waiter
+        return controller.active, controller.queued
+
+    assert asyncio.run(scenario()) == (1, 0)
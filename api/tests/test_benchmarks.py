@@ -0,0 +1,49 @@
+import compare
+from common import latency_summary, load_results, save_results
+
+
+def write(path, runs):
+    save_results(path, {'http/c8': runs}, {})
+    return str(path)
+
+
+def http_run(p99_ms, error_rate=0.0):
+    return {'p50_ms': p99_ms / 2, 'p95_ms': p99_ms * 0.9, 'p99_ms': p99_ms, 'mean_ms': p99_ms / 2,
+            'throughput': 100.0, 'error_rate': error_rate}
+
+
+def test_run_with_no_successes_has_no_latency():
+    assert latency_summary([]) == dict.fromkeys(('p50_ms', 'p95_ms', 'p99_ms', 'mean_ms'))
+
+
+def test_candidate_whose_requests_all_failed_fails_the_gate(tmp_path):
+    base = write(tmp_path / 'base.json', [http_run(100), http_run(102)])
+    failed = {**latency_summary([]), 'throughput': 0.0, 'errors': 64, 'error_rate': 1.0}
+    candidate = write(tmp_path / 'candidate.json', [failed, failed])
+
+    rows, missing, failures = compare.compare([base], [candidate], compare.DEFAULT_THRESHOLDS)
+    assert failures == {'http/c8': 'no successful requests'}
+    assert compare.main(['--base', base, '--candidate', candidate]) == 1
+    # The null latencies survive the JSON round trip rather than becoming 0 ms
+    assert load_results(candidate)['cases']['http/c8']['runs'][0]['p99_ms'] is None
+
+
+def test_new_request_failures_fail_the_gate(tmp_path):
+    base = write(tmp_path / 'base.json', [http_run(100), http_run(102)])
+    candidate = write(tmp_path / 'candidate.json', [http_run(80, 0.005), http_run(81)])
+
+    assert compare.compare([base], [candidate], compare.DEFAULT_THRESHOLDS)[2] == {'http/c8': 'requests failed'}
+
+
+def test_consistent_slowdown_is_a_regression_and_noise_is_not(tmp_path):
+    base = write(tmp_path / 'base.json', [http_run(100), http_run(101), http_run(99)])
+    slower = write(tmp_path / 'slower.json', [http_run(130), http_run(131), http_run(129)])
+    noisy = write(tmp_path / 'noisy.json', [http_run(90), http_run(115), http_run(98)])
+
+    rows, _, failures = compare.compare([base], [slower], compare.DEFAULT_THRESHOLDS, {'p99_ms'})
+    assert [row['verdict'] for row in rows] == ['REGRESSION'] and not failures
+    assert compare.main(['--base', base, '--candidate', slower]) == 1
+
+    rows, _, _ = compare.compare([base], [noisy], compare.DEFAULT_THRESHOLDS, {'p99_ms'})
+    assert [row['verdict'] for row in rows] == ['noise']
+    assert compare.main(['--base', base, '--candidate', noisy]) == 0
@@ -0,0 +1,45 @@
+import asyncio
+
+from agroaid.coalesce import SingleFlight
+
+
+def test_followers_of_a_cancelled_leader_elect_one_new_leader():
+    async def scenario():
+        flight, calls = SingleFlight(), []
+
+        async def work():
+            calls.append(None)
+            await asyncio.sleep(0.01)
+            return len(calls)
+
+        leader = asyncio.ensure_future(flight.run('key', work))
+        await asyncio.sleep(0)
+        followers = [asyncio.ensure_future(flight.run('key', work)) for _ in range(3)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        results = await asyncio.gather(*followers)
+        return results, calls, len(flight)
+
+    results, calls, in_flight = asyncio.run(scenario())
+    assert len(calls) == 2
+    assert sorted(shared for _, shared in results) == [False, True, True]
+    assert {result for result, _ in results} == {2}
+    assert in_flight == 0
+
+
+def test_followers_see_the_leaders_exception():
+    async def scenario():
+        flight, calls = SingleFlight(), []
+
+        async def work():
+            calls.append(None)
+            await asyncio.sleep(0.01)
+            raise ValueError('decode failed')
+
+        runs = [asyncio.ensure_future(flight.run('key', work)) for _ in range(3)]
+        return await asyncio.gather(*runs, return_exceptions=True), calls, len(flight)
+
+    results, calls, in_flight = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert all(isinstance(result, ValueError) and str(result) == 'decode failed' for result in results)
+    assert in_flight == 0
@@ -0,0 +1,24 @@
+from io import BytesIO
+
+from agroaid import jobs
+from agroaid.jobs import JobStore
+
+
+def test_expired_claims_go_back_to_the_queue(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(jobs.time, 'time', lambda: clock[0])
+    store = JobStore(str(tmp_path / 'jobs.db'), str(tmp_path / 'spool'))
+    job_id, total = store.create_job([('a.jpg', BytesIO(b'a')), ('b.jpg', BytesIO(b'b'))])
+
+    claimed = store.claim(10, lease=60)
+    assert [(seq, name) for _, seq, name, _ in claimed] == [(0, 'a.jpg'), (1, 'b.jpg')]
+    assert store.claim(10, lease=60) == []
+
+    # The first worker finished one image and then died
+    store.complete([(job_id, 0, {'path': 'a.jpg', 'class': 'Healthy'})])
+    clock[0] += 61
+    assert [seq for _, seq, _, _ in store.claim(10, lease=60)] == [1]
+    assert store.get_job(job_id)['pending'] == 1
+
+    store.complete([(job_id, 1, {'path': 'b.jpg', 'class': 'Healthy'})])
+    assert store.get_job(job_id)['status'] == 'done'
@@ -0,0 +1,147 @@
+import importlib
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image
+
+
+class CornerModel:
+    """Scores the top-left quadrant of each image, so flips and turns change the answer."""
+
+    def predict_on_batch(self, images):
+        images = np.asarray(images, np.float32) / 255
+        half = images.shape[1] // 2
+        corner = images[:, :half, :half].mean(axis=(1, 2, 3))
+        scores = np.stack([corner, 1 - corner, np.full(len(images), 0.2)], axis=1)
+        return scores / scores.sum(axis=1, keepdims=True)
+
+
+@pytest.fixture
+def make_client(monkeypatch, tmp_path):
+    """Start the API on CornerModel with the given AGRO_AID_* settings."""
+    from fastapi.testclient import TestClient
+
+    import agroaid.model
+    monkeypatch.setenv('AGRO_AID_JOBS_DB', str(tmp_path / 'jobs.db'))
+    monkeypatch.setattr(agroaid.model, 'load_model', lambda path=None: CornerModel())
+    clients = []
+
+    def make(**env):
+        for name, value in env.items():
+            monkeypatch.setenv(f'AGRO_AID_{name}', value)
+        import main
+        client = TestClient(importlib.reload(main).app)
+        clients.append(client.__enter__())
+        return client
+
+    yield make
+    for client in clients:
+        client.__exit__(None, None, None)
+
+
+def lopsided_jpeg():
+    pixels = np.zeros((256, 256, 3), np.uint8)
+    pixels[:128, :128] = (40, 200, 60)
+    buffer = BytesIO()
+    Image.fromarray(pixels).save(buffer, 'JPEG', quality=95)
+    return buffer.getvalue()
+
+
+def test_tta_bypasses_near_duplicate_cache(make_client):
+    client = make_client(DEDUP='dhash')
+    image = lopsided_jpeg()
+
+    def confidence(query=''):
+        response = client.post(f'/predict{query}', files={'file': ('leaf.jpg', image, 'image/jpeg')})
+        assert response.status_code == 200
+        return response.json()['confidence']
+
+    single = confidence('?tta=1')
+    assert confidence('?tta=8') != pytest.approx(single)
+    # Plain requests still hit the cache filled by the first one
+    assert confidence() == pytest.approx(single)
+
+
+@pytest.mark.parametrize('views', ['0', '9'])
+def test_default_tta_out_of_range_fails_at_startup(make_client, views):
+    with pytest.raises(ValueError, match='AGRO_AID_TTA'):
+        make_client(TTA=views)
+
+
+def test_batches_pay_one_token_per_image(make_client):
+    client = make_client(RATE='0.001', BURST='5')
+    images = [('files', (f'{i}.jpg', lopsided_jpeg(), 'image/jpeg')) for i in range(3)]
+
+    response = client.post('/predict/batch', files=images)
+    assert response.status_code == 200
+    assert response.headers['X-RateLimit-Remaining'] == '2'
+    assert client.post('/jobs', files=images).status_code == 429
+    assert client.post('/predict', files={'file': images[0][1]}).status_code == 200
+
+
+def test_batches_take_an_admission_slot(make_client):
+    client = make_client(MAX_CONCURRENCY='1', MAX_QUEUE='0')
+    import main
+    images = [('files', (f'{i}.jpg', lopsided_jpeg(), 'image/jpeg')) for i in range(3)]
+
+    assert client.post('/predict/batch', files=images).status_code == 200
+    streamed = client.post('/predict/batch?stream=true', files=images)
+    assert len(streamed.text.splitlines()) == 3
+    assert main.ADMISSION.active == 0
+
+    main.ADMISSION.active = 1
+    busy = client.post('/predict/batch', files=images)
+    assert busy.status_code == 429
+    assert 'Retry-After' in busy.headers
+
+
+def test_oversized_batch_upload_is_rejected_up_front(make_client, monkeypatch):
+    client = make_client()
+    import main
+    monkeypatch.setattr(main, 'MAX_UPLOAD_BYTES', 1000)
+
+    response = client.post('/predict/batch', files=[('files', ('big.jpg', lopsided_jpeg(), 'image/jpeg'))])
+    assert response.status_code == 413
+    assert main.ADMISSION.active == 0
+
+
+def test_only_small_batch_buffers_are_kept():
+    from agroaid.preprocess import MAX_REUSED_BATCH, batch_buffer
+
+    small = batch_buffer(MAX_REUSED_BATCH)
+    assert np.shares_memory(batch_buffer(2), small)
+    large = batch_buffer(MAX_REUSED_BATCH + 1)
+    assert not np.shares_memory(batch_buffer(MAX_REUSED_BATCH + 1), large)
+    assert np.shares_memory(batch_buffer(MAX_REUSED_BATCH), small)
+
+
+def test_cmyk_jpegs_skip_in_graph_decoding(make_client, monkeypatch):
+    client = make_client()
+    import main
+    decoded_in_graph = []
+    monkeypatch.setattr(main, 'ENCODED', object())
+    monkeypatch.setattr(main, 'predict_encoded', lambda signature, images: decoded_in_graph.append(images) or
+                        np.array([[0.1, 0.8, 0.1]]))
+
+    def post(mode):
+        buffer = BytesIO()
+        Image.open(BytesIO(lopsided_jpeg())).convert(mode).save(buffer, 'JPEG')
+        return client.post('/predict', files={'file': ('leaf.jpg', buffer.getvalue(), 'image/jpeg')})
+
+    assert post('RGB').status_code == 200
+    assert len(decoded_in_graph) == 1
+    cmyk = post('CMYK')
+    assert cmyk.status_code == 200
+    assert len(decoded_in_graph) == 1
+
+
+def test_busy_server_answers_503_with_retry_after(make_client):
+    client = make_client(MAX_CONCURRENCY='1', DEADLINE='0.1')
+    import main
+    main.ADMISSION.active = 1
+
+    response = client.post('/predict', files={'file': ('leaf.jpg', lopsided_jpeg(), 'image/jpeg')})
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+    assert main.ADMISSION.queued == 0
@@ -0,0 +1,27 @@
+from io import BytesIO
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from agroaid import preprocess
+from agroaid.preprocess import ImageRejected, open_image
+
+
+def encoded(size, format):
+    buffer = BytesIO()
+    Image.fromarray(np.zeros((size[1], size[0], 3), np.uint8)).save(buffer, format)
+    buffer.seek(0)
+    return buffer
+
+
+@pytest.mark.parametrize('limit', ['MAX_IMAGE_PIXELS', 'MAX_DECODE_PIXELS'])
+def test_rejecting_an_image_leaves_the_callers_file_open(monkeypatch, limit):
+    monkeypatch.setattr(preprocess, limit, 100)
+    source = encoded((64, 48), 'PNG')
+
+    with pytest.raises(ImageRejected):
+        open_image(source)
+    assert not source.closed
+    source.seek(0)
+    assert preprocess.source_size(source) == len(source.getvalue())
@@ -0,0 +1,31 @@
+import pytest
+
+from agroaid import ratelimit
+from agroaid.ratelimit import MemoryStore, RateLimiter, SQLiteStore
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    return MemoryStore() if request.param == 'memory' else SQLiteStore(str(tmp_path / 'buckets.db'))
+
+
+def test_tokens_refill_at_the_rate_up_to_the_burst(store):
+    assert store.take('ip:1', 3, 1.0, 3.0, now=100.0) == (True, 0.0)
+    assert store.take('ip:1', 1, 1.0, 3.0, now=100.5) == (False, 0.5)
+    assert store.take('ip:1', 1, 1.0, 3.0, now=101.0) == (True, 0.0)
+    # An hour idle refills to the burst, not beyond
+    assert store.take('ip:1', 1, 1.0, 3.0, now=3700.0) == (True, 2.0)
+
+
+def test_denied_request_is_told_when_to_retry(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(ratelimit.time, 'time', lambda: clock[0])
+    limiter = RateLimiter(rate=0.5, burst=2.0, api_keys={'k': 'partner'})
+
+    assert [limiter.check(None, '10.0.0.1').allowed for _ in range(3)] == [True, True, False]
+    denied = limiter.check(None, '10.0.0.1')
+    assert (denied.remaining, denied.retry_after, denied.limit, denied.priority) == (0, 2, 2, 'anonymous')
+    clock[0] += 2
+    assert limiter.check(None, '10.0.0.1').allowed
+    # A known key has its own, larger bucket
+    assert limiter.check('k', '10.0.0.1') == (True, 19, 0, 20, 'partner')
@@ -0,0 +1,52 @@
+"""Classify images as field cameras sync them into a drop folder.
+
+    python api/watch.py /srv/camera-drop -o results.jsonl
+
+Uses inotify on Linux and falls back to polling elsewhere (or with --poll).
+Files are picked up once they have stopped changing for --settle seconds.
+Results go to the same resumable CSV/JSONL format as classify.py, so a
+restarted daemon skips files it has already classified.
+"""
+import argparse
+import signal
+import sys
+
+from agroaid.batch import ResultWriter
+from agroaid.model import load_model, saved_model_path
+from agroaid.watch import IngestPipeline
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Watch a drop folder and classify new images.')
+    parser.add_argument('folder', help='directory to watch (recursively)')
+    parser.add_argument('-o', '--output', required=True, help='results file (.csv or .jsonl)')
+    parser.add_argument('--model', default=saved_model_path, help='SavedModel directory')
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--decode-workers', type=int, default=2)
+    parser.add_argument('--settle', type=float, default=2.0, help='seconds a file must stay unchanged before it is read')
+    parser.add_argument('--max-wait', type=float, default=0.5, help='longest wait for a batch to fill up')
+    parser.add_argument('--poll', action='store_true', help='poll instead of using inotify')
+    parser.add_argument('--poll-interval', type=float, default=2.0)
+    parser.add_argument('--stats-interval', type=float, default=10.0, help='seconds between throughput reports')
+    args = parser.parse_args(argv)
+
+    def handle_sigterm(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, handle_sigterm)
+
+    model = load_model(args.model)
+    with ResultWriter(args.output) as writer:
+        pipeline = IngestPipeline(args.folder, model, writer, batch_size=args.batch_size,
+                                  decode_workers=args.decode_workers, settle=args.settle, max_wait=args.max_wait,
+                                  polling=args.poll, poll_interval=args.poll_interval, stats_interval=args.stats_interval)
+        try:
+            pipeline.run()
+        except KeyboardInterrupt:
+            pass
+        print(pipeline.stats.report(len(pipeline.debouncer), pipeline.ready_queue, pipeline.decoded_queue), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())